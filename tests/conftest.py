@@ -0,0 +1,7 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Keep the run store, secret key and report archives of the imported portal out of the user's data directory
+os.environ.setdefault("PORTAL_DATA_DIR", tempfile.mkdtemp(prefix="viya4_portal_test-"))
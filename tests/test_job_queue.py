@@ -0,0 +1,76 @@
+import threading
+from concurrent.futures import Future
+
+import pytest
+
+import viya4_troubleshooting_web_v4 as portal
+
+
+@pytest.fixture
+def job_steps(monkeypatch):
+    """Stand-ins for login.sh and the health check: services named 'blocked*' wait in login until released."""
+    started = []
+    release = threading.Event()
+
+    def run_login_script(tla, env, service, force=False, owner=None):
+        if service.startswith('blocked'):
+            release.wait(10)
+        return True, "Login successful.", None
+
+    def troubleshoot_service(service, tla, env, owner=None):
+        started.append(service)
+        if service.startswith('slow'):
+            stdout, stderr, returncode = portal.run_command("sleep 30", owner=owner)
+        else:
+            stdout, stderr, returncode = portal.run_command("sleep 0.5; echo done", owner=owner)
+        return (True, "", {'results': stdout}) if returncode == 0 else (False, stderr or "failed", None)
+    monkeypatch.setattr(portal, "run_login_script", run_login_script)
+    monkeypatch.setattr(portal, "troubleshoot_service", troubleshoot_service)
+    monkeypatch.setattr(portal, "publish_task_update", lambda service: None)
+    yield started, release
+    release.set()
+
+
+def submit(queue, service, trigger='manual'):
+    login, troubleshoot = Future(), Future()
+    queue.submit(service, "tla", "env", trigger, login, troubleshoot, threading.Event())
+    return login, troubleshoot
+
+
+def test_runs_waiting_jobs_by_priority_then_arrival(job_steps):
+    started, release = job_steps
+    queue = portal.JobQueue(1)
+    futures = [submit(queue, 'blocked', 'scheduled')[1]]
+    futures += [submit(queue, service, trigger)[1] for service, trigger in
+                [('scheduled-1', 'scheduled'), ('fleet-1', 'fleet'), ('manual-1', 'manual'), ('fleet-2', 'fleet')]]
+    assert [queue.position(service) for service in ('manual-1', 'fleet-1', 'fleet-2', 'scheduled-1', 'blocked')] == [1, 2, 3, 4, None]
+    release.set()
+    for future in futures:
+        assert future.result(timeout=30)[0]
+    assert started == ['blocked', 'manual-1', 'fleet-1', 'fleet-2', 'scheduled-1']
+
+
+def test_cancelling_a_queued_job_skips_it(job_steps):
+    started, release = job_steps
+    queue = portal.JobQueue(1)
+    running = submit(queue, 'blocked')
+    login, troubleshoot = submit(queue, 'queued')
+    assert queue.cancel('queued')
+    assert login.result(timeout=1) == (False, portal.CANCELLED_MESSAGE, None)
+    assert not troubleshoot.result(timeout=1)[0]
+    release.set()
+    assert running[1].result(timeout=30)[0]
+    assert started == ['blocked']
+    assert not queue.cancel('queued')
+
+
+def test_cancelling_a_running_job_kills_only_its_commands(job_steps):
+    started, _ = job_steps
+    queue = portal.JobQueue(2)
+    slow = submit(queue, 'slow')[1]
+    other = submit(queue, 'other')[1]
+    while 'slow' not in started:
+        threading.Event().wait(0.05)
+    assert queue.cancel('slow')
+    assert slow.result(timeout=5) == (False, portal.CANCELLED_MESSAGE, None)
+    assert other.result(timeout=30) == (True, "", {'results': "done"})
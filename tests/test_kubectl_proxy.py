@@ -0,0 +1,175 @@
+import json
+import os
+import stat
+import sys
+import textwrap
+import threading
+import time
+
+import pytest
+
+import viya4_troubleshooting_web_v4 as portal
+
+# Stands in for kubectl: `kubectl proxy` serves a small fake API on the requested unix socket and records its
+# arguments; any other command prints what it was asked, as the CLI fallback would
+FAKE_KUBECTL = textwrap.dedent('''\
+    #!{python}
+    import json, os, socketserver, sys, time
+    from http.server import BaseHTTPRequestHandler
+
+    PODS = {{"kind": "PodList", "metadata": {{"resourceVersion": "7"}}, "items": [{{"metadata": {{"name": "sas-arke-0"}}}}]}}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def send(self, status, body):
+            body = body.encode()
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/healthz":
+                self.send(200, "ok")
+            elif self.path == "/api/v1/namespaces/ns/pods":
+                self.send(200, json.dumps(PODS))
+            elif self.path == "/api/v1/namespaces/ns/pods/sas-arke-0/log?timestamps=true":
+                self.send_response(200)
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for line in ("first line\\n", "second line\\r\\n", "third line\\n"):
+                    self.wfile.write(f"{{len(line):x}}\\r\\n{{line}}\\r\\n".encode())
+                self.wfile.write(b"0\\r\\n\\r\\n")
+            elif self.path == "/api/v1/namespaces/slow/pods":
+                time.sleep(30)
+                self.send(200, json.dumps(PODS))
+            elif self.path == "/api/v1/namespaces/secret/pods":
+                self.send(403, json.dumps({{"message": "pods is forbidden"}}))
+            else:
+                self.send(404, json.dumps({{"message": "the server could not find the requested resource"}}))
+
+    if sys.argv[1] != "proxy":
+        print("from-cli", *sys.argv[1:])
+        sys.exit(0)
+    args = dict(arg[2:].split("=", 1) for arg in sys.argv[2:])
+    with open({args_file!r}, "a") as args_file:
+        args_file.write(json.dumps(args) + "\\n")
+    server = socketserver.ThreadingUnixStreamServer(args["unix-socket"], Handler)
+    print(f"Starting to serve on {{args['unix-socket']}}", flush=True)
+    server.serve_forever()
+''')
+
+
+@pytest.fixture
+def kubeconfig(tmp_path, monkeypatch):
+    """A kubeconfig path whose kubectl is the fake one; yields the path and the file recording proxy arguments."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    args_file = tmp_path / "proxy_args.jsonl"
+    kubectl = bin_dir / "kubectl"
+    kubectl.write_text(FAKE_KUBECTL.format(python=sys.executable, args_file=str(args_file)))
+    kubectl.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    kubeconfig_path = tmp_path / "config"
+    kubeconfig_path.write_text("apiVersion: v1\n")
+    yield str(kubeconfig_path), args_file
+    proxy = portal.kubectl_proxies.pop(str(kubeconfig_path), None)
+    if proxy is not None:
+        proxy.stop()
+
+
+def proxy_starts(args_file):
+    return [json.loads(line) for line in args_file.read_text().splitlines()] if args_file.exists() else []
+
+
+def test_reads_through_a_private_read_only_proxy(kubeconfig):
+    kubeconfig_path, args_file = kubeconfig
+    stdout, stderr, returncode = portal.kube_get(kubeconfig_path, "/api/v1/namespaces/ns/pods", "kubectl get pods -o json")
+    assert returncode == 0 and stderr == ""
+    assert json.loads(stdout)["items"][0]["metadata"]["name"] == "sas-arke-0"
+    proxy = portal.get_kubectl_proxy(kubeconfig_path)
+    assert stat.S_IMODE(os.stat(proxy.socket_dir).st_mode) == 0o700
+    assert proxy_starts(args_file) == [{"unix-socket": proxy.socket_path, "reject-methods": "^(POST|PUT|PATCH|DELETE)$"}]
+
+
+def test_reuses_one_proxy_and_its_connections(kubeconfig):
+    kubeconfig_path, args_file = kubeconfig
+    for _ in range(3):
+        assert portal.kube_get(kubeconfig_path, "/api/v1/namespaces/ns/pods", "kubectl get pods -o json")[2] == 0
+    assert len(proxy_starts(args_file)) == 1
+    assert len(portal.get_kubectl_proxy(kubeconfig_path).idle) == 1
+
+
+def test_reports_api_errors(kubeconfig):
+    kubeconfig_path, _ = kubeconfig
+    stdout, stderr, returncode = portal.kube_get(kubeconfig_path, "/api/v1/namespaces/ns/missing", "kubectl get missing")
+    assert (stdout, returncode) == ("", 1)
+    assert stderr == "Error from server (404): the server could not find the requested resource"
+
+
+def test_falls_back_to_kubectl_when_refused(kubeconfig):
+    kubeconfig_path, _ = kubeconfig
+    stdout, _, returncode = portal.kube_get(kubeconfig_path, "/api/v1/namespaces/secret/pods", "kubectl get pods -n secret")
+    assert (stdout, returncode) == ("from-cli get pods -n secret", 0)
+
+
+def test_falls_back_to_kubectl_without_a_proxy(kubeconfig, monkeypatch):
+    kubeconfig_path, _ = kubeconfig
+    monkeypatch.setattr(portal.KubectlProxy, "_start", lambda self: False)
+    stdout, _, returncode = portal.kube_get(kubeconfig_path, "/api/v1/namespaces/ns/pods", "kubectl get pods")
+    assert (stdout, returncode) == ("from-cli get pods", 0)
+
+
+def test_streams_lines(kubeconfig):
+    kubeconfig_path, _ = kubeconfig
+    status = {}
+    lines = list(portal.kube_stream(kubeconfig_path, "/api/v1/namespaces/ns/pods/sas-arke-0/log", "kubectl logs sas-arke-0",
+                                    params={'timestamps': 'true'}, status=status))
+    assert lines == ["first line", "second line", "third line"]
+    assert status == {'returncode': 0, 'timed_out': False}
+
+
+def test_restarts_when_the_kubeconfig_changes(kubeconfig):
+    kubeconfig_path, args_file = kubeconfig
+    portal.kube_get(kubeconfig_path, "/api/v1/namespaces/ns/pods", "kubectl get pods -o json")
+    first_socket = portal.get_kubectl_proxy(kubeconfig_path).socket_path
+    stat_result = os.stat(kubeconfig_path)
+    os.utime(kubeconfig_path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 10**9))
+    assert portal.kube_get(kubeconfig_path, "/api/v1/namespaces/ns/pods", "kubectl get pods -o json")[2] == 0
+    assert len(proxy_starts(args_file)) == 2
+    assert not os.path.exists(first_socket)
+
+
+def test_restarts_after_a_login(kubeconfig):
+    kubeconfig_path, args_file = kubeconfig
+    portal.kube_get(kubeconfig_path, "/api/v1/namespaces/ns/pods", "kubectl get pods -o json")
+    portal.restart_kubectl_proxy(kubeconfig_path)
+    assert portal.get_kubectl_proxy(kubeconfig_path).process is None
+    portal.kube_get(kubeconfig_path, "/api/v1/namespaces/ns/pods", "kubectl get pods -o json")
+    assert len(proxy_starts(args_file)) == 2
+
+
+def test_cancelling_a_job_aborts_only_its_requests(kubeconfig):
+    kubeconfig_path, _ = kubeconfig
+    outcomes = {}
+    def read(owner, namespace):
+        outcomes[owner] = portal.kube_get(kubeconfig_path, f"/api/v1/namespaces/{namespace}/pods", "kubectl get pods",
+                                          owner=owner)
+    reads = [threading.Thread(target=read, args=(1, "slow")), threading.Thread(target=read, args=(2, "ns"))]
+    for thread in reads:
+        thread.start()
+    time.sleep(1)
+    started = time.time()
+    portal.cancel_child_processes(1)
+    try:
+        for thread in reads:
+            thread.join(timeout=10)
+    finally:
+        portal.release_child_processes(1)
+    assert time.time() - started < 5
+    assert outcomes[1] == ("", f"Error: {portal.CANCELLED_MESSAGE}", 1)
+    assert outcomes[2][2] == 0
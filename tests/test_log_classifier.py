@@ -0,0 +1,47 @@
+import json
+
+import viya4_log_classifier as classifier
+
+
+def sas_line(timestamp, message, level="ERROR"):
+    """A `kubectl logs --timestamps` line in the SAS text log format."""
+    return f"{timestamp} {level} 2024-05-01 10:00:00.123 +0000 [sas-files] - {message}"
+
+
+def test_classifies_json_and_text_lines():
+    assert classifier.classify_log_line(json.dumps({'level': 'warn', 'source': 'arke', 'message': 'slow'})) == ("[arke] - slow", "warn")
+    assert classifier.classify_log_line("ERROR 2024-05-01 10:00:00.123 +0000 [ctx] - broken") == ("[ctx] - broken", "error")
+    assert classifier.classify_log_line(json.dumps({'level': 'info', 'message': 'no error here'})) is None
+    assert classifier.classify_log_line("all good") is None
+
+
+def test_signature_masks_variable_tokens():
+    first = classifier.message_signature('error', "Request 3f2b8c1e-4a5d-4e6f-8a9b-0c1d2e3f4a5b from 10.0.0.12:8443 failed after 30 ms at 2024-05-01T10:00:00Z")
+    second = classifier.message_signature('error', "Request 9a8b7c6d-5e4f-4a3b-8c2d-1e0f9a8b7c6d from 10.1.2.3:443 failed after 1500 ms at 2024-06-02 11:22:33.456+02:00")
+    assert first == second
+    assert classifier.message_signature('warn', "Request failed") != classifier.message_signature('error', "Request failed")
+    assert classifier.message_signature('error', "Request failed") != classifier.message_signature('error', "Login failed")
+
+
+def test_merging_keeps_the_earliest_example():
+    later = classifier.classify_log_lines([sas_line("2024-05-02T00:00:00Z", "failed after 5 ms")] * 2)
+    earlier = classifier.classify_log_lines([sas_line("2024-05-01T00:00:00Z", "failed after 7 ms")])
+    merged = classifier.merge_signatures(later, earlier)
+    [stats] = merged.values()
+    assert stats['count'] == 3
+    assert (stats['first_seen'], stats['last_seen']) == ("2024-05-01 00:00:00", "2024-05-02 00:00:00")
+    assert stats['example'] == "[sas-files] - failed after 7 ms"
+
+
+def test_signatures_beyond_the_limit_are_counted(monkeypatch):
+    monkeypatch.setattr(classifier, "LOG_SCAN_MAX_SIGNATURES", 2)
+    lines = [sas_line(f"2024-05-01T00:00:0{i}Z", f"problem {kind}") for i, kind in enumerate("abcdc")]
+    signatures = classifier.classify_log_lines(lines)
+    overflow = signatures.pop(classifier.OVERFLOW_SIGNATURE)
+    assert len(signatures) == 2
+    assert overflow['count'] == 3
+    assert len(overflow['signatures']) == 2
+    merged = classifier.merge_signatures({}, classifier.classify_log_lines(lines))
+    merged = classifier.merge_signatures(merged, classifier.classify_log_lines([sas_line("2024-05-01T00:00:09Z", "problem e")]))
+    assert merged[classifier.OVERFLOW_SIGNATURE]['count'] == 4
+    assert len(merged[classifier.OVERFLOW_SIGNATURE]['signatures']) == 2
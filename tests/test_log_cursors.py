@@ -0,0 +1,66 @@
+import pytest
+
+import viya4_troubleshooting_web_v4 as portal
+
+
+def sas_line(timestamp, message, level="ERROR"):
+    """A `kubectl logs --timestamps` line in the SAS text log format."""
+    return f"{timestamp} {level} 2024-05-01 10:00:00.123 +0000 [sas-files] - {message}"
+
+
+POD = {'metadata': {'name': 'sas-files-1', 'uid': 'uid-1'},
+       'spec': {'containers': [{'name': 'sas-files'}]},
+       'status': {'containerStatuses': [{'name': 'sas-files', 'restartCount': 0}]}}
+
+
+@pytest.fixture
+def container_log(monkeypatch):
+    """The log of POD's container, served like the API server does: sinceTime is inclusive at whole seconds."""
+    log = []
+    requests = []
+
+    def kube_stream(kubeconfig_path, api_path, command, params=None, timeout=10, status=None, owner=None):
+        requests.append(dict(params or {}))
+        since = (params or {}).get('sinceTime')
+        status['returncode'], status['timed_out'] = 0, False
+        for line in list(log):
+            if since is None or line[:19] >= since[:19]:
+                yield line
+    monkeypatch.setattr(portal, "kube_stream", kube_stream)
+    monkeypatch.setattr(portal, "log_cursors", portal.defaultdict(dict))
+    return log, requests
+
+
+def total_count(signatures):
+    return sum(stats['count'] for stats in signatures.values())
+
+
+def test_rescans_only_new_lines(container_log):
+    log, requests = container_log
+    log += [sas_line("2024-05-01T10:00:00.100000000Z", "failed 1"), sas_line("2024-05-01T10:00:00.200000000Z", "failed 2")]
+    assert total_count(portal.scan_pod_log_incremental("ns", POD, "/kubeconfig")) == 2
+    # A line within the same second as the cursor is new, the ones up to the cursor are not counted twice
+    log += [sas_line("2024-05-01T10:00:00.300000000Z", "failed 3"), sas_line("2024-05-01T10:00:05.000000000Z", "failed 4")]
+    assert total_count(portal.scan_pod_log_incremental("ns", POD, "/kubeconfig")) == 4
+    assert requests[-1]['sinceTime'] == "2024-05-01T10:00:00.200000000Z"
+    assert total_count(portal.scan_pod_log_incremental("ns", POD, "/kubeconfig")) == 4
+
+
+def test_cursor_stops_where_the_budget_ran_out(container_log, monkeypatch):
+    log, _ = container_log
+    log += [sas_line(f"2024-05-01T10:00:0{i}.000000000Z", f"failed {i}") for i in range(5)]
+    monkeypatch.setattr(portal, "LOG_SCAN_MAX_LINES", 2)
+    assert total_count(portal.scan_pod_log_incremental("ns", POD, "/kubeconfig")) == 2
+    assert total_count(portal.scan_pod_log_incremental("ns", POD, "/kubeconfig")) == 4
+    assert total_count(portal.scan_pod_log_incremental("ns", POD, "/kubeconfig")) == 5
+    assert total_count(portal.scan_pod_log_incremental("ns", POD, "/kubeconfig")) == 5
+
+
+def test_restarted_container_is_rescanned(container_log):
+    log, requests = container_log
+    log.append(sas_line("2024-05-01T10:00:00.000000000Z", "failed"))
+    portal.scan_pod_log_incremental("ns", POD, "/kubeconfig")
+    log[:] = [sas_line("2024-05-01T11:00:00.000000000Z", "failed again")]
+    restarted = dict(POD, status={'containerStatuses': [{'name': 'sas-files', 'restartCount': 1}]})
+    assert total_count(portal.scan_pod_log_incremental("ns", restarted, "/kubeconfig")) == 1
+    assert 'sinceTime' not in requests[-1]
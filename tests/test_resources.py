@@ -0,0 +1,49 @@
+import pytest
+
+import viya4_troubleshooting_web_v4 as portal
+
+
+@pytest.mark.parametrize("value, is_cpu, expected", [
+    ("250m", True, 250),
+    ("2", True, 2000),
+    ("0.5", True, 500),
+    ("512Mi", False, 0.5),
+    ("2Gi", False, 2),
+    ("1048576Ki", False, 1),
+    ("1G", False, 1e9 / 1024 ** 3),
+    ("1073741824", False, 1),
+    (None, False, 0),
+    ("0", True, 0),
+    ("lots", True, 0),
+])
+def test_parse_resource_value(value, is_cpu, expected):
+    assert portal.parse_resource_value(value, is_cpu) == pytest.approx(expected)
+
+
+def container(requests=None, limits=None):
+    return {'resources': {'requests': requests or {}, 'limits': limits or {}}}
+
+
+def test_containers_add_up():
+    pod = {'spec': {'containers': [container({'cpu': '100m', 'memory': '256Mi'}, {'cpu': '1', 'memory': '1Gi'}),
+                                   container({'cpu': '400m', 'memory': '768Mi'})]}}
+    reserved = portal.pod_reserved_resources(pod)
+    assert reserved == pytest.approx({'cpu_requests': 500, 'memory_requests': 1, 'cpu_limits': 1000, 'memory_limits': 1})
+
+
+def test_largest_init_container_wins_over_smaller_containers():
+    pod = {'spec': {'containers': [container({'cpu': '100m'})],
+                    'initContainers': [container({'cpu': '2'}), container({'cpu': '300m'})]}}
+    assert portal.pod_reserved_resources(pod)['cpu_requests'] == 2000
+
+
+def test_overhead_is_added():
+    pod = {'spec': {'containers': [container({'cpu': '100m', 'memory': '1Gi'})],
+                    'overhead': {'cpu': '250m', 'memory': '512Mi'}}}
+    reserved = portal.pod_reserved_resources(pod)
+    assert reserved['cpu_requests'] == 350
+    assert reserved['memory_requests'] == pytest.approx(1.5)
+
+
+def test_pod_without_resources_reserves_nothing():
+    assert set(portal.pod_reserved_resources({'spec': {'containers': [{}]}}).values()) == {0}
@@ -0,0 +1,38 @@
+import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+
+import viya4_troubleshooting_web_v4 as portal
+
+
+def set_run_state(service, **columns):
+    with closing(portal.run_state_connection()) as connection, connection:
+        for column, value in columns.items():
+            connection.execute(f"UPDATE run_state SET {column} = ? WHERE service = ?", (value, service))
+
+
+def test_claims_a_service_once_until_its_run_finishes():
+    service = f"claim-{uuid.uuid4()}"
+    assert portal.claim_run_state(service, {'tla': 'tla', 'env': 'env'})
+    assert not portal.claim_run_state(service, {'tla': 'tla', 'env': 'env'})
+    set_run_state(service, state=json.dumps({'login_outcome': [True, ""], 'troubleshoot_outcome': [True, ""]}))
+    assert portal.claim_run_state(service, {'tla': 'tla', 'env': 'env'})
+
+
+def test_concurrent_claims_have_one_winner():
+    service = f"claim-{uuid.uuid4()}"
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        claims = list(pool.map(lambda _: portal.claim_run_state(service, {'tla': 'tla', 'env': 'env'}), range(8)))
+    assert claims.count(True) == 1
+
+
+def test_run_of_a_reused_pid_is_orphaned():
+    service = f"claim-{uuid.uuid4()}"
+    assert portal.claim_run_state(service, {'tla': 'tla', 'env': 'env'})
+    # Same pid as a live process, but not the process that claimed the run
+    set_run_state(service, owner_started="another-boot:1")
+    state = portal.load_run_state(service)
+    assert state['login_outcome'] == [False, portal.INTERRUPTED_MESSAGE]
+    assert state['version'] == 1
+    assert portal.claim_run_state(service, {'tla': 'tla', 'env': 'env'})
@@ -0,0 +1,81 @@
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import viya4_troubleshooting_web_v4 as portal
+
+
+@pytest.fixture
+def graph(monkeypatch):
+    """A fresh service and a setter for the dependency graph; substeps not named depend on nothing."""
+    service = f"graph-{uuid.uuid4()}"
+    portal.task_results[service] = {'substep_running': [False] * len(portal.SUBSTEPS),
+                                    'substep_completed': [False] * len(portal.SUBSTEPS)}
+    monkeypatch.setattr(portal, "publish_task_update", lambda service: None)
+
+    def set_dependencies(**dependencies):
+        monkeypatch.setattr(portal, "SUBSTEP_DEPENDENCIES", {substep: dependencies.get(substep, ()) for substep in portal.SUBSTEPS})
+    set_dependencies()
+    yield service, set_dependencies
+    portal.task_results.pop(service, None)
+
+
+def run_graph(service, substep_functions):
+    """Run the graph in a thread, so that a graph that never finishes fails the test instead of hanging it."""
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(portal.run_substep_graph, service, substep_functions, ()).result(timeout=10)
+
+
+def test_independent_substeps_run_concurrently(graph):
+    service, _ = graph
+    # Every substep waits for all the others to have started
+    barrier = threading.Barrier(len(portal.SUBSTEPS), timeout=5)
+    run_graph(service, {substep: lambda: barrier.wait() for substep in portal.SUBSTEPS})
+    assert portal.task_results[service]['substep_completed'] == [True] * len(portal.SUBSTEPS)
+    assert portal.task_results[service]['substep_running'] == [False] * len(portal.SUBSTEPS)
+
+
+def test_substeps_start_after_their_dependencies(graph):
+    service, set_dependencies = graph
+    set_dependencies(sas_readiness_check=('list_pods',), pod_resource_utilization=('sas_readiness_check', 'check_pods_for_errors'))
+    flags = {}
+
+    def record(substep):
+        def substep_function():
+            state = portal.task_results[service]
+            flags[substep] = [name for name, completed in zip(portal.SUBSTEPS, state['substep_completed']) if completed]
+            assert state['substep_running'][portal.SUBSTEPS.index(substep)]
+        return substep_function
+    run_graph(service, {substep: record(substep) for substep in portal.SUBSTEPS})
+    assert 'list_pods' in flags['sas_readiness_check']
+    assert {'list_pods', 'sas_readiness_check', 'check_pods_for_errors'} <= set(flags['pod_resource_utilization'])
+    assert portal.task_results[service]['substep_completed'] == [True] * len(portal.SUBSTEPS)
+
+
+def test_failed_substep_stops_new_starts(graph):
+    service, set_dependencies = graph
+    set_dependencies(sas_readiness_check=('list_pods',), check_pods_for_errors=('sas_readiness_check',))
+    started = []
+
+    def substep_function(substep):
+        def run():
+            started.append(substep)
+            if substep == 'list_pods':
+                raise ValueError("no pods")
+        return run
+    with pytest.raises(ValueError, match="no pods"):
+        run_graph(service, {substep: substep_function(substep) for substep in portal.SUBSTEPS})
+    assert not {'sas_readiness_check', 'check_pods_for_errors'} & set(started)
+    completed = dict(zip(portal.SUBSTEPS, portal.task_results[service]['substep_completed']))
+    assert not completed['list_pods'] and not completed['sas_readiness_check']
+    assert completed['node_resource_utilization']
+    assert portal.task_results[service]['substep_running'] == [False] * len(portal.SUBSTEPS)
+
+
+def test_unresolvable_dependencies_raise(graph):
+    service, set_dependencies = graph
+    set_dependencies(list_pods=('sas_readiness_check',), sas_readiness_check=('list_pods',))
+    with pytest.raises(RuntimeError, match="Unresolvable substep dependencies"):
+        run_graph(service, {substep: lambda: None for substep in portal.SUBSTEPS})
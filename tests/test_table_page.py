@@ -0,0 +1,53 @@
+import viya4_troubleshooting_web_v4 as portal
+
+HTML_DATA = {
+    'pods': {
+        'headers': ["NAME", "READY", "STATUS", "RESTARTS", "AGE"],
+        'rows': [["sas-arke-0", "1/1", "Running", "0", "3d4h"],
+                 ["sas-files-1", "0/1", "CrashLoopBackOff", "12", "45m"],
+                 ["sas-logon-app-2", "1/1", "Running", "2", "1y2d"],
+                 ["sas-readiness-3", "1/1", "Running", "10", "90s"]]
+    },
+    'pod_resources': {
+        'headers': ["POD", "CPU", "MEMORY", "CPU LIMIT", "MEMORY LIMIT", "CPU %", "MEMORY %"],
+        'rows': [[["sas-arke-0", "900m", "1Gi", "1", "2Gi", "90%", "50%"], True, None],
+                 [["sas-files-1", "20m", "512Mi", "1", "2Gi", "2%", "25%"], False, None]]
+    }
+}
+
+
+def names(page):
+    return [row['cells'][0] for row in page['rows']]
+
+
+def test_sorts_ages_by_duration():
+    page = portal.table_page(HTML_DATA, 'pods', sort="AGE")
+    assert names(page) == ["sas-readiness-3", "sas-files-1", "sas-arke-0", "sas-logon-app-2"]
+
+
+def test_sorts_numbers_by_value_descending():
+    page = portal.table_page(HTML_DATA, 'pods', sort="RESTARTS", order='desc')
+    assert names(page) == ["sas-files-1", "sas-readiness-3", "sas-logon-app-2", "sas-arke-0"]
+
+
+def test_pages_a_partial_sort():
+    page = portal.table_page(HTML_DATA, 'pods', offset=1, limit=2, sort="RESTARTS")
+    assert names(page) == ["sas-logon-app-2", "sas-readiness-3"]
+    assert (page['total'], page['offset'], page['limit']) == (4, 1, 2)
+
+
+def test_filters_before_paging():
+    page = portal.table_page(HTML_DATA, 'pods', text_filter="running", limit=2)
+    assert page['total'] == 3
+    assert names(page) == ["sas-arke-0", "sas-logon-app-2"]
+
+
+def test_unknown_sort_column_keeps_stored_order():
+    assert names(portal.table_page(HTML_DATA, 'pods', sort="NOPE")) == [row[0] for row in HTML_DATA['pods']['rows']]
+
+
+def test_keeps_high_usage_flags():
+    page = portal.table_page(HTML_DATA, 'pod_resources', sort="CPU", order='desc')
+    assert [(row['cells'][0], row['high_usage']) for row in page['rows']] == [("sas-arke-0", True), ("sas-files-1", False)]
+    assert page['high_usage_column'] == 6
+    assert page['title'] == "Pod Resources"
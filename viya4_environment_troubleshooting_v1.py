@@ -260,6 +260,10 @@ def list_nodes_and_utilization(namespace, html_data):
         print("Failed to list nodes. Ensure 'kubectl top' is supported and metrics-server is running.")
         html_data['nodes'] = {'headers': ["Message"], 'rows': [["Failed to list nodes"]]}
 
+# Memory quantity suffixes as multipliers to Gi
+MEMORY_UNITS_GI = {'Ki': 1024 ** -2, 'Mi': 1024 ** -1, 'Gi': 1, 'Ti': 1024,
+                   'k': 1e3 / 1024 ** 3, 'M': 1e6 / 1024 ** 3, 'G': 1e9 / 1024 ** 3, 'T': 1e12 / 1024 ** 3}
+
 def parse_resource_value(value, is_cpu=False):
     """Convert resource values to millicores for CPU or Gi for memory, handling whitespace."""
     if not value or value == "0":
@@ -269,88 +273,79 @@ def parse_resource_value(value, is_cpu=False):
         if is_cpu:
             if value.endswith('m'):
                 return float(value[:-1])
-            elif value.isdigit():
-                return float(value) * 1000
-        else:
-            if value.endswith('Ki'):
-                return float(value[:-2]) / (1024 * 1024)
-            elif value.endswith('Mi'):
-                return float(value[:-2]) / 1024
-            elif value.endswith('Gi'):
-                return float(value[:-2])
-            elif value.isdigit():
-                return float(value) / (1024 * 1024 * 1024)
-        return float(value)
+            return float(value) * 1000
+        if value[-2:] in MEMORY_UNITS_GI:
+            return float(value[:-2]) * MEMORY_UNITS_GI[value[-2:]]
+        if value[-1:] in MEMORY_UNITS_GI:
+            return float(value[:-1]) * MEMORY_UNITS_GI[value[-1:]]
+        return float(value) / (1024 * 1024 * 1024)
     except ValueError:
         print(f"Warning: Could not parse resource value '{value}'")
         return 0
 
+def pod_reserved_resources(pod):
+    """Requests and limits a scheduled pod reserves on its node, as 'kubectl describe node' accounts them."""
+    spec = pod.get('spec', {})
+    reserved = {}
+    for kind in ('requests', 'limits'):
+        for resource in ('cpu', 'memory'):
+            is_cpu = resource == 'cpu'
+            containers = sum(parse_resource_value(c.get('resources', {}).get(kind, {}).get(resource), is_cpu)
+                             for c in spec.get('containers', []))
+            init_containers = max((parse_resource_value(c.get('resources', {}).get(kind, {}).get(resource), is_cpu)
+                                   for c in spec.get('initContainers', [])), default=0)
+            overhead = parse_resource_value((spec.get('overhead') or {}).get(resource), is_cpu)
+            reserved[f"{resource}_{kind}"] = max(containers, init_containers) + overhead
+    return reserved
+
 def node_resource_utilization(namespace, html_data):
-    """List detailed node resource utilization (reserved resources) from kubectl describe node."""
+    """List detailed node resource utilization (reserved resources) from the node and pod objects of the cluster."""
     print(f"\n5. [📊] Node Resource Utilization (Reserved Resources)...")
     print("----------------------------------------")
     
-    node_output = run_command("kubectl get nodes --no-headers")
+    node_output = run_command("kubectl get nodes -o json")
     if not node_output:
         print("Failed to get node list.")
         html_data['resources'] = {'headers': ["Message"], 'rows': [["Failed to get node list"]]}
         return
+    pod_output = run_command("kubectl get pods -A -o json")
+    if not pod_output:
+        print("Failed to list pods across namespaces.")
+        html_data['resources'] = {'headers': ["Message"], 'rows': [["Failed to list pods"]]}
+        return
     
-    nodes = [line.split()[0] for line in node_output.split('\n') if line.strip()]
+    nodes = json.loads(node_output).get('items', [])
+    pods = json.loads(pod_output).get('items', [])
     
     headers = ["Node", "Allocatable CPU", "CPU Requests", "CPU Req %", "CPU Limits", "CPU Lim %", "CPU Remaining", 
                "Allocatable Memory", "Memory Requests", "Memory Req %", "Memory Limits", "Memory Lim %", "Memory Remaining"]
     table_data = []
     
-    for node in nodes:
-        describe_output = run_command(f"kubectl describe node {node}")
-        if not describe_output:
-            print(f"Failed to describe node '{node}'.")
+    # Sum what every non-terminated pod reserves, grouped by the node it is scheduled on
+    allocated = {}
+    for pod in pods:
+        node = pod.get('spec', {}).get('nodeName')
+        if not node or pod.get('status', {}).get('phase') in ('Succeeded', 'Failed'):
             continue
+        totals = allocated.setdefault(node, {'cpu_requests': 0, 'cpu_limits': 0, 'memory_requests': 0, 'memory_limits': 0})
+        for key, value in pod_reserved_resources(pod).items():
+            totals[key] += value
+    
+    for node_obj in nodes:
+        node = node_obj['metadata']['name']
+        allocatable = node_obj.get('status', {}).get('allocatable', {})
+        totals = allocated.get(node, {'cpu_requests': 0, 'cpu_limits': 0, 'memory_requests': 0, 'memory_limits': 0})
         
-        allocatable = {}
-        allocated = {'cpu': {'requests': 0, 'limits': 0}, 'memory': {'requests': 0, 'limits': 0}}
-        
-        lines = describe_output.split('\n')
-        in_allocatable = False
-        in_allocated = False
-        
-        for line in lines:
-            line = line.strip()
-            if line.startswith("Allocatable:"):
-                in_allocatable = True
-                continue
-            elif line.startswith("Allocated resources:"):
-                in_allocatable = False
-                in_allocated = True
-                continue
-            elif line and "Events:" in line:
-                in_allocated = False
-                continue
-            
-            if in_allocatable and ':' in line:
-                key, value = [x.strip() for x in line.split(':', 1)]
-                if key in ['cpu', 'memory']:
-                    allocatable[key] = parse_resource_value(value, is_cpu=(key == 'cpu'))
-            
-            if in_allocated and line and not line.startswith(('(', 'Resource', '----')):
-                match = re.match(r'(\w+)\s+(\d+(?:m|[KMG]i)?)\s*\((\d+)%\)\s+(\d+(?:m|[KMG]i)?)\s*\((\d+)%\)', line)
-                if match:
-                    resource, req_val, req_pct, lim_val, lim_pct = match.groups()
-                    if resource in ['cpu', 'memory']:
-                        allocated[resource]['requests'] = parse_resource_value(req_val, is_cpu=(resource == 'cpu'))
-                        allocated[resource]['limits'] = parse_resource_value(lim_val, is_cpu=(resource == 'cpu'))
-        
-        alloc_cpu = allocatable.get('cpu', 0)
-        req_cpu = allocated['cpu']['requests']
-        lim_cpu = allocated['cpu']['limits']
+        alloc_cpu = parse_resource_value(allocatable.get('cpu'), is_cpu=True)
+        req_cpu = totals['cpu_requests']
+        lim_cpu = totals['cpu_limits']
         remaining_cpu = alloc_cpu - req_cpu
         req_percent_cpu = float(req_cpu / alloc_cpu * 100) if alloc_cpu else 0
         lim_percent_cpu = float(lim_cpu / alloc_cpu * 100) if alloc_cpu else 0
         
-        alloc_mem = allocatable.get('memory', 0)
-        req_mem = allocated['memory']['requests']
-        lim_mem = allocated['memory']['limits']
+        alloc_mem = parse_resource_value(allocatable.get('memory'))
+        req_mem = totals['memory_requests']
+        lim_mem = totals['memory_limits']
         remaining_mem = alloc_mem - req_mem
         req_percent_mem = float(req_mem / alloc_mem * 100) if alloc_mem else 0
         lim_percent_mem = float(lim_mem / alloc_mem * 100) if alloc_mem else 0
@@ -528,88 +523,80 @@ def pod_resource_utilization(namespace, html_data):
     print_table(headers, [row for row, _, _ in table_data])
     html_data['pod_resources'] = {'headers': headers, 'rows': table_data}
 
+def iter_html(html_data):
+    """Yield the report body section by section and row by row."""
+    yield "<h2>List All Pods in the Namespace</h2>\n"
+    if 'pods' in html_data:
+        yield "<table>\n<tr>" + "".join(f"<th>{h}</th>" for h in html_data['pods']['headers']) + "</tr>\n"
+        for row in html_data['pods']['rows']:
+            yield "<tr>" + "".join(f"<td>{cell}</td>" for cell in row) + "</tr>\n"
+        yield "</table>\n"
+
+    yield "<h2>SAS Readiness Check</h2>\n"
+    if 'readiness' in html_data:
+        yield f"<pre>{html_data['readiness']}</pre>\n"
+
+    yield "<h2>List Nodes and Their Utilization (Overview)</h2>\n"
+    if 'nodes' in html_data:
+        yield "<table>\n<tr>" + "".join(f"<th>{h}</th>" for h in html_data['nodes']['headers']) + "</tr>\n"
+        for row in html_data['nodes']['rows']:
+            yield "<tr>" + "".join(f"<td>{cell}</td>" for cell in row) + "</tr>\n"
+        yield "</table>\n"
+
+    yield "<h2>Node Resource Utilization (Reserved Resources)</h2>\n"
+    if 'resources' in html_data:
+        yield "<table>\n<tr>" + "".join(f"<th>{h}</th>" for h in html_data['resources']['headers']) + "</tr>\n"
+        for row, req_high, _ in html_data['resources']['rows']:
+            # Memory Req % (index 9) is highlighted when high
+            yield "<tr>" + "".join(f'<td class="high-usage">{cell}</td>' if i == 9 and req_high else f"<td>{cell}</td>"
+                                   for i, cell in enumerate(row)) + "</tr>\n"
+        yield "</table>\n"
+
+    yield "<h2>Check Pods for Errors</h2>\n"
+    if 'errors' in html_data:
+        yield "<pre>\n"
+        first_pod = True
+        prev_pod = None
+        for row in html_data['errors']['rows']:
+            pod_name = row[0]
+            level = row[3]
+            message = row[4]
+            if pod_name and pod_name != prev_pod:
+                if not first_pod:
+                    yield "\n"
+                yield f"Pod name: {pod_name}\n----------\n"
+                prev_pod = pod_name
+                first_pod = False
+            if message and "All pods checked" not in message:
+                yield f"{level}: {message}\n"
+            elif "All pods checked" in message:
+                yield f"{message}\n"
+        yield "</pre>\n"
+
+    yield "<h2>Pod Resource Utilization (Actual vs Limits)</h2>\n"
+    if 'pod_resources' in html_data:
+        yield "<table>\n<tr>" + "".join(f"<th>{h}</th>" for h in html_data['pod_resources']['headers']) + "</tr>\n"
+        for row, lim_high, _ in html_data['pod_resources']['rows']:
+            # Mem Lim % (index 6) is highlighted when high
+            yield "<tr>" + "".join(f'<td class="high-usage">{cell}</td>' if i == 6 and lim_high else f"<td>{cell}</td>"
+                                   for i, cell in enumerate(row)) + "</tr>\n"
+        yield "</table>\n"
+
 def generate_html(namespace, html_data):
-    """Generate and save the HTML report."""
+    """Generate and save the HTML report, writing it to the file chunk by chunk."""
     try:
         print("Generating HTML content...")
-        content = ""
-        
-        content += "<h2>List All Pods in the Namespace</h2>\n"
-        if 'pods' in html_data:
-            content += "<table>\n<tr>" + "".join(f"<th>{h}</th>" for h in html_data['pods']['headers']) + "</tr>\n"
-            for row in html_data['pods']['rows']:
-                content += "<tr>" + "".join(f"<td>{cell}</td>" for cell in row) + "</tr>\n"
-            content += "</table>\n"
-        
-        content += "<h2>SAS Readiness Check</h2>\n"
-        if 'readiness' in html_data:
-            content += f"<pre>{html_data['readiness']}</pre>\n"
-        
-        content += "<h2>List Nodes and Their Utilization (Overview)</h2>\n"
-        if 'nodes' in html_data:
-            content += "<table>\n<tr>" + "".join(f"<th>{h}</th>" for h in html_data['nodes']['headers']) + "</tr>\n"
-            for row in html_data['nodes']['rows']:
-                content += "<tr>" + "".join(f"<td>{cell}</td>" for cell in row) + "</tr>\n"
-            content += "</table>\n"
-        
-        content += "<h2>Node Resource Utilization (Reserved Resources)</h2>\n"
-        if 'resources' in html_data:
-            content += "<table>\n<tr>" + "".join(f"<th>{h}</th>" for h in html_data['resources']['headers']) + "</tr>\n"
-            for row, req_high, _ in html_data['resources']['rows']:
-                content += "<tr>"
-                for i, cell in enumerate(row):
-                    class_attr = ""
-                    if i == 9 and req_high:  # Memory Req %
-                        class_attr = ' class="high-usage"'
-                    content += f"<td{class_attr}>{cell}</td>"
-                content += "</tr>\n"
-            content += "</table>\n"
-        
-        content += "<h2>Check Pods for Errors</h2>\n"
-        if 'errors' in html_data:
-            content += "<pre>\n"
-            first_pod = True
-            prev_pod = None
-            for row in html_data['errors']['rows']:
-                pod_name = row[0]
-                level = row[3]
-                message = row[4]
-                if pod_name and pod_name != prev_pod:
-                    if not first_pod:
-                        content += "\n"
-                    content += f"Pod name: {pod_name}\n----------\n"
-                    prev_pod = pod_name
-                    first_pod = False
-                if message and "All pods checked" not in message:
-                    content += f"{level}: {message}\n"
-                elif "All pods checked" in message:
-                    content += f"{message}\n"
-                if pod_name and pod_name != prev_pod:
-                    content += "----------------------------------------\n"
-            content += "</pre>\n"
-        
-        content += "<h2>Pod Resource Utilization (Actual vs Limits)</h2>\n"
-        if 'pod_resources' in html_data:
-            content += "<table>\n<tr>" + "".join(f"<th>{h}</th>" for h in html_data['pod_resources']['headers']) + "</tr>\n"
-            for row, lim_high, _ in html_data['pod_resources']['rows']:
-                content += "<tr>"
-                for i, cell in enumerate(row):
-                    class_attr = ""
-                    if i == 6 and lim_high:  # Mem Lim % (index 6)
-                        class_attr = ' class="high-usage"'
-                    content += f"<td{class_attr}>{cell}</td>"
-                content += "</tr>\n"
-            content += "</table>\n"
-        
         timestamp = datetime.now().strftime("%Y-%m-d %H:%M:%S")
         dt_for_path = datetime.now().strftime("%Y%m%d_%H%M%S")
         report_dir = os.path.expanduser(f"~/viya4/k8s_troubleshoot/{namespace}/{dt_for_path}")
         os.makedirs(report_dir, exist_ok=True)
         report_path = f"{report_dir}/sas_viya_report_{namespace}_{dt_for_path}.html"
         
-        html_content = HTML_HEAD.format(namespace=namespace, timestamp=timestamp) + content + HTML_FOOT
         with open(report_path, "w", encoding="utf-8") as f:
-            f.write(html_content)
+            f.write(HTML_HEAD.format(namespace=namespace, timestamp=timestamp))
+            for chunk in iter_html(html_data):
+                f.write(chunk)
+            f.write(HTML_FOOT)
         print(f"\nHTML report generated: {report_path}")
     except Exception as e:
         import traceback
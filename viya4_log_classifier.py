@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""ERROR/WARN log classification and signature hashing for the troubleshooting portal.
+
+Kept free of side effects on import, so the log process pool of viya4_troubleshooting_web_v4 can run it
+in worker processes without loading the web application.
+"""
+import os
+import re
+import json
+import hashlib
+import signal
+
+# Distinct error signatures tracked per container (bounds memory)
+LOG_SCAN_MAX_SIGNATURES = int(os.environ.get("LOG_SCAN_MAX_SIGNATURES", "500"))
+
+# Variable tokens masked out of a message before it is hashed into a signature
+SIGNATURE_MASK = re.compile(
+    r"(?P<ts>\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|\s?[+-]\d{2}:?\d{2})?)"
+    r"|(?P<uuid>\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b)"
+    r"|(?P<ip>\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b)"
+    r"|(?P<hex>\b(?:0x)?(?=[0-9a-fA-F]*\d)[0-9a-fA-F]{8,}\b)"
+    r"|(?P<num>\b\d+(?:\.\d+)?\b)"
+)
+
+def classify_log_line(line, valid_levels=("error", "warn")):
+    """Return (message, level) for an ERROR/WARN log line in JSON or SAS text format, otherwise None."""
+    lowered = line.lower()
+    if "error" not in lowered and "warn" not in lowered:
+        return None
+    try:
+        log_entry = json.loads(line)
+        level = log_entry.get("level", "").lower()
+        if level in valid_levels:
+            return f"[{log_entry.get('source', '')}] - {log_entry.get('message', '')}", level
+    except (json.JSONDecodeError, AttributeError):
+        match = re.match(r"(ERROR|WARN) (\d{4}-\d{2}-\d{2}) (\d{2}:\d{2}:\d{2}\.\d+ [+-]\d{4}) \[([^\]]+)\] - (.+)", line)
+        if match:
+            level, _, _, context, message = match.groups()
+            if level.lower() in valid_levels:
+                return f"[{context}] - {message}", level.lower()
+    return None
+
+def message_signature(level, message):
+    """Hash of the message with UUIDs, timestamps, addresses and numbers masked, so variants of one problem match."""
+    template = SIGNATURE_MASK.sub(lambda m: f"<{m.lastgroup.upper()}>", message)
+    return hashlib.sha1(f"{level}|{template}".encode('utf-8')).hexdigest()[:12]
+
+# Key of the entry summing up the signatures dropped once LOG_SCAN_MAX_SIGNATURES are tracked
+OVERFLOW_SIGNATURE = "untracked"
+
+def tracked_signatures(signatures):
+    return len(signatures) - (OVERFLOW_SIGNATURE in signatures)
+
+def record_overflow(signatures, dropped, count, first_seen, last_seen):
+    """Count occurrences of dropped signatures; up to LOG_SCAN_MAX_SIGNATURES of their hashes are kept for a tally."""
+    overflow = signatures.get(OVERFLOW_SIGNATURE)
+    if overflow is None:
+        signatures[OVERFLOW_SIGNATURE] = {'level': 'untracked', 'count': count, 'first_seen': first_seen, 'last_seen': last_seen,
+                                          'example': '', 'signatures': frozenset(list(dropped)[:LOG_SCAN_MAX_SIGNATURES])}
+        return
+    overflow['count'] += count
+    overflow['first_seen'] = min(overflow['first_seen'], first_seen)
+    overflow['last_seen'] = max(overflow['last_seen'], last_seen)
+    if len(overflow['signatures']) < LOG_SCAN_MAX_SIGNATURES:
+        # Replaced rather than updated, since copies of the entry share the set
+        overflow['signatures'] = frozenset(list(overflow['signatures'] | frozenset(dropped))[:LOG_SCAN_MAX_SIGNATURES])
+
+def merge_signatures(target, source):
+    """Fold signature statistics from source into target, keeping the example of the earliest occurrence.
+
+    Signatures that do not fit under LOG_SCAN_MAX_SIGNATURES are counted in the OVERFLOW_SIGNATURE entry.
+    """
+    for signature, stats in source.items():
+        if signature == OVERFLOW_SIGNATURE:
+            record_overflow(target, stats['signatures'], stats['count'], stats['first_seen'], stats['last_seen'])
+            continue
+        current = target.get(signature)
+        if current is None:
+            if tracked_signatures(target) < LOG_SCAN_MAX_SIGNATURES:
+                target[signature] = dict(stats)
+            else:
+                record_overflow(target, (signature,), stats['count'], stats['first_seen'], stats['last_seen'])
+            continue
+        if stats['first_seen'] < current['first_seen']:
+            current['example'] = stats['example']
+        current['count'] += stats['count']
+        current['first_seen'] = min(current['first_seen'], stats['first_seen'])
+        current['last_seen'] = max(current['last_seen'], stats['last_seen'])
+    return target
+
+def classify_log_lines(lines, signatures=None):
+    """Accumulate ERROR/WARN signatures of `kubectl logs --timestamps` lines in a single pass.
+
+    Each signature keeps its level, occurrence count, first and last timestamp and the first message seen.
+    Signatures beyond LOG_SCAN_MAX_SIGNATURES are counted in the OVERFLOW_SIGNATURE entry.
+    """
+    signatures = {} if signatures is None else signatures
+    for line in lines:
+        timestamp, _, text = line.partition(' ')
+        classified = classify_log_line(text)
+        if not classified:
+            continue
+        message, level = classified
+        seen_at = timestamp[:19].replace('T', ' ')
+        signature = message_signature(level, message)
+        stats = signatures.get(signature)
+        if stats is not None:
+            stats['count'] += 1
+            stats['last_seen'] = max(stats['last_seen'], seen_at)
+        elif tracked_signatures(signatures) < LOG_SCAN_MAX_SIGNATURES:
+            signatures[signature] = {'level': level, 'count': 1, 'first_seen': seen_at, 'last_seen': seen_at, 'example': message}
+        else:
+            record_overflow(signatures, (signature,), 1, seen_at, seen_at)
+    return signatures
+
+def classify_log_chunk(chunk):
+    """Signatures of a newline-joined block of log lines; runs in the log process pool."""
+    return classify_log_lines(chunk.split('\n'))
+
+def init_worker(max_signatures):
+    """Initializer of the log process pool: use the parent's signature limit and leave Ctrl-C to the parent."""
+    global LOG_SCAN_MAX_SIGNATURES
+    LOG_SCAN_MAX_SIGNATURES = max_signatures
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
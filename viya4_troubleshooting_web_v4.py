@@ -4,19 +4,37 @@ import sys
 import os
 import re
 import json
-from datetime import datetime
+from datetime import datetime, timezone
 import requests
-from flask import Flask, request, render_template_string, redirect, url_for, session, send_file, jsonify, Response
+from flask import Flask, request, render_template_string, stream_template_string, redirect, url_for, session, send_file, jsonify, Response
 import shutil
 import logging
 import shlex
-import psutil
 import time
-from io import StringIO, BytesIO
+import threading
+import signal
+import multiprocessing
+import hashlib
+import select
+import atexit
+import sqlite3
+import gzip
+import tempfile
+import fcntl
+import heapq
+import random
+import base64
+import socket
+import http.client
+from io import StringIO
 import pandas as pd
 from flask_session import Session
-from concurrent.futures import ThreadPoolExecutor
-from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from collections import defaultdict, deque
+from contextlib import closing, contextmanager, ExitStack
+from urllib.parse import urlencode
+import viya4_log_classifier
+from viya4_log_classifier import LOG_SCAN_MAX_SIGNATURES, OVERFLOW_SIGNATURE, classify_log_lines, classify_log_chunk, merge_signatures
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -28,7 +46,6 @@ GITHUB_BRANCH = "main"
 VERSION_FILE = "latest_version.txt"
 
 app = Flask(__name__)
-app.secret_key = os.urandom(24)
 
 # Configure server-side session storage
 app.config['SESSION_TYPE'] = 'filesystem'
@@ -40,9 +57,51 @@ Session(app)
 if not os.path.exists(app.config['SESSION_FILE_DIR']):
     os.makedirs(app.config['SESSION_FILE_DIR'])
 
+# Completed runs are kept in a SQLite database under the portal's data directory
+PORTAL_DATA_DIR = os.environ.get("PORTAL_DATA_DIR", os.path.join(os.path.expanduser("~"), ".viya4_portal"))
+RUN_STORE_PATH = os.path.join(PORTAL_DATA_DIR, "runs.db")
+RUN_STORE_MAX_RUNS = int(os.environ.get("RUN_STORE_MAX_RUNS", "200"))
+RECENT_RUNS_LIMIT = int(os.environ.get("RECENT_RUNS_LIMIT", "20"))
+REPORT_ARCHIVE_DIR = os.path.join(PORTAL_DATA_DIR, "reports")
+# The data directory holds the run store, the secret key and the scheduler lock: keep it private to the portal's user
+os.makedirs(PORTAL_DATA_DIR, mode=0o700, exist_ok=True)
+if os.stat(PORTAL_DATA_DIR).st_uid != os.getuid():
+    raise RuntimeError(f"Portal data directory {PORTAL_DATA_DIR} is not owned by the current user")
+os.makedirs(REPORT_ARCHIVE_DIR, mode=0o700, exist_ok=True)
+
+def portal_secret_key():
+    """PORTAL_SECRET_KEY, or a random key kept in the data directory so all workers and restarts share it.
+
+    A key file that another user owns or could read or write is refused rather than trusted.
+    """
+    if os.environ.get("PORTAL_SECRET_KEY"):
+        return os.environ["PORTAL_SECRET_KEY"]
+    path = os.path.join(PORTAL_DATA_DIR, "secret_key")
+    if not os.path.exists(path):
+        # Publish the key with a hard link so concurrently starting workers all end up reading the same one
+        fd, tmp_path = tempfile.mkstemp(dir=PORTAL_DATA_DIR)
+        with os.fdopen(fd, 'wb') as tmp_file:
+            tmp_file.write(os.urandom(24))
+        try:
+            os.link(tmp_path, path)
+        except FileExistsError:
+            pass
+        finally:
+            os.unlink(tmp_path)
+    fd = os.open(path, os.O_RDONLY | os.O_NOFOLLOW)
+    with os.fdopen(fd, 'rb') as key_file:
+        key_stat = os.fstat(key_file.fileno())
+        if key_stat.st_uid != os.getuid() or key_stat.st_mode & 0o077:
+            raise RuntimeError(f"Refusing the secret key in {path}: it must be owned by the current user with mode 0600, "
+                               f"or set PORTAL_SECRET_KEY")
+        return key_file.read()
+
+app.secret_key = portal_secret_key()
+
 SERVICES = ["NSE_VML_VIYA4_DEV", "NSE_VML_VIYA4_PROD", "TDG_VDS_VIYA4_Prod", "TDG_VDS_VIYA4_Test", "GFB_ALM_VIYA4_Prod", "GFB_ALM_VIYA4_Test"]
 
-executor = ThreadPoolExecutor(max_workers=6)
+# Background credential refreshes; health-check runs go through job_queue
+executor = ThreadPoolExecutor(max_workers=2)
 task_results = defaultdict(dict)
 
 # Group services by TLA
@@ -374,11 +433,52 @@ HTML_TEMPLATE = """
             background-color: #e74c3c;
             color: white;
         }
+        .result-content th.sortable {
+            cursor: pointer;
+        }
+        .fleet table {
+            width: 100%;
+            border-collapse: collapse;
+            margin: 20px 0;
+        }
+        .fleet th, .fleet td {
+            padding: 8px 10px;
+            text-align: left;
+            border: 1px solid #ddd;
+        }
+        .fleet th {
+            background-color: #3498db;
+            color: white;
+        }
+        .fleet .fleet-button {
+            padding: 5px 10px;
+            margin-right: 5px;
+            cursor: pointer;
+        }
+        .fleet .status-pass {
+            color: #27ae60;
+            font-weight: bold;
+        }
+        .fleet .status-fail {
+            color: #e74c3c;
+            font-weight: bold;
+        }
+        .result-content .table-controls {
+            display: flex;
+            align-items: center;
+            gap: 10px;
+        }
     {% endraw %}
     </style>
     <script>
         // Store intervals for polling each service
         const pollingIntervals = {};
+        // Store event streams for each running service
+        const eventSources = {};
+        // Last known /status fields of each service, updated from versioned deltas
+        const statusState = {};
+        // Page, sort and filter of each Result tab table, per service and section
+        const resultTables = {};
 
         function toggleTlaGroup(tla) {
             const serviceList = document.getElementById('service-list-' + tla);
@@ -490,8 +590,8 @@ HTML_TEMPLATE = """
                     lastRunCell.innerHTML = new Date().toLocaleString();
                     actionButton.disabled = false; // Re-enable the button on failure
                 } else {
-                    // Start polling for this service
-                    pollStatus(serviceName);
+                    // Follow progress of this service
+                    watchStatus(serviceName);
                 }
             })
             .catch(error => {
@@ -502,6 +602,113 @@ HTML_TEMPLATE = """
             });
         }
 
+        function cancelHealthCheck(serviceName) {
+            fetch('/cancel', {
+                method: 'POST',
+                headers: {'Content-Type': 'application/x-www-form-urlencoded'},
+                body: new URLSearchParams({'service': serviceName})
+            })
+            .then(response => response.json())
+            .then(data => {
+                if (!data.success) {
+                    alert(data.message);
+                }
+            })
+            .catch(error => console.error('Cancel error for ' + serviceName + ':', error));
+        }
+
+        function applyStatus(serviceName, data) {
+            const statusCell = document.getElementById('status-' + serviceName);
+            const lastRunCell = document.getElementById('last-run-' + serviceName);
+            const actionButton = document.getElementById('action-button-' + serviceName);
+            statusCell.innerHTML = `<span class="status-${data.status.toLowerCase()}">${data.status}</span>`;
+            if (data.last_run !== undefined) {
+                lastRunCell.innerHTML = data.last_run;
+            }
+
+            // Update Manual Run tab
+            if (data.queue_position) {
+                document.getElementById('login-status-' + serviceName).innerHTML = `<span class="spinner"></span> Queued (position ${data.queue_position})`;
+            } else if (data.login_running) {
+                document.getElementById('login-status-' + serviceName).innerHTML = '<span class="spinner"></span> Logging in...';
+            } else if (data.login_completed) {
+                document.getElementById('login-status-' + serviceName).innerHTML = '<span class="tick">✅</span> Success';
+                if (data.troubleshoot_running) {
+                    document.getElementById('troubleshoot-status-' + serviceName).innerHTML = '<span class="spinner"></span> Running...';
+                    const substeps = ['List Pods', 'SAS Readiness Check', 'List Nodes', 'Node Utilization', 'Check Errors', 'Pod Utilization'];
+                    for (let i = 0; i < 6; i++) {
+                        if (data.substep_completed[i]) {
+                            document.getElementById('substep-' + serviceName + '-' + i).innerHTML = '<span class="tick">✅</span> ' + substeps[i];
+                        } else if (data.substep_running[i]) {
+                            document.getElementById('substep-' + serviceName + '-' + i).innerHTML = '<span class="spinner"></span> ' + substeps[i];
+                        } else {
+                            document.getElementById('substep-' + serviceName + '-' + i).innerHTML = 'Waiting...';
+                        }
+                    }
+                } else if (data.troubleshoot_completed) {
+                    document.getElementById('troubleshoot-status-' + serviceName).innerHTML = '<span class="tick">✅</span> Completed';
+                    document.getElementById('download-report-' + serviceName).innerHTML = `
+                        <a href="#" onclick="downloadReport('${serviceName}');" class="download-button">Download Report</a>
+                    `;
+                    const substeps = ['List Pods', 'SAS Readiness Check', 'List Nodes', 'Node Utilization', 'Check Errors', 'Pod Utilization'];
+                    for (let i = 0; i < 6; i++) {
+                        document.getElementById('substep-' + serviceName + '-' + i).innerHTML = '<span class="tick">✅</span> ' + substeps[i];
+                    }
+                }
+            } else if (data.login_failed) {
+                document.getElementById('login-status-' + serviceName).innerHTML = '<span class="cross">❌</span> Failed: ' + data.login_message;
+            }
+
+            // Update Result tab (event stream messages carry no run)
+            const resultContent = document.getElementById('content-result-' + serviceName);
+            if (resultContent && data.run_id !== undefined) {
+                loadResults(serviceName, data.run_id);
+            }
+
+            // Update Recent Activity tab
+            const recentActivityTableBody = document.querySelector('#content-recent-activity-' + serviceName + ' tbody');
+            if (recentActivityTableBody && data.past_runs !== undefined) {
+                let html = '';
+                if (data.past_runs.length > 0) {
+                    data.past_runs.forEach(run => {
+                        html += `
+                            <tr>
+                                <td>${run.timestamp}${run.trigger && run.trigger !== 'manual' ? ' (' + run.trigger + ')' : ''}</td>
+                                <td>
+                                    <a href="#" onclick="downloadPastReport('${serviceName}', '${run.timestamp}');" class="download-button">Download Report</a>
+                                </td>
+                            </tr>
+                        `;
+                    });
+                } else {
+                    html = '<tr><td colspan="2">No past runs available.</td></tr>';
+                }
+                recentActivityTableBody.innerHTML = html;
+            }
+
+            // Clean up when done
+            if (data.status === 'Completed' || data.status === 'Failed') {
+                actionButton.disabled = false; // Re-enable the button when done
+                const lastHealthCheck = document.getElementById('last-health-check-' + serviceName);
+                if (lastHealthCheck && data.last_run !== undefined) {
+                    lastHealthCheck.innerHTML = `Last Health Check (last run: ${data.last_run}): <span class="status-${data.status === 'Completed' ? 'pass' : 'fail'}">${data.status === 'Completed' ? 'PASS' : 'FAIL'}</span>`;
+                }
+            }
+        }
+
+        function fetchStatus(serviceName) {
+            // Ask only for fields changed after the known version; resolves to null when nothing changed
+            const known = statusState[serviceName];
+            const headers = known ? {'If-None-Match': `"${serviceName}-${known.version}"`} : {};
+            return fetch(`/status?service=${serviceName}&since=${known ? known.version : 0}`, {cache: 'no-store', headers: headers})
+                .then(response => response.status === 304 ? null : response.json().then(data => {
+                    // The Result tab run and past runs are applied only when they were sent
+                    const {run_id, past_runs, ...fields} = data;
+                    statusState[serviceName] = Object.assign(statusState[serviceName] || {}, fields);
+                    return Object.assign({}, statusState[serviceName], {run_id: run_id, past_runs: past_runs});
+                }));
+        }
+
         function pollStatus(serviceName) {
             // If already polling for this service, don't start a new interval
             if (pollingIntervals[serviceName]) {
@@ -509,82 +716,16 @@ HTML_TEMPLATE = """
             }
 
             let interval = setInterval(() => {
-                fetch(`/status?service=${serviceName}`)
-                    .then(response => response.json())
+                fetchStatus(serviceName)
                     .then(data => {
-                        const statusCell = document.getElementById('status-' + serviceName);
-                        const lastRunCell = document.getElementById('last-run-' + serviceName);
-                        const actionButton = document.getElementById('action-button-' + serviceName);
-                        statusCell.innerHTML = `<span class="status-${data.status.toLowerCase()}">${data.status}</span>`;
-                        lastRunCell.innerHTML = data.last_run;
-
-                        // Update Manual Run tab
-                        if (data.login_running) {
-                            document.getElementById('login-status-' + serviceName).innerHTML = '<span class="spinner"></span> Logging in...';
-                        } else if (data.login_completed) {
-                            document.getElementById('login-status-' + serviceName).innerHTML = '<span class="tick">✅</span> Success';
-                            if (data.troubleshoot_running) {
-                                document.getElementById('troubleshoot-status-' + serviceName).innerHTML = '<span class="spinner"></span> Running...';
-                                const substeps = ['List Pods', 'SAS Readiness Check', 'List Nodes', 'Node Utilization', 'Check Errors', 'Pod Utilization'];
-                                for (let i = 0; i < 6; i++) {
-                                    if (data.substep_completed[i]) {
-                                        document.getElementById('substep-' + serviceName + '-' + i).innerHTML = '<span class="tick">✅</span> ' + substeps[i];
-                                    } else if (data.substep_running[i]) {
-                                        document.getElementById('substep-' + serviceName + '-' + i).innerHTML = '<span class="spinner"></span> ' + substeps[i];
-                                    } else {
-                                        document.getElementById('substep-' + serviceName + '-' + i).innerHTML = 'Waiting...';
-                                    }
-                                }
-                            } else if (data.troubleshoot_completed) {
-                                document.getElementById('troubleshoot-status-' + serviceName).innerHTML = '<span class="tick">✅</span> Completed';
-                                document.getElementById('download-report-' + serviceName).innerHTML = `
-                                    <a href="#" onclick="downloadReport('${serviceName}');" class="download-button">Download Report</a>
-                                `;
-                                const substeps = ['List Pods', 'SAS Readiness Check', 'List Nodes', 'Node Utilization', 'Check Errors', 'Pod Utilization'];
-                                for (let i = 0; i < 6; i++) {
-                                    document.getElementById('substep-' + serviceName + '-' + i).innerHTML = '<span class="tick">✅</span> ' + substeps[i];
-                                }
-                            }
-                        } else if (data.login_failed) {
-                            document.getElementById('login-status-' + serviceName).innerHTML = '<span class="cross">❌</span> Failed: ' + data.login_message;
-                        }
-
-                        // Update Result tab
-                        const resultContent = document.getElementById('content-result-' + serviceName);
-                        if (resultContent) {
-                            resultContent.innerHTML = data.results;
-                        }
-
-                        // Update Recent Activity tab
-                        const recentActivityTableBody = document.querySelector('#content-recent-activity-' + serviceName + ' tbody');
-                        if (recentActivityTableBody) {
-                            let html = '';
-                            if (data.past_runs.length > 0) {
-                                data.past_runs.forEach(run => {
-                                    html += `
-                                        <tr>
-                                            <td>${run.timestamp}</td>
-                                            <td>
-                                                <a href="#" onclick="downloadPastReport('${serviceName}', '${run.timestamp}');" class="download-button">Download Report</a>
-                                            </td>
-                                        </tr>
-                                    `;
-                                });
-                            } else {
-                                html = '<tr><td colspan="2">No past runs available.</td></tr>';
-                            }
-                            recentActivityTableBody.innerHTML = html;
+                        if (!data) {
+                            return;
                         }
-
-                        // Stop polling and clean up when done
+                        applyStatus(serviceName, data);
+                        // Stop polling when done
                         if (data.status === 'Completed' || data.status === 'Failed') {
                             clearInterval(interval);
                             delete pollingIntervals[serviceName];
-                            actionButton.disabled = false; // Re-enable the button when done
-                            const lastHealthCheck = document.getElementById('last-health-check-' + serviceName);
-                            if (lastHealthCheck) {
-                                lastHealthCheck.innerHTML = `Last Health Check (last run: ${data.last_run}): <span class="status-${data.status === 'Completed' ? 'pass' : 'fail'}">${data.status === 'Completed' ? 'PASS' : 'FAIL'}</span>`;
-                            }
                         }
                     })
                     .catch(error => {
@@ -598,6 +739,221 @@ HTML_TEMPLATE = """
             pollingIntervals[serviceName] = interval;
         }
 
+        function watchStatus(serviceName) {
+            // Fall back to polling when the browser has no EventSource
+            if (!window.EventSource) {
+                pollStatus(serviceName);
+                return;
+            }
+            if (eventSources[serviceName]) {
+                return;
+            }
+            const source = new EventSource(`/events?service=${serviceName}`);
+            eventSources[serviceName] = source;
+            source.onmessage = event => applyStatus(serviceName, JSON.parse(event.data));
+            source.addEventListener('final', event => {
+                source.close();
+                delete eventSources[serviceName];
+                applyStatus(serviceName, JSON.parse(event.data));
+                // One /status call records the finished run and brings the results and past runs
+                fetchStatus(serviceName)
+                    .then(data => {
+                        if (!data) {
+                            return;
+                        }
+                        applyStatus(serviceName, data);
+                        if (data.status === 'Running') {
+                            pollStatus(serviceName);
+                        }
+                    })
+                    .catch(error => console.error('Error fetching status for ' + serviceName + ':', error));
+            });
+            source.onerror = () => {
+                source.close();
+                delete eventSources[serviceName];
+                pollStatus(serviceName);
+            };
+        }
+
+        function loadResults(serviceName, runId) {
+            const resultContent = document.getElementById('content-result-' + serviceName);
+            if (!resultContent) {
+                return;
+            }
+            resultTables[serviceName] = {};
+            if (!runId) {
+                resultContent.innerHTML = '<p>No results available.</p>';
+                return;
+            }
+            fetch(`/results/${runId}`)
+                .then(response => response.json())
+                .then(data => {
+                    resultContent.innerHTML = '';
+                    data.sections.forEach(section => {
+                        const title = document.createElement('h2');
+                        title.textContent = section.title;
+                        resultContent.appendChild(title);
+                        if (section.text !== undefined) {
+                            const pre = document.createElement('pre');
+                            pre.textContent = section.text;
+                            resultContent.appendChild(pre);
+                            return;
+                        }
+                        // Controls and table of the section; rows are fetched one page at a time
+                        const controls = document.createElement('div');
+                        controls.className = 'table-controls';
+                        controls.innerHTML = `
+                            <input type="text" placeholder="Filter rows...">
+                            <button class="prev">Previous</button>
+                            <span class="page-info"></span>
+                            <button class="next">Next</button>
+                        `;
+                        const table = document.createElement('table');
+                        table.id = `result-table-${serviceName}-${section.section}`;
+                        resultContent.appendChild(controls);
+                        resultContent.appendChild(table);
+                        const state = {runId: runId, offset: 0, limit: 50, sort: null, order: 'asc', filter: '', controls: controls, table: table};
+                        resultTables[serviceName][section.section] = state;
+                        let filterTimer = null;
+                        controls.querySelector('input').addEventListener('input', event => {
+                            clearTimeout(filterTimer);
+                            filterTimer = setTimeout(() => {
+                                state.filter = event.target.value;
+                                state.offset = 0;
+                                loadTablePage(serviceName, section.section);
+                            }, 300);
+                        });
+                        controls.querySelector('.prev').addEventListener('click', () => {
+                            state.offset = Math.max(state.offset - state.limit, 0);
+                            loadTablePage(serviceName, section.section);
+                        });
+                        controls.querySelector('.next').addEventListener('click', () => {
+                            state.offset += state.limit;
+                            loadTablePage(serviceName, section.section);
+                        });
+                        loadTablePage(serviceName, section.section);
+                    });
+                })
+                .catch(error => console.error('Error loading results for ' + serviceName + ':', error));
+        }
+
+        function loadTablePage(serviceName, section) {
+            const state = resultTables[serviceName][section];
+            const params = new URLSearchParams({offset: state.offset, limit: state.limit, order: state.order, filter: state.filter});
+            if (state.sort) {
+                params.set('sort', state.sort);
+            }
+            fetch(`/results/${state.runId}/${section}?${params}`)
+                .then(response => response.json())
+                .then(page => {
+                    state.table.innerHTML = '';
+                    const headerRow = state.table.insertRow();
+                    page.headers.forEach(header => {
+                        const th = document.createElement('th');
+                        th.className = 'sortable';
+                        th.textContent = header + (state.sort === header ? (state.order === 'asc' ? ' ▲' : ' ▼') : '');
+                        th.addEventListener('click', () => {
+                            state.order = state.sort === header && state.order === 'asc' ? 'desc' : 'asc';
+                            state.sort = header;
+                            state.offset = 0;
+                            loadTablePage(serviceName, section);
+                        });
+                        headerRow.appendChild(th);
+                    });
+                    page.rows.forEach(row => {
+                        const tr = state.table.insertRow();
+                        row.cells.forEach((cell, i) => {
+                            const td = tr.insertCell();
+                            td.textContent = cell;
+                            if (row.high_usage && i === page.high_usage_column) {
+                                td.className = 'high-usage';
+                            }
+                        });
+                    });
+                    const first = page.total ? page.offset + 1 : 0;
+                    const last = Math.min(page.offset + page.limit, page.total);
+                    state.controls.querySelector('.page-info').textContent = `Rows ${first}-${last} of ${page.total}`;
+                    state.controls.querySelector('.prev').disabled = page.offset === 0;
+                    state.controls.querySelector('.next').disabled = last >= page.total;
+                })
+                .catch(error => console.error('Error loading ' + section + ' for ' + serviceName + ':', error));
+        }
+
+        let fleetInterval = null;
+
+        function runFleet(tla) {
+            fetch('/run-all', {
+                method: 'POST',
+                headers: {'Content-Type': 'application/x-www-form-urlencoded'},
+                body: new URLSearchParams({'tla': tla})
+            })
+            .then(response => response.json())
+            .then(data => {
+                document.getElementById('fleet-info').textContent = data.message;
+                if (data.success) {
+                    pollFleet();
+                }
+            })
+            .catch(error => {
+                document.getElementById('fleet-info').textContent = 'Error: ' + error;
+            });
+        }
+
+        function renderFleet(fleet) {
+            const matrix = document.getElementById('fleet-matrix');
+            if (!matrix || !fleet) {
+                return;
+            }
+            const figure = value => value === null || value === undefined ? 'N/A' : value;
+            const percent = value => value === null || value === undefined ? 'N/A' : value.toFixed(1) + '%';
+            matrix.innerHTML = '';
+            Object.entries(fleet.services).forEach(([service, entry]) => {
+                const summary = entry.summary || {};
+                const row = matrix.insertRow();
+                const cells = [
+                    service,
+                    entry.status,
+                    entry.result || '',
+                    summary.pods === undefined ? 'N/A' : `${figure(summary.pods)} (${figure(summary.pods_not_ready)})`,
+                    percent(summary.max_cpu_req_pct),
+                    percent(summary.max_memory_req_pct),
+                    figure(summary.pods_high_memory),
+                    figure(summary.error_count),
+                    entry.finished || ''
+                ];
+                cells.forEach(value => {
+                    row.insertCell().textContent = value;
+                });
+                if (entry.result) {
+                    row.cells[2].className = entry.result === 'PASS' ? 'status-pass' : 'status-fail';
+                }
+                if (entry.message) {
+                    row.cells[1].title = entry.message;
+                }
+            });
+            document.getElementById('fleet-info').textContent = fleet.finished
+                ? `Fleet health check finished at ${fleet.finished}`
+                : `Fleet health check started at ${fleet.started} is running...`;
+        }
+
+        function pollFleet() {
+            if (fleetInterval) {
+                return;
+            }
+            const refresh = () => fetch('/fleet-status')
+                .then(response => response.json())
+                .then(data => {
+                    renderFleet(data.fleet);
+                    if (!data.fleet || data.fleet.finished) {
+                        clearInterval(fleetInterval);
+                        fleetInterval = null;
+                    }
+                })
+                .catch(error => console.error('Error fetching fleet status:', error));
+            refresh();
+            fleetInterval = setInterval(refresh, 3000); // Matrix fills in as results arrive
+        }
+
         function downloadReport(serviceName) {
             window.location.href = '/download-report?service=' + serviceName;
         }
@@ -606,25 +962,36 @@ HTML_TEMPLATE = """
             window.location.href = `/download-past-report?service=${serviceName}&timestamp=${timestamp}`;
         }
 
-        // Start polling for all services that are running on page load
+        // Follow all services that are running on page load
         document.addEventListener('DOMContentLoaded', function() {
             const selectedService = new URLSearchParams(window.location.search).get('service');
             if (selectedService) {
                 switchTab('manual-run', selectedService);
             }
+            {% if selected_service %}
+            loadResults(selectedService, {{ run_id | tojson }});
+            {% else %}
+            pollFleet();
+            {% endif %}
 
-            // Start polling for all services that are in "Running" state
-            const services = {{ services | tojson }};
-            services.forEach(service => {
-                fetch(`/status?service=${service}`)
-                    .then(response => response.json())
-                    .then(data => {
-                        if (data.status === 'Running') {
-                            pollStatus(service);
+            // Fill in cluster metadata that was not cached yet when the page was rendered
+            {% if metadata_pending %}
+            fetch(`/metadata?service=${selectedService}`)
+                .then(response => response.json())
+                .then(data => {
+                    Object.entries(data).forEach(([field, value]) => {
+                        const element = document.getElementById('meta-' + field);
+                        if (element) {
+                            element.textContent = value;
                         }
-                    })
-                    .catch(error => console.error('Error checking status for ' + service + ':', error));
-            });
+                    });
+                })
+                .catch(error => console.error('Error loading metadata for ' + selectedService + ':', error));
+            {% endif %}
+
+            // Follow progress of all services that are in "Running" state
+            const runningServices = {{ running_services | tojson }};
+            runningServices.forEach(service => watchStatus(service));
         });
     </script>
 </head>
@@ -654,13 +1021,19 @@ HTML_TEMPLATE = """
         {% if selected_service %}
             <div class="service-details">
                 <h2>{{ selected_service }}</h2>
-                <p><strong>Kubernetes Version:</strong> {{ kube_version }}</p>
+                <p><strong>Kubernetes Version:</strong> <span id="meta-kube_version">{{ kube_version }}</span></p>
                 <p><strong>Resource Group:</strong> {{ resource_group }}</p>
                 <p><strong>Namespace:</strong> {{ namespace }}</p>
-                <p><strong>State:</strong> {{ sas_deployment.get('state', 'N/A') }}</p>
-                <p><strong>Cadence Name:</strong> {{ sas_deployment.get('cadence_name', 'N/A') }}</p>
-                <p><strong>Cadence Version:</strong> {{ sas_deployment.get('cadence_version', 'N/A') }}</p>
-                <p><strong>Cadence Release:</strong> {{ sas_deployment.get('cadence_release', 'N/A') }}</p>
+                <p><strong>State:</strong> <span id="meta-state">{{ sas_deployment.get('state', 'N/A') }}</span></p>
+                <p><strong>Cadence Name:</strong> <span id="meta-cadence_name">{{ sas_deployment.get('cadence_name', 'N/A') }}</span></p>
+                <p><strong>Cadence Version:</strong> <span id="meta-cadence_version">{{ sas_deployment.get('cadence_version', 'N/A') }}</span></p>
+                <p><strong>Cadence Release:</strong> <span id="meta-cadence_release">{{ sas_deployment.get('cadence_release', 'N/A') }}</span></p>
+                {% if next_scheduled_run %}
+                    <p><strong>Next Scheduled Check:</strong> {{ next_scheduled_run }}</p>
+                {% endif %}
+                {% if cluster_summary %}
+                    <p><strong>Pods:</strong> {{ cluster_summary.pods }} ({{ cluster_summary.pods_not_ready }} not ready) &nbsp; <strong>Nodes:</strong> {{ cluster_summary.nodes }}</p>
+                {% endif %}
                 <p id="last-health-check-{{ selected_service }}">
                     <strong>Last Health Check (last run: {{ session.get('last_run_' + selected_service, 'N/A') }}):</strong>
                     <span class="status-{% if session.get('status_' + selected_service, 'Ready') == 'Completed' %}pass{% else %}fail{% endif %}">
@@ -724,6 +1097,7 @@ HTML_TEMPLATE = """
                                     <button id="action-button-{{ selected_service }}" {% if service_status == 'Running' %}disabled{% endif %}>Action ▼</button>
                                     <div class="action-dropdown">
                                         <a href="#" onclick="runHealthCheck('{{ selected_service }}'); return false;">Run Health Check</a>
+                                        <a href="#" onclick="cancelHealthCheck('{{ selected_service }}'); return false;">Cancel Health Check</a>
                                     </div>
                                 </div>
                             </td>
@@ -787,7 +1161,7 @@ HTML_TEMPLATE = """
                     <tbody>
                         {% for run in past_runs %}
                             <tr>
-                                <td>{{ run.timestamp }}</td>
+                                <td>{{ run.timestamp }}{% if run.trigger != 'manual' %} ({{ run.trigger }}){% endif %}</td>
                                 <td>
                                     <a href="#" onclick="downloadPastReport('{{ selected_service }}', '{{ run.timestamp }}');" class="download-button">Download Report</a>
                                 </td>
@@ -803,22 +1177,114 @@ HTML_TEMPLATE = """
 
             <!-- Result Tab -->
             <div class="tab-content result-content" id="content-result-{{ selected_service }}">
-                {{ last_report | safe }}
+                <p>No results available.</p>
             </div>
         {% else %}
             <p>Please select a service from the menu to begin troubleshooting.</p>
+
+            <!-- Fleet health check -->
+            <div class="fleet">
+                <h2>Fleet Health Check</h2>
+                <div class="fleet-actions">
+                    <button onclick="runFleet('')" class="fleet-button">Run all services</button>
+                    {% for tla in grouped_services %}
+                        <button onclick="runFleet('{{ tla }}')" class="fleet-button">Run {{ tla }}</button>
+                    {% endfor %}
+                    <span id="fleet-info"></span>
+                </div>
+                <table>
+                    <thead>
+                        <tr>
+                            <th>Service</th>
+                            <th>Status</th>
+                            <th>Result</th>
+                            <th>Pods (not ready)</th>
+                            <th>Max CPU Req %</th>
+                            <th>Max Memory Req %</th>
+                            <th>Pods &gt; Mem Limit Threshold</th>
+                            <th>Errors</th>
+                            <th>Finished</th>
+                        </tr>
+                    </thead>
+                    <tbody id="fleet-matrix">
+                        <tr><td colspan="9">No fleet health check has run yet.</td></tr>
+                    </tbody>
+                </table>
+            </div>
         {% endif %}
     </div>
 </body>
 </html>
 """
 
-def run_command(command, timeout=10, env=None):
+# Aborts of the child processes and proxy requests in flight, by the token of the job (its owner) that started them,
+# so cancelling a job stops its login.sh, kubectl children and API reads and nothing else
+child_aborts = defaultdict(set)
+cancelled_owners = set()
+child_processes_lock = threading.Lock()
+
+def kill_process_group(process):
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+def owner_cancelled(owner):
+    with child_processes_lock:
+        return owner is not None and owner in cancelled_owners
+
+@contextmanager
+def tracked_abort(owner, abort):
+    """Register the abort callable of work running for owner; it is called at once if owner's job is being cancelled."""
+    if owner is None:
+        yield
+        return
+    with child_processes_lock:
+        child_aborts[owner].add(abort)
+        cancelled = owner in cancelled_owners
+    if cancelled:
+        abort()
+    try:
+        yield
+    finally:
+        with child_processes_lock:
+            child_aborts[owner].discard(abort)
+            if not child_aborts[owner]:
+                del child_aborts[owner]
+
+def tracked_process(owner, process):
+    return tracked_abort(owner, lambda: kill_process_group(process))
+
+def cancel_child_processes(owner):
+    """Abort the child processes and proxy requests of owner, and any it starts, until release_child_processes(owner)."""
+    with child_processes_lock:
+        cancelled_owners.add(owner)
+        aborts = list(child_aborts.get(owner, ()))
+    for abort in aborts:
+        abort()
+    logger.info(f"Aborted {len(aborts)} child process(es) and request(s) of job {owner}")
+
+def release_child_processes(owner):
+    with child_processes_lock:
+        cancelled_owners.discard(owner)
+
+def run_command(command, timeout=10, env=None, owner=None):
+    """Run a shell command and return (stdout, stderr, returncode); a job's commands pass its owner token."""
     logger.debug(f"Executing command: {command}")
     try:
         env = env or os.environ.copy()
-        result = subprocess.run(command, shell=True, check=True, capture_output=True, text=True, timeout=timeout, env=env)
-        return result.stdout.strip(), result.stderr.strip(), 0
+        process = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, env=env,
+                                   start_new_session=True)
+        with tracked_process(owner, process):
+            try:
+                stdout, stderr = process.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                kill_process_group(process)
+                process.communicate()
+                raise
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, command, stdout, stderr)
+        return stdout.strip(), stderr.strip(), 0
     except subprocess.TimeoutExpired as e:
         logger.error(f"Command timed out: {command}")
         return "", f"Error: Command timed out after {timeout} seconds", 1
@@ -829,49 +1295,416 @@ def run_command(command, timeout=10, env=None):
         logger.error(f"Unexpected error executing command: {command}, Error: {e}")
         return "", f"Error: {e}", 1
 
-def check_kubeconfig_context(kubeconfig_path):
+def stream_command(command, timeout=10, env=None, status=None, owner=None):
+    """Run a command without a shell and yield its stdout line by line.
+
+    The process is killed when the timeout expires or when the caller closes the generator early.
+    If a status dict is given, it receives the pid once started, the exit code and whether the command timed out.
+    The process is tracked under owner, the token of the job running it, so cancelling the job kills it.
+    """
+    logger.debug(f"Streaming command: {command}")
+    try:
+        process = subprocess.Popen(shlex.split(command), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                   text=True, errors='replace', env=env or os.environ.copy(), start_new_session=True)
+    except OSError as e:
+        logger.error(f"Unexpected error executing command: {command}, Error: {e}")
+        if status is not None:
+            status['returncode'], status['timed_out'] = 1, False
+        return
+    if status is not None:
+        status['pid'] = process.pid
+    timed_out = threading.Event()
+    def kill_on_timeout():
+        timed_out.set()
+        kill_process_group(process)
+    timer = threading.Timer(timeout, kill_on_timeout)
+    timer.start()
+    with tracked_process(owner, process):
+        try:
+            for line in process.stdout:
+                yield line.rstrip('\n')
+        finally:
+            timer.cancel()
+            if process.poll() is None:
+                kill_process_group(process)
+            process.stdout.close()
+            process.wait()
+            if timed_out.is_set():
+                logger.error(f"Command timed out after {timeout} seconds: {command}")
+            if status is not None:
+                status['returncode'] = process.returncode
+                status['timed_out'] = timed_out.is_set()
+
+# Read-only API calls go through one long-lived `kubectl proxy` per kubeconfig instead of a kubectl fork each
+KUBECTL_PROXY_ENABLED = os.environ.get("KUBECTL_PROXY_ENABLED", "1") == "1"
+KUBECTL_PROXY_START_TIMEOUT = int(os.environ.get("KUBECTL_PROXY_START_TIMEOUT", "15"))
+KUBECTL_PROXY_HEALTH_INTERVAL = int(os.environ.get("KUBECTL_PROXY_HEALTH_INTERVAL", "30"))
+# The proxy only ever reads; anything else is refused by kubectl itself
+KUBECTL_PROXY_REJECT_METHODS = "^(POST|PUT|PATCH|DELETE)$"
+# Responses that the kubectl CLI may still get past, e.g. with credentials the proxy started before
+KUBECTL_PROXY_FALLBACK_STATUSES = (401, 403)
+KUBECTL_PROXY_ERRORS = (OSError, http.client.HTTPException)
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """An HTTP connection to a server listening on a unix socket."""
+
+    def __init__(self, socket_path, timeout):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+class KubectlProxy:
+    """A `kubectl proxy` child process for one kubeconfig, with a pool of keep-alive connections in front of it.
+
+    kubectl keeps handling authentication (including the Azure exec plugin), while every request reuses
+    the proxy's connection to the API server. The proxy listens on a unix socket in a private directory, so other
+    local users cannot borrow its credentials, and refuses every method but reads. It is health-checked and
+    restarted when it dies or its kubeconfig changes.
+    """
+
+    def __init__(self, kubeconfig_path):
+        self.kubeconfig_path = kubeconfig_path
+        self.process = None
+        self.socket_dir = None
+        self.socket_path = None
+        self.kubeconfig_mtime = None
+        self.checked_at = 0
+        self.lock = threading.Lock()
+        self.idle = []
+
+    def _kubeconfig_mtime(self):
+        try:
+            return os.stat(self.kubeconfig_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _start(self):
+        env = os.environ.copy()
+        env['KUBECONFIG'] = self.kubeconfig_path
+        logger.info(f"Starting kubectl proxy for {self.kubeconfig_path}")
+        kubeconfig_mtime = self._kubeconfig_mtime()
+        self.socket_dir = tempfile.mkdtemp(prefix="kubectl-proxy-")
+        socket_path = os.path.join(self.socket_dir, "proxy.sock")
+        try:
+            self.process = subprocess.Popen(["kubectl", "proxy", f"--unix-socket={socket_path}",
+                                             f"--reject-methods={KUBECTL_PROXY_REJECT_METHODS}"],
+                                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+                                            env=env, start_new_session=True)
+        except OSError as e:
+            logger.error(f"Failed to start kubectl proxy for {self.kubeconfig_path}: {e}")
+            self._stop()
+            return False
+        ready, _, _ = select.select([self.process.stdout], [], [], KUBECTL_PROXY_START_TIMEOUT)
+        line = self.process.stdout.readline() if ready else ""
+        if not line.startswith("Starting to serve on"):
+            logger.error(f"kubectl proxy for {self.kubeconfig_path} did not start: {line.strip() or 'no output'}")
+            self._stop()
+            return False
+        self.socket_path = socket_path
+        self.kubeconfig_mtime = kubeconfig_mtime
+        # Keep draining the proxy's output so it never blocks on a full pipe
+        threading.Thread(target=self._drain, args=(self.process,), daemon=True).start()
+        self.checked_at = time.time()
+        logger.info(f"kubectl proxy for {self.kubeconfig_path} serving on {self.socket_path}")
+        return True
+
+    def _drain(self, process):
+        for line in process.stdout:
+            logger.debug(f"kubectl proxy ({self.kubeconfig_path}): {line.rstrip()}")
+
+    def _stop(self):
+        if self.process and self.process.poll() is None:
+            try:
+                os.killpg(self.process.pid, signal.SIGTERM)
+                self.process.wait(timeout=5)
+            except (ProcessLookupError, subprocess.TimeoutExpired):
+                self.process.kill()
+        for connection in self.idle:
+            connection.close()
+        self.idle = []
+        if self.socket_dir:
+            shutil.rmtree(self.socket_dir, ignore_errors=True)
+        self.process = None
+        self.socket_dir = None
+        self.socket_path = None
+
+    def _healthy(self):
+        connection = UnixHTTPConnection(self.socket_path, timeout=5)
+        try:
+            connection.request('GET', '/healthz')
+            return connection.getresponse().status == 200
+        except KUBECTL_PROXY_ERRORS:
+            return False
+        finally:
+            connection.close()
+
+    def ensure_running(self, force_check=False):
+        with self.lock:
+            if self.process and self.process.poll() is None:
+                if self._kubeconfig_mtime() != self.kubeconfig_mtime:
+                    logger.info(f"{self.kubeconfig_path} changed, restarting its kubectl proxy")
+                elif not force_check and time.time() - self.checked_at < KUBECTL_PROXY_HEALTH_INTERVAL:
+                    return True
+                elif self._healthy():
+                    self.checked_at = time.time()
+                    return True
+                else:
+                    logger.warning(f"kubectl proxy for {self.kubeconfig_path} is unhealthy, restarting it")
+            self._stop()
+            return self._start()
+
+    def _connection(self, timeout):
+        with self.lock:
+            if self.socket_path is None:
+                raise ConnectionError(f"kubectl proxy for {self.kubeconfig_path} is not available")
+            connection = self.idle.pop() if self.idle else UnixHTTPConnection(self.socket_path, timeout)
+        connection.timeout = timeout
+        if connection.sock is not None:
+            connection.sock.settimeout(timeout)
+        return connection
+
+    def _release(self, connection, response):
+        # Only a connection whose response was read to the end can carry the next request
+        with self.lock:
+            if (response.isclosed() and not response.will_close and connection.socket_path == self.socket_path
+                    and len(self.idle) < LOG_FETCH_WORKERS + 8):
+                self.idle.append(connection)
+                return
+        connection.close()
+
+    @contextmanager
+    def get(self, path, params=None, timeout=30, owner=None):
+        """GET an API path through the proxy and yield the HTTPResponse, restarting the proxy once if it cannot be reached.
+
+        The request is tracked under owner, so cancelling its job shuts the connection down.
+        """
+        if params:
+            path = f"{path}?{urlencode(params)}"
+        connections = []
+        aborted = threading.Event()
+        def abort():
+            aborted.set()
+            for connection in list(connections):
+                shutdown_connection(connection)
+        with tracked_abort(owner, abort):
+            for attempt in range(2):
+                if not self.ensure_running(force_check=attempt > 0):
+                    raise ConnectionError(f"kubectl proxy for {self.kubeconfig_path} is not available")
+                connection = self._connection(timeout)
+                try:
+                    if connection.sock is None:
+                        connection.connect()
+                    connections.append(connection)
+                    # A cancel that came before the connection was listed
+                    if aborted.is_set():
+                        shutdown_connection(connection)
+                    connection.request('GET', path)
+                    response = connection.getresponse()
+                    break
+                except KUBECTL_PROXY_ERRORS:
+                    connection.close()
+                    if attempt or aborted.is_set():
+                        raise
+                    logger.warning(f"Connection to kubectl proxy for {self.kubeconfig_path} failed, retrying")
+            try:
+                yield response
+            finally:
+                if aborted.is_set():
+                    connection.close()
+                else:
+                    self._release(connection, response)
+
+    def stop(self):
+        with self.lock:
+            self._stop()
+
+def shutdown_connection(connection):
+    """Make a blocked read or write on a proxy connection fail at once, from any thread."""
+    sock = connection.sock
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+kubectl_proxies = {}
+kubectl_proxies_lock = threading.Lock()
+
+def get_kubectl_proxy(kubeconfig_path):
+    with kubectl_proxies_lock:
+        if kubeconfig_path not in kubectl_proxies:
+            kubectl_proxies[kubeconfig_path] = KubectlProxy(kubeconfig_path)
+        return kubectl_proxies[kubeconfig_path]
+
+def restart_kubectl_proxy(kubeconfig_path):
+    """Stop the cluster's proxy, if any, so the next call starts it with the credentials of a new login."""
+    with kubectl_proxies_lock:
+        proxy = kubectl_proxies.get(kubeconfig_path)
+    if proxy is not None:
+        proxy.stop()
+
+@atexit.register
+def stop_kubectl_proxies():
+    for proxy in list(kubectl_proxies.values()):
+        proxy.stop()
+
+def api_error_message(status, body):
+    try:
+        message = json.loads(body).get('message', body)
+    except (ValueError, AttributeError):
+        message = body
+    return f"Error from server ({status}): {message}"
+
+def kube_get(kubeconfig_path, api_path, command, params=None, timeout=30, owner=None):
+    """Read an API path through the cluster's kubectl proxy, falling back to the equivalent kubectl command.
+
+    Returns (stdout, stderr, returncode) like run_command; owner is the token of the job making the call.
+    """
+    if KUBECTL_PROXY_ENABLED:
+        try:
+            with get_kubectl_proxy(kubeconfig_path).get(api_path, params=params, timeout=timeout, owner=owner) as response:
+                body = response.read().decode('utf-8', errors='replace')
+        except KUBECTL_PROXY_ERRORS as e:
+            if owner_cancelled(owner):
+                return "", f"Error: {CANCELLED_MESSAGE}", 1
+            logger.warning(f"kubectl proxy request {api_path} failed, falling back to kubectl: {e}")
+        else:
+            if 200 <= response.status < 300:
+                return body.strip(), "", 0
+            if response.status not in KUBECTL_PROXY_FALLBACK_STATUSES:
+                return "", api_error_message(response.status, body), 1
+            logger.warning(f"kubectl proxy request {api_path} was refused ({response.status}), falling back to kubectl")
+    env = os.environ.copy()
+    env['KUBECONFIG'] = kubeconfig_path
+    return run_command(command, timeout=timeout, env=env, owner=owner)
+
+def kube_stream(kubeconfig_path, api_path, command, params=None, timeout=10, status=None, owner=None):
+    """Stream an API path line by line through the kubectl proxy, falling back to streaming the kubectl command.
+
+    The whole read is bounded by the timeout; the optional status dict receives returncode and timed_out.
+    """
+    if KUBECTL_PROXY_ENABLED:
+        with ExitStack() as stack:
+            try:
+                response = stack.enter_context(get_kubectl_proxy(kubeconfig_path).get(api_path, params=params, timeout=timeout,
+                                                                                      owner=owner))
+            except KUBECTL_PROXY_ERRORS as e:
+                if owner_cancelled(owner):
+                    if status is not None:
+                        status['returncode'], status['timed_out'] = 1, False
+                    return
+                logger.warning(f"kubectl proxy request {api_path} failed, falling back to kubectl: {e}")
+                response = None
+            if response is not None and response.status in KUBECTL_PROXY_FALLBACK_STATUSES:
+                logger.warning(f"kubectl proxy request {api_path} was refused ({response.status}), falling back to kubectl")
+            elif response is not None:
+                ok = 200 <= response.status < 300
+                deadline = time.time() + timeout
+                timed_out = False
+                try:
+                    if ok:
+                        for line in response:
+                            yield line.decode('utf-8', errors='replace').rstrip('\r\n')
+                            if time.time() > deadline:
+                                timed_out = True
+                                logger.error(f"Request timed out after {timeout} seconds: {api_path}")
+                                break
+                except KUBECTL_PROXY_ERRORS as e:
+                    logger.error(f"Error while streaming {api_path}: {e}")
+                    timed_out = True
+                finally:
+                    if status is not None:
+                        status['returncode'] = 0 if ok else 1
+                        status['timed_out'] = timed_out
+                return
+    env = os.environ.copy()
+    env['KUBECONFIG'] = kubeconfig_path
+    yield from stream_command(command, timeout=timeout, env=env, status=status, owner=owner)
+
+def check_kubeconfig_context(kubeconfig_path, owner=None):
     env = os.environ.copy()
     env['KUBECONFIG'] = kubeconfig_path
-    current_context, _, _ = run_command("kubectl config current-context", env=env)
-    current_namespace, _, _ = run_command("kubectl config view --minify --output 'jsonpath={..namespace}'", env=env)
+    current_context, _, _ = run_command("kubectl config current-context", env=env, owner=owner)
+    current_namespace, _, _ = run_command("kubectl config view --minify --output 'jsonpath={..namespace}'", env=env, owner=owner)
     logger.info(f"Current kubeconfig context: {current_context}")
     logger.info(f"Current namespace in context: {current_namespace}")
 
-def check_az_authentication():
-    logger.info("Checking az CLI authentication")
-    stdout, stderr, returncode = run_command("az account show --output json", timeout=10)
+# The az login state is cached until shortly before the access token expires
+AZ_AUTH_EXPIRY_MARGIN = int(os.environ.get("AZ_AUTH_EXPIRY_MARGIN", "300"))
+AZ_AUTH_TIMEOUT = int(os.environ.get("AZ_AUTH_TIMEOUT", "30"))
+
+az_auth_expires_at = 0
+az_auth_probe = None
+az_auth_lock = threading.Lock()
+
+def az_token_expiry():
+    """Expiry (epoch seconds) of the az CLI's access token, or None when az is not authenticated."""
+    stdout, stderr, returncode = run_command("az account get-access-token --output json", timeout=AZ_AUTH_TIMEOUT)
     if returncode == 0 and stdout:
         try:
-            json.loads(stdout)
-            logger.info("az CLI is authenticated")
-            return True
+            token = json.loads(stdout)
         except json.JSONDecodeError:
-            logger.error("az account show returned invalid JSON")
-            return False
+            logger.error("az account get-access-token returned invalid JSON")
+            return None
+        if token.get('expires_on'):
+            return int(token['expires_on'])
+        try:
+            # Older az versions only report local time
+            return datetime.strptime(token['expiresOn'][:19], '%Y-%m-%d %H:%M:%S').timestamp()
+        except (KeyError, ValueError):
+            logger.warning(f"Could not read the az access token expiry: {token.get('expiresOn')}")
+            return time.time() + AZ_AUTH_EXPIRY_MARGIN * 2
     logger.error(f"az CLI is not authenticated. Stderr: {stderr}")
-    return False
+    return None
+
+def check_az_authentication():
+    """Whether az CLI is authenticated; concurrent callers share one probe and valid tokens are served from memory."""
+    global az_auth_expires_at, az_auth_probe
+    with az_auth_lock:
+        if az_auth_expires_at - time.time() > AZ_AUTH_EXPIRY_MARGIN:
+            return True
+        probe = az_auth_probe
+        owner = probe is None or probe.done()
+        if owner:
+            probe = az_auth_probe = Future()
+    if owner:
+        logger.info("Checking az CLI authentication")
+        try:
+            expires_at = az_token_expiry()
+        except Exception as e:
+            logger.error(f"Failed to check az CLI authentication: {e}")
+            expires_at = None
+        with az_auth_lock:
+            az_auth_expires_at = expires_at or 0
+        probe.set_result(expires_at)
+        if expires_at:
+            logger.info(f"az CLI is authenticated until {datetime.fromtimestamp(expires_at).strftime('%Y-%m-%d %H:%M:%S')}")
+    return probe.result() is not None
 
 def get_kube_version(kubeconfig_path):
-    env = os.environ.copy()
-    env['KUBECONFIG'] = kubeconfig_path
-    stdout, stderr, returncode = run_command("kubectl version | grep Server | cut -d'\"' -f 6", env=env)
+    stdout, stderr, returncode = kube_get(kubeconfig_path, "/version", "kubectl version -o json")
     if returncode == 0 and stdout:
-        return stdout
+        try:
+            version = json.loads(stdout)
+            return version.get('serverVersion', version).get('gitVersion') or "N/A"
+        except (json.JSONDecodeError, AttributeError):
+            logger.error(f"Could not parse Kubernetes version: {stdout}")
     return "N/A"
 
 def get_sas_deployment_info(namespace, kubeconfig_path):
-    env = os.environ.copy()
-    env['KUBECONFIG'] = kubeconfig_path
-    stdout, stderr, returncode = run_command(f"kubectl get sasdeployment -n {namespace} --no-headers", env=env)
+    stdout, stderr, returncode = kube_get(kubeconfig_path, f"/apis/orchestration.sas.com/v1alpha1/namespaces/{namespace}/sasdeployments",
+                                          f"kubectl get sasdeployment -n {namespace} -o json")
     if returncode == 0 and stdout:
-        parts = stdout.split()
-        if len(parts) >= 5:
-            return {
-                'state': parts[1],
-                'cadence_name': parts[2],
-                'cadence_version': parts[3],
-                'cadence_release': parts[4]
-            }
+        try:
+            items = json.loads(stdout).get('items', [])
+            if items:
+                return sas_deployment_fields(items[0])
+        except json.JSONDecodeError:
+            logger.error(f"Could not parse sasdeployment of {namespace}")
     return {
         'state': 'N/A',
         'cadence_name': 'N/A',
@@ -879,73 +1712,219 @@ def get_sas_deployment_info(namespace, kubeconfig_path):
         'cadence_release': 'N/A'
     }
 
-def run_login_script(tla, env, service):
-    tla = tla.lower()
-    env = env.lower()
-    if not check_az_authentication():
-        return False, "Error: az CLI is not authenticated. Please run 'az login --use-device-code' in the terminal and try again.", None
-    logger.info(f"Running login.sh with TLA: {tla}, Env: {env}, Service: {service}")
-    ns = f"{tla}{env}"
-    kubeconfig_path = f"/home/anzdes/kubeconfig/{ns}/.kube/config"
-    log_file = f"/tmp/login_sh_output_{service}.log"
-    login_script_path = "/home/anzdes/viya-upgrade-scripts/login.sh"
-    if not os.path.isfile(login_script_path):
-        logger.error(f"login.sh not found at {login_script_path}")
-        return False, f"Error: login.sh not found at {login_script_path}", None
-    if not os.access(login_script_path, os.X_OK):
-        logger.warning(f"login.sh is not executable. Attempting to make it executable.")
-        try:
-            os.chmod(login_script_path, 0o755)
+METADATA_TTL = int(os.environ.get("METADATA_TTL", "300"))
+METADATA_REFRESH_WAIT = int(os.environ.get("METADATA_REFRESH_WAIT", "15"))
+METADATA_PLACEHOLDER = "Loading..."
+
+class MetadataCache:
+    """Per-cluster TTL cache for page metadata; expired entries are served while a background refresh runs."""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.entries = {}
+        self.refreshing = {}
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=4)
+
+    def get(self, key, loader, placeholder):
+        """The cached value for key, or placeholder on a miss; starts a refresh when missing or expired."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if (entry is None or time.time() - entry[1] > self.ttl) and key not in self.refreshing:
+                self.refreshing[key] = self.executor.submit(self._refresh, key, loader)
+        return entry[0] if entry else placeholder
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = (value, time.time())
+
+    def wait(self, key, timeout):
+        """Block until an in-flight refresh of key finishes, then return the cached value or None."""
+        with self.lock:
+            future = self.refreshing.get(key)
+        if future:
+            wait([future], timeout=timeout)
+        with self.lock:
+            entry = self.entries.get(key)
+        return entry[0] if entry else None
+
+    def _refresh(self, key, loader):
+        try:
+            self.put(key, loader())
+        except Exception as e:
+            logger.error(f"Failed to refresh metadata {key}: {e}")
+        finally:
+            with self.lock:
+                self.refreshing.pop(key, None)
+
+metadata_cache = MetadataCache(METADATA_TTL)
+
+def sas_deployment_placeholder():
+    return {field: METADATA_PLACEHOLDER for field in ('state', 'cadence_name', 'cadence_version', 'cadence_release')}
+
+def cached_cluster_metadata(namespace, kubeconfig_path):
+    """Kubernetes version and sasdeployment fields for the service page, without waiting on the cluster."""
+    kube_version = metadata_cache.get(('kube_version', kubeconfig_path),
+                                      lambda: get_kube_version(kubeconfig_path), METADATA_PLACEHOLDER)
+    sas_deployment = metadata_cache.get(('sas_deployment', kubeconfig_path, namespace),
+                                        lambda: get_sas_deployment_info(namespace, kubeconfig_path),
+                                        sas_deployment_placeholder())
+    return kube_version, sas_deployment
+
+# login.sh is skipped while the kubeconfig's credentials are good, and rerun in the background shortly before they expire
+CREDENTIAL_CACHE_ENABLED = os.environ.get("CREDENTIAL_CACHE_ENABLED", "1") == "1"
+CREDENTIAL_EXPIRY_MARGIN = int(os.environ.get("CREDENTIAL_EXPIRY_MARGIN", "300"))
+CREDENTIAL_REFRESH_AHEAD = int(os.environ.get("CREDENTIAL_REFRESH_AHEAD", "900"))
+CREDENTIAL_PROBE_TTL = int(os.environ.get("CREDENTIAL_PROBE_TTL", "300"))
+CREDENTIAL_PROBE_TIMEOUT = int(os.environ.get("CREDENTIAL_PROBE_TIMEOUT", "10"))
+
+credential_states = {}
+credential_refreshes = {}
+credential_lock = threading.Lock()
+
+def kubeconfig_token_expiry(kubeconfig_path):
+    """Expiry (epoch seconds) of the current user's credential in a kubeconfig, when the kubeconfig carries one."""
+    env = os.environ.copy()
+    env['KUBECONFIG'] = kubeconfig_path
+    stdout, _, returncode = run_command("kubectl config view --raw --minify -o json", env=env)
+    if returncode != 0 or not stdout:
+        return None
+    try:
+        user = json.loads(stdout)['users'][0]['user']
+    except (json.JSONDecodeError, KeyError, IndexError, TypeError):
+        return None
+    # Legacy azure auth-provider
+    expires_on = str((user.get('auth-provider') or {}).get('config', {}).get('expires-on', ''))
+    if expires_on.isdigit():
+        return int(expires_on)
+    # Bearer token in JWT form
+    token = user.get('token') or ''
+    if token.count('.') == 2:
+        payload = token.split('.')[1]
+        try:
+            return int(json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))['exp'])
+        except (ValueError, KeyError, TypeError):
+            return None
+    return None
+
+def probe_credentials(namespace, kubeconfig_path):
+    """Cheapest authenticated request: list at most one pod of the namespace."""
+    _, stderr, returncode = kube_get(kubeconfig_path, f"/api/v1/namespaces/{namespace}/pods",
+                                     f"kubectl get --raw /api/v1/namespaces/{namespace}/pods?limit=1",
+                                     params={'limit': 1}, timeout=CREDENTIAL_PROBE_TIMEOUT)
+    if returncode != 0:
+        logger.info(f"Credential probe failed for {kubeconfig_path}: {stderr}")
+    return returncode == 0
+
+def credential_state(namespace, kubeconfig_path):
+    """'valid', 'expiring' (valid, but due for a refresh) or 'invalid' for a cluster's kubeconfig credentials.
+
+    The token expiry is read from the kubeconfig when it has one; exec-plugin credentials are probed instead
+    and the result is trusted for CREDENTIAL_PROBE_TTL. A changed kubeconfig is always re-evaluated.
+    """
+    try:
+        mtime = os.path.getmtime(kubeconfig_path)
+    except OSError:
+        return 'invalid'
+    now = time.time()
+    with credential_lock:
+        state = credential_states.get(kubeconfig_path)
+    if state is None or state['mtime'] != mtime or (state['expires_at'] is None and now - state['checked_at'] > CREDENTIAL_PROBE_TTL):
+        expires_at = kubeconfig_token_expiry(kubeconfig_path)
+        valid = expires_at - now > CREDENTIAL_EXPIRY_MARGIN if expires_at else probe_credentials(namespace, kubeconfig_path)
+        state = {'mtime': mtime, 'checked_at': now, 'expires_at': expires_at, 'valid': valid}
+        with credential_lock:
+            credential_states[kubeconfig_path] = state
+    if not state['valid']:
+        return 'invalid'
+    if state['expires_at']:
+        remaining = state['expires_at'] - now
+        if remaining <= CREDENTIAL_EXPIRY_MARGIN:
+            return 'invalid'
+        if remaining <= CREDENTIAL_REFRESH_AHEAD:
+            return 'expiring'
+    return 'valid'
+
+def refresh_credentials_async(tla, env, service, kubeconfig_path):
+    """Rerun login.sh in the background for credentials about to expire, once per cluster at a time."""
+    with credential_lock:
+        refresh = credential_refreshes.get(kubeconfig_path)
+        if refresh is None or refresh.done():
+            logger.info(f"Refreshing credentials of {kubeconfig_path} ahead of expiry")
+            credential_refreshes[kubeconfig_path] = executor.submit(run_login_script, tla, env, service, force=True)
+
+LOGIN_TIMEOUT = int(os.environ.get("LOGIN_TIMEOUT", "300"))
+LOGIN_OUTPUT_TAIL_LINES = int(os.environ.get("LOGIN_OUTPUT_TAIL_LINES", "200"))
+# login.sh ends by listing pods; a pod line marks a working login
+LOGIN_SUCCESS_PATTERN = re.compile(r'\S+\s+\d+/\d+\s+(Running|Completed)\s+\d+')
+
+def run_login_script(tla, env, service, force=False, owner=None):
+    tla = tla.lower()
+    env = env.lower()
+    if CREDENTIAL_CACHE_ENABLED and not force:
+        ns = f"{tla}{env}"
+        kubeconfig_path = f"/home/anzdes/kubeconfig/{ns}/.kube/config"
+        state = credential_state(ns, kubeconfig_path)
+        if state != 'invalid':
+            if state == 'expiring':
+                refresh_credentials_async(tla, env, service, kubeconfig_path)
+            logger.info(f"Skipping login.sh for {service}: kubeconfig credentials are still valid")
+            return True, "Login skipped: kubeconfig credentials are still valid.", None
+    if not check_az_authentication():
+        return False, "Error: az CLI is not authenticated. Please run 'az login --use-device-code' in the terminal and try again.", None
+    logger.info(f"Running login.sh with TLA: {tla}, Env: {env}, Service: {service}")
+    ns = f"{tla}{env}"
+    kubeconfig_path = f"/home/anzdes/kubeconfig/{ns}/.kube/config"
+    log_file = f"/tmp/login_sh_output_{service}.log"
+    login_script_path = "/home/anzdes/viya-upgrade-scripts/login.sh"
+    if not os.path.isfile(login_script_path):
+        logger.error(f"login.sh not found at {login_script_path}")
+        return False, f"Error: login.sh not found at {login_script_path}", None
+    if not os.access(login_script_path, os.X_OK):
+        logger.warning(f"login.sh is not executable. Attempting to make it executable.")
+        try:
+            os.chmod(login_script_path, 0o755)
         except Exception as e:
             logger.error(f"Failed to make login.sh executable: {e}")
             return False, f"Error: Failed to make login.sh executable: {e}", None
-    command = f"{login_script_path} {shlex.quote(tla)} {shlex.quote(env)} > {log_file} 2>&1 & echo $!"
-    stdout, stderr, returncode = run_command(command, timeout=10)
-    if returncode != 0:
-        logger.error(f"Failed to start login.sh: Stdout: {stdout}, Stderr: {stderr}")
-        return False, f"Error: Failed to start login.sh: {stderr}", None
-    pid = stdout.strip()
-    if not pid.isdigit():
-        logger.error(f"Could not get PID of login.sh: {stdout}")
-        return False, f"Error: Could not get PID of login.sh: {stdout}", None
-    pid = int(pid)
+    # login.sh runs as a managed child writing to the log file. Completion is its exit, not the end of its output:
+    # helpers it leaves running in the background may keep the output open
+    try:
+        with open(log_file, "w") as log:
+            process = subprocess.Popen([login_script_path, tla, env], stdout=log, stderr=subprocess.STDOUT,
+                                       stdin=subprocess.DEVNULL, start_new_session=True)
+    except OSError as e:
+        logger.error(f"Failed to start login.sh for {service}: {e}")
+        return False, f"Error: Failed to start login.sh: {e}", None
+    pid = process.pid
     logger.info(f"login.sh started with PID: {pid} for service: {service}")
-    max_wait_time = 300
-    poll_interval = 10
-    elapsed_time = 0
-    while elapsed_time < max_wait_time:
+    timed_out = False
+    with tracked_process(owner, process):
         try:
-            process = psutil.Process(pid)
-            if not process.is_running():
-                with open(log_file, "r") as f:
-                    output = f.read()
-                if re.search(r'\S+\s+\d+/\d+\s+(Running|Completed)\s+\d+', output):
-                    logger.info(f"login.sh completed successfully for {service}")
-                    return True, "Login successful.", pid
-                else:
-                    exit_code = process.returncode
-                    logger.error(f"login.sh failed with exit code {exit_code} for {service}. Output: {output}")
-                    return False, f"Error: login.sh failed with exit code {exit_code}. Output: {output}", pid
-        except psutil.NoSuchProcess:
-            with open(log_file, "r") as f:
-                output = f.read()
-            if re.search(r'\S+\s+\d+/\d+\s+(Running|Completed)\s+\d+', output):
-                logger.info(f"login.sh completed successfully for {service}")
-                return True, "Login successful.", pid
-            else:
-                logger.error(f"login.sh failed for {service}. Output: {output}")
-                return False, f"Error: login.sh failed. Output: {output}", pid
-        time.sleep(poll_interval)
-        elapsed_time += poll_interval
-    logger.error(f"login.sh timed out after 300 seconds for {service}")
-    try:
-        process = psutil.Process(pid)
-        process.terminate()
-    except psutil.NoSuchProcess:
-        pass
-    with open(log_file, "r") as f:
-        output = f.read()
-    return False, f"Error: login.sh timed out after 300 seconds. Output: {output}", pid
+            exit_code = process.wait(timeout=LOGIN_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            timed_out = True
+            kill_process_group(process)
+            exit_code = process.wait()
+    output = deque(maxlen=LOGIN_OUTPUT_TAIL_LINES)
+    login_succeeded = False
+    with open(log_file, errors='replace') as log:
+        for line in log:
+            output.append(line.rstrip('\n'))
+            login_succeeded = login_succeeded or bool(LOGIN_SUCCESS_PATTERN.search(line))
+    output = "\n".join(output)
+    if timed_out:
+        logger.error(f"login.sh timed out after {LOGIN_TIMEOUT} seconds for {service}")
+        return False, f"Error: login.sh timed out after {LOGIN_TIMEOUT} seconds. Output: {output}", pid
+    if login_succeeded:
+        logger.info(f"login.sh completed successfully for {service}")
+        # Re-evaluate the new credentials on their next use
+        with credential_lock:
+            credential_states.pop(kubeconfig_path, None)
+        restart_kubectl_proxy(kubeconfig_path)
+        return True, "Login successful.", pid
+    logger.error(f"login.sh failed with exit code {exit_code} for {service}. Output: {output}")
+    return False, f"Error: login.sh failed with exit code {exit_code}. Output: {output}", pid
 
 def check_for_updates():
     version_file_url = f"https://raw.githubusercontent.com/{GITHUB_REPO}/{GITHUB_BRANCH}/{VERSION_FILE}"
@@ -976,104 +1955,374 @@ def update_script():
         logger.error(f"Failed to update script: {e}")
         return False
 
-def generate_results_html(html_data):
-    content = ""
-    for key, data in html_data.items():
+# Report sections in the order the substeps are listed, independent of which substep finished first
+REPORT_SECTIONS = ('pods', 'readiness', 'nodes', 'resources', 'errors', 'pod_resources')
+
+def iter_results_html(html_data):
+    """Yield the results HTML of a run section by section and row by row."""
+    for key in REPORT_SECTIONS:
+        if key not in html_data:
+            continue
+        data = html_data[key]
         if key in ('pods', 'nodes', 'resources', 'pod_resources'):
-            content += f"<h2>{key.replace('_', ' ').title()}</h2>\n"
+            yield f"<h2>{key.replace('_', ' ').title()}</h2>\n"
             if not data['rows']:
-                content += "<p>No data available.</p>\n"
+                yield "<p>No data available.</p>\n"
             else:
                 if data['headers'] == ["Message"]:
-                    content += "<pre>\n"
+                    yield "<pre>\n"
                     for row in data['rows']:
-                        content += f"{row[0]}\n"
-                    content += "</pre>\n"
+                        yield f"{row[0]}\n"
+                    yield "</pre>\n"
                 else:
-                    content += "<table>\n<tr>"
-                    content += "".join(f"<th>{h}</th>" for h in data['headers']) + "</tr>\n"
+                    yield "<table>\n<tr>" + "".join(f"<th>{h}</th>" for h in data['headers']) + "</tr>\n"
+                    high_usage_column = {'resources': 9, 'pod_resources': 6}.get(key)
                     for row_data in data['rows']:
                         if isinstance(row_data, tuple) and len(row_data) == 3:
                             row, high_usage, _ = row_data
                         else:
                             row = row_data
                             high_usage = False
-                        content += "<tr>"
-                        for i, cell in enumerate(row):
-                            class_attr = ' class="high-usage"' if (key == 'resources' and i == 9 and high_usage) or (key == 'pod_resources' and i == 6 and high_usage) else ''
-                            content += f"<td{class_attr}>{cell}</td>"
-                        content += "</tr>\n"
-                    content += "</table>\n"
+                        cells = "".join(f'<td class="high-usage">{cell}</td>' if high_usage and i == high_usage_column else f"<td>{cell}</td>"
+                                        for i, cell in enumerate(row))
+                        yield f"<tr>{cells}</tr>\n"
+                    yield "</table>\n"
         elif key == 'readiness':
-            content += "<h2>SAS Readiness Check</h2>\n<pre>" + data + "</pre>\n"
+            yield "<h2>SAS Readiness Check</h2>\n<pre>" + data + "</pre>\n"
         elif key == 'errors':
-            content += "<h2>Check Pods for Errors</h2>\n"
+            yield "<h2>Check Pods for Errors</h2>\n"
             if not data['rows']:
-                content += "<p>No error data available.</p>\n"
+                yield "<p>No error data available.</p>\n"
             else:
                 if data['headers'] == ["Message"]:
-                    content += "<pre>\n"
+                    yield "<pre>\n"
                     for row in data['rows']:
-                        content += f"{row[0]}\n"
-                    content += "</pre>\n"
+                        yield f"{row[0]}\n"
+                    yield "</pre>\n"
                 else:
-                    content += "<pre>\n"
-                    first_pod = True
-                    prev_pod = None
+                    yield "<pre>\n"
+                    first_workload = True
+                    prev_workload = None
                     for row in data['rows']:
-                        pod_name, _, _, level, message = row
-                        if pod_name and pod_name != prev_pod and "No messages" not in pod_name:
-                            if not first_pod:
-                                content += "\n"
-                            content += f"Pod name: {pod_name}\n----------\n"
-                            prev_pod = pod_name
-                            first_pod = False
+                        workload, first_seen, last_seen, level, message, count, signature, pod_count = row
+                        if workload and workload != prev_workload and "No messages" not in workload:
+                            if not first_workload:
+                                yield "\n"
+                            yield f"Workload: {workload} ({pod_count} pod{'s' if pod_count != 1 else ''})\n----------\n"
+                            prev_workload = workload
+                            first_workload = False
                         if message and "All pods checked" not in message:
-                            content += f"{level}: {message}\n"
+                            yield f"{level} x{count} [{signature}] first {first_seen}, last {last_seen}: {message}\n"
                         elif "All pods checked" in message:
-                            content += f"{message}\n"
-                    content += "</pre>\n"
-    return content
+                            yield f"{message}\n"
+                    yield "</pre>\n"
+
+def generate_results_html(html_data):
+    return "".join(iter_results_html(html_data))
+
+def format_age(timestamp, now=None):
+    """Render a Kubernetes timestamp as a kubectl-style AGE value (e.g. 45s, 12m, 5h3m, 9d)."""
+    if not timestamp:
+        return "<unknown>"
+    created = datetime.strptime(timestamp, '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc)
+    seconds = max(int(((now or datetime.now(timezone.utc)) - created).total_seconds()), 0)
+    minutes, hours, days = seconds // 60, seconds // 3600, seconds // 86400
+    if seconds < 120:
+        return f"{seconds}s"
+    if minutes < 10:
+        return f"{minutes}m{seconds % 60}s" if seconds % 60 else f"{minutes}m"
+    if hours < 3:
+        return f"{minutes}m"
+    if hours < 8:
+        return f"{hours}h{minutes % 60}m" if minutes % 60 else f"{hours}h"
+    if hours < 48:
+        return f"{hours}h"
+    if days < 8:
+        return f"{days}d{hours % 24}h" if hours % 24 else f"{days}d"
+    if days < 365 * 2:
+        return f"{days}d"
+    return f"{days // 365}y{days % 365}d" if days < 365 * 8 else f"{days // 365}y"
+
+def pod_display_status(pod):
+    """Derive the STATUS column kubectl prints for a pod object."""
+    status = pod.get('status', {})
+    reason = status.get('reason') or status.get('phase', 'Unknown')
+    init_statuses = status.get('initContainerStatuses', [])
+    for i, cs in enumerate(init_statuses):
+        state = cs.get('state', {})
+        if 'terminated' in state and state['terminated'].get('exitCode', 0) == 0:
+            continue
+        if 'terminated' in state:
+            reason = "Init:" + (state['terminated'].get('reason') or f"ExitCode:{state['terminated'].get('exitCode')}")
+        elif state.get('waiting', {}).get('reason') and state['waiting']['reason'] != 'PodInitializing':
+            reason = "Init:" + state['waiting']['reason']
+        else:
+            reason = f"Init:{i}/{len(pod.get('spec', {}).get('initContainers', []))}"
+        break
+    else:
+        running = False
+        for cs in reversed(status.get('containerStatuses', [])):
+            state = cs.get('state', {})
+            if state.get('waiting', {}).get('reason'):
+                reason = state['waiting']['reason']
+            elif state.get('terminated', {}).get('reason'):
+                reason = state['terminated']['reason']
+            elif 'terminated' in state:
+                reason = f"ExitCode:{state['terminated'].get('exitCode')}"
+            elif 'running' in state and cs.get('ready'):
+                running = True
+        if reason == 'Completed' and running:
+            reason = 'Running'
+    if pod.get('metadata', {}).get('deletionTimestamp'):
+        reason = 'Terminating'
+    return reason
+
+def sas_deployment_fields(item):
+    """Extract the columns shown by `kubectl get sasdeployment` from a SASDeployment object."""
+    spec, status = item.get('spec', {}), item.get('status', {})
+    return {
+        'state': status.get('state') or 'N/A',
+        'cadence_name': spec.get('cadenceName') or status.get('cadenceName') or 'N/A',
+        'cadence_version': spec.get('cadenceVersion') or status.get('cadenceVersion') or 'N/A',
+        'cadence_release': status.get('cadenceRelease') or spec.get('cadenceRelease') or 'N/A'
+    }
+
+# Optional background list+watch of pods and nodes per configured service (needs the kubectl proxy)
+INFORMER_ENABLED = os.environ.get("INFORMER_ENABLED", "0") == "1"
+INFORMER_WATCH_TIMEOUT = int(os.environ.get("INFORMER_WATCH_TIMEOUT", "300"))
+
+class ClusterInformer:
+    """In-memory index of a namespace's pods and the cluster's nodes, kept current by Kubernetes watches.
+
+    Each kind is listed once and then followed with a watch from the list's resourceVersion. A watch that
+    ends normally is resumed from the last resourceVersion seen; the kind is only relisted when the
+    API server reports that version as expired (410 Gone) or the watch fails.
+    """
+
+    def __init__(self, namespace, kubeconfig_path):
+        self.namespace = namespace
+        self.kubeconfig_path = kubeconfig_path
+        self.paths = {'pods': f"/api/v1/namespaces/{namespace}/pods", 'nodes': "/api/v1/nodes"}
+        self.stores = {kind: {} for kind in self.paths}
+        self.resource_versions = {}
+        self.synced = {kind: threading.Event() for kind in self.paths}
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        for kind in self.paths:
+            threading.Thread(target=self._run, args=(kind,), daemon=True, name=f"informer-{namespace}-{kind}").start()
+
+    def _run(self, kind):
+        backoff = 1
+        while not self.stopped.is_set():
+            try:
+                self._list(kind)
+                backoff = 1
+                while not self.stopped.is_set() and self._watch(kind):
+                    pass
+                # Expired resourceVersion: relist straight away and keep serving the current index meanwhile
+                continue
+            except Exception as e:
+                logger.warning(f"Informer for {kind} in {self.namespace} failed: {e}")
+                self.synced[kind].clear()
+            self.stopped.wait(backoff)
+            backoff = min(backoff * 2, 60)
+
+    def _list(self, kind):
+        with get_kubectl_proxy(self.kubeconfig_path).get(self.paths[kind], timeout=60) as response:
+            body = response.read().decode('utf-8', errors='replace')
+        if response.status != 200:
+            raise RuntimeError(api_error_message(response.status, body))
+        data = json.loads(body)
+        store = {}
+        for item in data.get('items', []):
+            item['metadata'].pop('managedFields', None)
+            store[item['metadata']['name']] = item
+        with self.lock:
+            self.stores[kind] = store
+            self.resource_versions[kind] = data['metadata']['resourceVersion']
+        self.synced[kind].set()
+        logger.info(f"Informer listed {len(store)} {kind} for {self.namespace}")
+
+    def _watch(self, kind):
+        """Apply watch events until the watch ends; returns False when the kind has to be relisted."""
+        params = {'watch': '1', 'allowWatchBookmarks': 'true', 'timeoutSeconds': INFORMER_WATCH_TIMEOUT,
+                  'resourceVersion': self.resource_versions[kind]}
+        with get_kubectl_proxy(self.kubeconfig_path).get(self.paths[kind], params=params,
+                                                         timeout=INFORMER_WATCH_TIMEOUT + 30) as response:
+            if response.status == 410:
+                return False
+            if response.status != 200:
+                raise RuntimeError(api_error_message(response.status, response.read().decode('utf-8', errors='replace')))
+            # Each event is handed over as soon as its line arrives
+            for line in response:
+                if self.stopped.is_set():
+                    return False
+                if not line.strip():
+                    continue
+                event = json.loads(line)
+                obj = event.get('object', {})
+                if event.get('type') == 'ERROR':
+                    logger.info(f"Informer watch for {kind} in {self.namespace} ended: {obj.get('message')}")
+                    return obj.get('code') != 410
+                obj.get('metadata', {}).pop('managedFields', None)
+                with self.lock:
+                    if event['type'] in ('ADDED', 'MODIFIED'):
+                        self.stores[kind][obj['metadata']['name']] = obj
+                    elif event['type'] == 'DELETED':
+                        self.stores[kind].pop(obj['metadata']['name'], None)
+                    self.resource_versions[kind] = obj['metadata']['resourceVersion']
+        return True
+
+    def items(self, kind):
+        """Current objects of a kind sorted by name, or None while the kind is not synced."""
+        if not self.synced[kind].is_set():
+            return None
+        with self.lock:
+            return [self.stores[kind][name] for name in sorted(self.stores[kind])]
+
+    def stop(self):
+        self.stopped.set()
+
+cluster_informers = {}
+cluster_informers_lock = threading.Lock()
+
+def get_informer(namespace, kubeconfig_path):
+    """The running informer for a service's namespace, started on first use; None when informers are disabled."""
+    if not (INFORMER_ENABLED and KUBECTL_PROXY_ENABLED):
+        return None
+    with cluster_informers_lock:
+        key = (kubeconfig_path, namespace)
+        if key not in cluster_informers:
+            cluster_informers[key] = ClusterInformer(namespace, kubeconfig_path)
+        return cluster_informers[key]
+
+def cluster_summary(namespace, kubeconfig_path):
+    """Pod and node counts from the informer cache for the service page, or None when not available."""
+    informer = get_informer(namespace, kubeconfig_path)
+    pods = informer and informer.items('pods')
+    nodes = informer and informer.items('nodes')
+    if pods is None or nodes is None:
+        return None
+    not_ready = sum(1 for pod in pods if pod.get('status', {}).get('phase') not in ('Succeeded',) and
+                    not all(cs.get('ready') for cs in pod.get('status', {}).get('containerStatuses', [])))
+    return {'pods': len(pods), 'pods_not_ready': not_ready, 'nodes': len(nodes)}
+
+class NamespaceSnapshot:
+    """Pods, nodes and sasdeployment of a namespace, fetched once as JSON and shared by every substep of a run.
+
+    owner is the token of the job taking the snapshot; substeps pass it on to their own calls.
+    """
+
+    def __init__(self, namespace, kubeconfig_path, owner=None):
+        self.namespace = namespace
+        self.kubeconfig_path = kubeconfig_path
+        self.owner = owner
+        self.taken_at = datetime.now(timezone.utc)
+        requests_by_kind = {
+            'pods': (f"/api/v1/namespaces/{namespace}/pods", f"kubectl get pods -n {namespace} -o json"),
+            'nodes': ("/api/v1/nodes", "kubectl get nodes -o json"),
+            'sas_deployments': (f"/apis/orchestration.sas.com/v1alpha1/namespaces/{namespace}/sasdeployments",
+                                f"kubectl get sasdeployment -n {namespace} -o json")
+        }
+        self.errors = {}
+        # Pods and nodes come from the informer cache when it is synced
+        informer = get_informer(namespace, kubeconfig_path)
+        for kind in ('pods', 'nodes'):
+            cached = informer and informer.items(kind)
+            if cached is not None:
+                setattr(self, kind, cached)
+                self.errors[kind] = ""
+                del requests_by_kind[kind]
+        with ThreadPoolExecutor(max_workers=len(requests_by_kind)) as pool:
+            fetched = {kind: pool.submit(self._get_items, *request_args) for kind, request_args in requests_by_kind.items()}
+        for kind, future in fetched.items():
+            items, error = future.result()
+            setattr(self, kind, items)
+            self.errors[kind] = error
+        self.pods_by_name = {pod['metadata']['name']: pod for pod in self.pods}
+        self._cluster_pods = None
+        self._cluster_pods_lock = threading.Lock()
+
+    def _get_items(self, api_path, command, timeout=30):
+        stdout, stderr, returncode = kube_get(self.kubeconfig_path, api_path, command, timeout=timeout, owner=self.owner)
+        if returncode != 0 or not stdout:
+            # Never an empty error, so a failed fetch cannot pass for an empty list
+            return [], stderr or f"No output from {command} (exit code {returncode})"
+        try:
+            return json.loads(stdout).get('items', []), ""
+        except json.JSONDecodeError as e:
+            logger.error(f"Could not parse output of {command}: {e}")
+            return [], f"Invalid JSON from kubectl: {e}"
 
-def list_pods(namespace, html_data, kubeconfig_path):
+    def cluster_pods(self):
+        """Pods of every namespace, fetched on first use; node-level accounting needs them all."""
+        with self._cluster_pods_lock:
+            if self._cluster_pods is None:
+                self._cluster_pods, self.errors['cluster_pods'] = self._get_items("/api/v1/pods", "kubectl get pods -A -o json", timeout=60)
+            return self._cluster_pods
+
+    def pod_names(self):
+        return [pod['metadata']['name'] for pod in self.pods]
+
+    def pod(self, name):
+        return self.pods_by_name.get(name)
+
+    def pods_with_label(self, key, value):
+        return [pod for pod in self.pods if pod['metadata'].get('labels', {}).get(key) == value]
+
+    def pod_rows(self):
+        """Rows matching `kubectl get pods --no-headers`: NAME, READY, STATUS, RESTARTS, AGE."""
+        rows = []
+        for pod in self.pods:
+            statuses = pod.get('status', {}).get('containerStatuses', [])
+            ready = sum(1 for cs in statuses if cs.get('ready'))
+            total = len(pod.get('spec', {}).get('containers', []))
+            restarts = sum(cs.get('restartCount', 0) for cs in statuses)
+            rows.append([pod['metadata']['name'], f"{ready}/{total}", pod_display_status(pod), str(restarts),
+                         format_age(pod['metadata'].get('creationTimestamp'), self.taken_at)])
+        return rows
+
+    def node_names(self):
+        return [node['metadata']['name'] for node in self.nodes]
+
+    def sas_deployment_info(self):
+        if self.sas_deployments:
+            return sas_deployment_fields(self.sas_deployments[0])
+        return {'state': 'N/A', 'cadence_name': 'N/A', 'cadence_version': 'N/A', 'cadence_release': 'N/A'}
+
+def list_pods(namespace, html_data, kubeconfig_path, snapshot):
     logger.info(f"Listing pods in namespace: {namespace}")
-    env = os.environ.copy()
-    env['KUBECONFIG'] = kubeconfig_path
-    stdout, stderr, returncode = run_command(f"kubectl get pods -n {namespace} --no-headers", env=env)
-    if returncode == 0 and stdout:
-        lines = stdout.split('\n')
+    if snapshot.pods:
         headers = ["NAME", "READY", "STATUS", "RESTARTS", "AGE"]
-        rows = [line.split(maxsplit=4) for line in lines if line.strip()]
-        html_data['pods'] = {'headers': headers, 'rows': rows}
+        html_data['pods'] = {'headers': headers, 'rows': snapshot.pod_rows()}
     else:
-        html_data['pods'] = {'headers': ["Message"], 'rows': [[f"Failed to list pods: {stderr}"]]}
+        html_data['pods'] = {'headers': ["Message"], 'rows': [[f"Failed to list pods: {snapshot.errors['pods']}"]]}
 
-def sas_readiness_check(namespace, html_data, kubeconfig_path):
+def sas_readiness_check(namespace, html_data, kubeconfig_path, snapshot):
     logger.info(f"Checking SAS readiness in namespace: {namespace}")
-    env = os.environ.copy()
-    env['KUBECONFIG'] = kubeconfig_path
-    stdout, stderr, returncode = run_command(f"kubectl get pod -n {namespace} -l app=sas-readiness -o custom-columns=NAME:.metadata.name,READY:.status.containerStatuses[0].ready --no-headers", env=env)
-    if returncode != 0 or not stdout:
-        html_data['readiness'] = f"No sas-readiness pod found or error: {stderr}"
+    readiness_pods = snapshot.pods_with_label('app', 'sas-readiness')
+    if not readiness_pods:
+        html_data['readiness'] = f"No sas-readiness pod found or error: {snapshot.errors['pods']}"
+        return
+    pod = readiness_pods[0]
+    pod_name = pod['metadata']['name']
+    statuses = pod.get('status', {}).get('containerStatuses', [])
+    if not statuses:
+        html_data['readiness'] = "Could not parse sas-readiness status"
+        return
+    is_ready = [cs.get('ready', False) for cs in statuses] == [True]
+    last_log, _, _ = kube_get(kubeconfig_path, f"/api/v1/namespaces/{namespace}/pods/{pod_name}/log",
+                              f"kubectl logs -n {namespace} {pod_name} --tail=1", params={'tailLines': 1}, owner=snapshot.owner)
+    if is_ready and last_log and "All checks passed" in last_log:
+        html_data['readiness'] = f"SAS Readiness Check: All good! Pod '{pod_name}' is ready."
     else:
-        pod_info = stdout.split()
-        if len(pod_info) < 2:
-            html_data['readiness'] = "Could not parse sas-readiness status"
-        else:
-            pod_name, readiness = pod_info[0], pod_info[1]
-            readiness_status, _, _ = run_command(f"kubectl get pod -n {namespace} {pod_name} -o jsonpath='{{.status.containerStatuses[*].ready}}'", env=env)
-            is_ready = readiness_status == "true" and readiness == "true"
-            last_log, _, _ = run_command(f"kubectl logs -n {namespace} {pod_name} --tail=1", env=env)
-            if is_ready and last_log and "All checks passed" in last_log:
-                html_data['readiness'] = f"SAS Readiness Check: All good! Pod '{pod_name}' is ready."
-            else:
-                html_data['readiness'] = f"SAS Readiness Check: Pod '{pod_name}' not fully ready.\nLast log: {last_log or 'No logs'}"
+        html_data['readiness'] = f"SAS Readiness Check: Pod '{pod_name}' not fully ready.\nLast log: {last_log or 'No logs'}"
 
-def list_nodes_and_utilization(namespace, html_data, kubeconfig_path):
+def list_nodes_and_utilization(namespace, html_data, kubeconfig_path, snapshot):
     logger.info("Listing nodes and utilization")
     env = os.environ.copy()
     env['KUBECONFIG'] = kubeconfig_path
-    stdout, stderr, returncode = run_command("kubectl top nodes --no-headers", env=env)
+    stdout, stderr, returncode = run_command("kubectl top nodes --no-headers", env=env, owner=snapshot.owner)
     if returncode == 0 and stdout:
         lines = stdout.split('\n')
         headers = ["NAME", "CPU(cores)", "CPU%", "MEMORY(bytes)", "MEMORY%"]
@@ -1082,6 +2331,10 @@ def list_nodes_and_utilization(namespace, html_data, kubeconfig_path):
     else:
         html_data['nodes'] = {'headers': ["Message"], 'rows': [["Failed to list nodes"]]}
 
+# Memory quantity suffixes as multipliers to Gi
+MEMORY_UNITS_GI = {'Ki': 1024 ** -2, 'Mi': 1024 ** -1, 'Gi': 1, 'Ti': 1024,
+                   'k': 1e3 / 1024 ** 3, 'M': 1e6 / 1024 ** 3, 'G': 1e9 / 1024 ** 3, 'T': 1e12 / 1024 ** 3}
+
 def parse_resource_value(value, is_cpu=False):
     if not value or value == "0":
         return 0
@@ -1090,197 +2343,316 @@ def parse_resource_value(value, is_cpu=False):
         if is_cpu:
             if value.endswith('m'):
                 return float(value[:-1])
-            elif value.isdigit():
-                return float(value) * 1000
-        else:
-            if value.endswith('Ki'):
-                return float(value[:-2]) / (1024 * 1024)
-            elif value.endswith('Mi'):
-                return float(value[:-2]) / 1024
-            elif value.endswith('Gi'):
-                return float(value[:-2])
-            elif value.isdigit():
-                return float(value) / (1024 * 1024 * 1024)
-        return float(value)
+            return float(value) * 1000
+        if value[-2:] in MEMORY_UNITS_GI:
+            return float(value[:-2]) * MEMORY_UNITS_GI[value[-2:]]
+        if value[-1:] in MEMORY_UNITS_GI:
+            return float(value[:-1]) * MEMORY_UNITS_GI[value[-1:]]
+        return float(value) / (1024 * 1024 * 1024)
     except ValueError:
         logger.warning(f"Could not parse resource value: {value}")
         return 0
 
-def node_resource_utilization(namespace, html_data, kubeconfig_path):
+def pod_reserved_resources(pod):
+    """Requests and limits a scheduled pod reserves on its node, as `kubectl describe node` accounts them."""
+    spec = pod.get('spec', {})
+    reserved = {}
+    for kind in ('requests', 'limits'):
+        for resource in ('cpu', 'memory'):
+            is_cpu = resource == 'cpu'
+            containers = sum(parse_resource_value(c.get('resources', {}).get(kind, {}).get(resource), is_cpu)
+                             for c in spec.get('containers', []))
+            init_containers = max((parse_resource_value(c.get('resources', {}).get(kind, {}).get(resource), is_cpu)
+                                   for c in spec.get('initContainers', [])), default=0)
+            overhead = parse_resource_value((spec.get('overhead') or {}).get(resource), is_cpu)
+            reserved[f"{resource}_{kind}"] = max(containers, init_containers) + overhead
+    return reserved
+
+def node_resource_utilization(namespace, html_data, kubeconfig_path, snapshot):
     logger.info("Checking node resource utilization")
-    env = os.environ.copy()
-    env['KUBECONFIG'] = kubeconfig_path
-    stdout, stderr, returncode = run_command("kubectl get nodes --no-headers", env=env)
-    if returncode != 0 or not stdout:
+    if not snapshot.nodes:
         html_data['resources'] = {'headers': ["Message"], 'rows': [["Failed to get nodes"]]}
         return
-    nodes = [line.split()[0] for line in stdout.split('\n') if line.strip()]
     headers = ["Node", "Allocatable CPU", "CPU Requests", "CPU Req %", "CPU Limits", "CPU Lim %", "CPU Remaining", 
                "Allocatable Memory", "Memory Requests", "Memory Req %", "Memory Limits", "Memory Lim %", "Memory Remaining"]
+    columns = ['cpu_requests', 'cpu_limits', 'memory_requests', 'memory_limits']
+    nodes = pd.DataFrame({
+        'node': snapshot.node_names(),
+        'alloc_cpu': [parse_resource_value(n['status'].get('allocatable', {}).get('cpu'), is_cpu=True) for n in snapshot.nodes],
+        'alloc_mem': [parse_resource_value(n['status'].get('allocatable', {}).get('memory')) for n in snapshot.nodes]
+    }).set_index('node')
+    cluster_pods = snapshot.cluster_pods()
+    if snapshot.errors.get('cluster_pods'):
+        # Without the pods every node would show 0 requests and limits, which reads as a healthy, empty cluster
+        logger.error(f"Failed to list pods across namespaces: {snapshot.errors['cluster_pods']}")
+        html_data['resources'] = {'headers': ["Message"], 'rows': [["Failed to list pods"]]}
+        return
+    # Terminated pods no longer reserve anything on their node
+    scheduled = [{'node': pod['spec']['nodeName'], **pod_reserved_resources(pod)} for pod in cluster_pods
+                 if pod.get('spec', {}).get('nodeName') and pod.get('status', {}).get('phase') not in ('Succeeded', 'Failed')]
+    allocated = pd.DataFrame(scheduled, columns=['node'] + columns).groupby('node')[columns].sum()
+    table = nodes.join(allocated, how='left').fillna(0)
+    for resource, alloc in (('cpu', 'alloc_cpu'), ('memory', 'alloc_mem')):
+        for kind in ('requests', 'limits'):
+            table[f"{resource}_{kind}_pct"] = (table[f"{resource}_{kind}"] / table[alloc] * 100).where(table[alloc] > 0, 0)
+        table[f"{resource}_remaining"] = table[alloc] - table[f"{resource}_requests"]
     table_data = []
-    for node in nodes:
-        describe_output, _, _ = run_command(f"kubectl describe node {node}", env=env)
-        if not describe_output:
-            continue
-        allocatable = {}
-        allocated = {'cpu': {'requests': 0, 'limits': 0}, 'memory': {'requests': 0, 'limits': 0}}
-        lines = describe_output.split('\n')
-        in_allocatable = False
-        in_allocated = False
-        for line in lines:
-            line = line.strip()
-            if line.startswith("Allocatable:"):
-                in_allocatable = True
-                continue
-            elif line.startswith("Allocated resources:"):
-                in_allocatable = False
-                in_allocated = True
-                continue
-            elif line and "Events:" in line:
-                in_allocated = False
-                continue
-            if in_allocatable and ':' in line:
-                key, value = [x.strip() for x in line.split(':', 1)]
-                if key in ['cpu', 'memory']:
-                    allocatable[key] = parse_resource_value(value, is_cpu=(key == 'cpu'))
-            if in_allocated and line and not line.startswith(('(', 'Resource', '----')):
-                match = re.match(r'(\w+)\s+(\d+(?:m|[KMG]i)?)\s*\((\d+)%\)\s+(\d+(?:m|[KMG]i)?)\s*\((\d+)%\)', line)
-                if match:
-                    resource, req_val, req_pct, lim_val, lim_pct = match.groups()
-                    if resource in ['cpu', 'memory']:
-                        allocated[resource]['requests'] = parse_resource_value(req_val, is_cpu=(resource == 'cpu'))
-                        allocated[resource]['limits'] = parse_resource_value(lim_val, is_cpu=(resource == 'cpu'))
-        alloc_cpu = allocatable.get('cpu', 0)
-        req_cpu = allocated['cpu']['requests']
-        lim_cpu = allocated['cpu']['limits']
-        remaining_cpu = alloc_cpu - req_cpu
-        req_percent_cpu = float(req_cpu / alloc_cpu * 100) if alloc_cpu else 0
-        lim_percent_cpu = float(lim_cpu / alloc_cpu * 100) if alloc_cpu else 0
-        alloc_mem = allocatable.get('memory', 0)
-        req_mem = allocated['memory']['requests']
-        lim_mem = allocated['memory']['limits']
-        remaining_mem = alloc_mem - req_mem
-        req_percent_mem = float(req_mem / alloc_mem * 100) if alloc_mem else 0
-        lim_percent_mem = float(lim_mem / alloc_mem * 100) if alloc_mem else 0
+    for node, r in table.iterrows():
         row = [
             node,
-            f"{alloc_cpu:.1f}m", f"{req_cpu:.1f}m", f"{req_percent_cpu:.1f}%", f"{lim_cpu:.1f}m", f"{lim_percent_cpu:.1f}%", f"{remaining_cpu:.1f}m",
-            f"{alloc_mem:.1f}Gi", f"{req_mem:.1f}Gi", f"{req_percent_mem:.1f}%", f"{lim_mem:.1f}Gi", f"{lim_percent_mem:.1f}%", f"{remaining_mem:.1f}Gi"
+            f"{r.alloc_cpu:.1f}m", f"{r.cpu_requests:.1f}m", f"{r.cpu_requests_pct:.1f}%", f"{r.cpu_limits:.1f}m", f"{r.cpu_limits_pct:.1f}%", f"{r.cpu_remaining:.1f}m",
+            f"{r.alloc_mem:.1f}Gi", f"{r.memory_requests:.1f}Gi", f"{r.memory_requests_pct:.1f}%", f"{r.memory_limits:.1f}Gi", f"{r.memory_limits_pct:.1f}%", f"{r.memory_remaining:.1f}Gi"
         ]
-        table_data.append((row, req_percent_mem > 90, False))
+        table_data.append((row, bool(r.memory_requests_pct > 90), False))
     html_data['resources'] = {'headers': headers, 'rows': table_data}
 
-def check_pods_for_errors(namespace, html_data, kubeconfig_path):
+# Number of pod logs fetched in parallel by check_pods_for_errors
+LOG_FETCH_WORKERS = int(os.environ.get("LOG_FETCH_WORKERS", "8"))
+# Per-container scan budget: stop reading a log after this many bytes, lines (0 = no line limit) or seconds
+LOG_SCAN_MAX_BYTES = int(os.environ.get("LOG_SCAN_MAX_BYTES", str(256 * 1024 * 1024)))
+LOG_SCAN_MAX_LINES = int(os.environ.get("LOG_SCAN_MAX_LINES", "0"))
+LOG_SCAN_TIMEOUT = int(os.environ.get("LOG_SCAN_TIMEOUT", "30"))
+# Signatures reported per workload (signatures tracked per container: LOG_SCAN_MAX_SIGNATURES)
+LOG_REPORT_SIGNATURES = int(os.environ.get("LOG_REPORT_SIGNATURES", "10"))
+# Worker processes used to classify log chunks (0 = classify in the fetching thread), and lines per chunk
+LOG_SCAN_PROCESSES = int(os.environ.get("LOG_SCAN_PROCESSES", "0"))
+LOG_SCAN_CHUNK_LINES = int(os.environ.get("LOG_SCAN_CHUNK_LINES", "5000"))
+
+log_process_pool = None
+log_process_pool_lock = threading.Lock()
+
+def get_log_process_pool():
+    """Shared process pool for log classification, created on first use."""
+    global log_process_pool
+    with log_process_pool_lock:
+        if log_process_pool is None:
+            # forkserver rather than fork: forking a process that is running Flask and kubectl threads is not safe.
+            # The server preloads the side-effect free classifier, so workers fork from a process that already has it;
+            # the `if __name__ == '__main__'` guard keeps them from serving when they set up this script's module.
+            context = multiprocessing.get_context('forkserver')
+            context.set_forkserver_preload(['viya4_log_classifier'])
+            log_process_pool = ProcessPoolExecutor(max_workers=LOG_SCAN_PROCESSES, mp_context=context,
+                                                   initializer=viya4_log_classifier.init_worker,
+                                                   initargs=(LOG_SCAN_MAX_SIGNATURES,))
+        return log_process_pool
+
+def match_pod_prefixes(pod_names, prefixes):
+    """Pods starting with any of the prefixes, ordered by first matching prefix and then by name.
+
+    Each pod is checked with one dict lookup per distinct prefix length instead of against every prefix.
+    """
+    rank = {}
+    for i, prefix in enumerate(prefixes):
+        rank.setdefault(prefix, i)
+    lengths = sorted({len(prefix) for prefix in rank})
+    matched = []
+    for pod in pod_names:
+        ranks = [rank[pod[:n]] for n in lengths if pod[:n] in rank]
+        if ranks:
+            matched.append((min(ranks), pod))
+    return [pod for _, pod in sorted(matched)]
+
+def log_timestamp_key(timestamp):
+    """Comparable form of a `kubectl logs --timestamps` timestamp; the fraction has its trailing zeros trimmed."""
+    seconds, _, fraction = timestamp.rstrip('Z').partition('.')
+    return seconds, fraction.ljust(9, '0')
+
+def scan_pod_log(namespace, pod, container, kubeconfig_path, since_time=None, status=None, owner=None):
+    """Stream one container's log and collect its ERROR/WARN signatures.
+
+    Lines are classified as they are read, so memory use does not depend on the size of the log; reading
+    stops once the byte/line budget is spent. With LOG_SCAN_PROCESSES set, lines are classified in chunks
+    by the process pool while the next chunk is being read.
+    Lines at or before since_time were counted by an earlier scan and are skipped. If a status dict is given,
+    it also receives the timestamp of the last line read.
+    """
+    status = {} if status is None else status
+    skip_until = since_time and log_timestamp_key(since_time)
+    signatures = {}
+    scanned_bytes = 0
+    pool = get_log_process_pool() if LOG_SCAN_PROCESSES > 0 else None
+    in_flight = deque()
+    chunk = []
+    command = f"kubectl logs -n {namespace} {pod} -c {container} --timestamps"
+    params = {'container': container, 'timestamps': 'true'}
+    if since_time:
+        command += f" --since-time={since_time}"
+        params['sinceTime'] = since_time
+    with closing(kube_stream(kubeconfig_path, f"/api/v1/namespaces/{namespace}/pods/{pod}/log", command,
+                             params=params, timeout=LOG_SCAN_TIMEOUT, status=status, owner=owner)) as lines:
+        lines_read = 0
+        for line in lines:
+            timestamp = line.partition(' ')[0]
+            if skip_until:
+                if log_timestamp_key(timestamp) <= skip_until:
+                    continue
+                skip_until = None
+            lines_read += 1
+            status['last_timestamp'] = timestamp
+            if pool:
+                chunk.append(line)
+                if len(chunk) >= LOG_SCAN_CHUNK_LINES:
+                    in_flight.append(pool.submit(classify_log_chunk, '\n'.join(chunk)))
+                    chunk = []
+                    # Bound the lines held in memory while workers catch up
+                    if len(in_flight) >= LOG_SCAN_PROCESSES * 2:
+                        merge_signatures(signatures, in_flight.popleft().result())
+            else:
+                classify_log_lines((line,), signatures)
+            scanned_bytes += len(line) + 1
+            if scanned_bytes >= LOG_SCAN_MAX_BYTES or (LOG_SCAN_MAX_LINES and lines_read >= LOG_SCAN_MAX_LINES):
+                logger.info(f"Log scan budget reached for pod {pod} after {lines_read} lines")
+                break
+    if pool:
+        if chunk:
+            in_flight.append(pool.submit(classify_log_chunk, '\n'.join(chunk)))
+        while in_flight:
+            merge_signatures(signatures, in_flight.popleft().result())
+    return signatures
+
+# Per-cluster log cursors: kubeconfig path -> (pod, container) -> where the last scan of that container ended
+log_cursors = defaultdict(dict)
+log_cursors_lock = threading.Lock()
+
+def default_container(pod):
+    """Name and restart count of the container `kubectl logs` reads when no -c is given."""
+    containers = [c['name'] for c in pod.get('spec', {}).get('containers', [])]
+    name = pod['metadata'].get('annotations', {}).get('kubectl.kubernetes.io/default-container') or (containers[0] if containers else '')
+    restarts = next((cs.get('restartCount', 0) for cs in pod.get('status', {}).get('containerStatuses', []) if cs['name'] == name), 0)
+    return name, restarts
+
+def pod_workload(pod):
+    """Name of the deployment, statefulset or job a pod belongs to, so replicas can be reported together."""
+    metadata = pod['metadata']
+    owner = next(iter(metadata.get('ownerReferences', [])), None)
+    if not owner:
+        return metadata['name']
+    template_hash = metadata.get('labels', {}).get('pod-template-hash')
+    if owner.get('kind') == 'ReplicaSet' and template_hash and owner['name'].endswith(f"-{template_hash}"):
+        return owner['name'][:-len(template_hash) - 1]
+    return owner['name']
+
+def scan_pod_log_incremental(namespace, pod, kubeconfig_path, owner=None):
+    """Scan only the log lines written since the previous check of the same container.
+
+    The cursor is discarded when the pod UID or the container restart count changes, since the log it
+    pointed into no longer exists. Signatures found earlier are merged with the new ones.
+    """
+    pod_name = pod['metadata']['name']
+    container, restart_count = default_container(pod)
+    key = (pod_name, container)
+    with log_cursors_lock:
+        cursor = log_cursors[kubeconfig_path].get(key)
+    if cursor and (cursor['uid'], cursor['restart_count']) != (pod['metadata'].get('uid'), restart_count):
+        logger.info(f"Pod {pod_name} was recreated or restarted, rescanning its full log")
+        cursor = None
+    status = {}
+    new_signatures = scan_pod_log(namespace, pod_name, container, kubeconfig_path, since_time=cursor and cursor['since_time'], status=status,
+                                  owner=owner)
+    signatures = merge_signatures({signature: dict(stats) for signature, stats in cursor['signatures'].items()} if cursor else {},
+                                  new_signatures)
+    # The cursor moves to the last line actually read, whether the scan reached the end of the log, spent its budget,
+    # timed out or failed: the stored signatures then count every line up to it exactly once
+    if status.get('last_timestamp'):
+        with log_cursors_lock:
+            log_cursors[kubeconfig_path][key] = {'uid': pod['metadata'].get('uid'), 'restart_count': restart_count,
+                                                 'since_time': status['last_timestamp'], 'signatures': signatures}
+    return signatures
+
+def check_pods_for_errors(namespace, html_data, kubeconfig_path, snapshot):
     logger.info(f"Checking pods for errors in namespace: {namespace}")
     sas_pods = ["sas-arke", "sas-authorization", "sas-compute", "sas-configuration", "sas-credentials", 
                 "sas-feature-flags", "sas-files", "sas-identities", "sas-job-execution", "sas-job-execution-app",
                 "sas-launcher", "sas-logon-app", "sas-microanalytic-score", "sas-readiness", "sas-scheduler", 
                 "sas-search", "sas-studio-app", "sas-visual-analytics", "sas-visual-analytics-app"]
-    valid_levels = {"error", "warn"}
     log_entries = []
-    env = os.environ.copy()
-    env['KUBECONFIG'] = kubeconfig_path
-    stdout, stderr, returncode = run_command(f"kubectl get pods -n {namespace} --no-headers", env=env)
-    if returncode != 0 or not stdout:
+    if not snapshot.pods:
         html_data['errors'] = {'headers': ["Message"], 'rows': [["Failed to list pods"]]}
         return
-    running_pods = {line.split()[0] for line in stdout.split('\n') if line.strip()}
-    for pod_prefix in sas_pods:
-        for pod in running_pods:
-            if pod.startswith(pod_prefix):
-                logs, _, _ = run_command(f"kubectl logs -n {namespace} {pod}", env=env)
-                if logs:
-                    unique_messages = {}
-                    for line in logs.split('\n'):
-                        try:
-                            log_entry = json.loads(line)
-                            level = log_entry.get("level", "").lower()
-                            if level in valid_levels:
-                                message = log_entry.get("message", "")
-                                context = log_entry.get("source", "")
-                                full_message = f"[{context}] - {message}"
-                                unique_messages[full_message] = level
-                        except json.JSONDecodeError:
-                            match = re.match(r"(ERROR|WARN) (\d{4}-\d{2}-\d{2}) (\d{2}:\d{2}:\d{2}\.\d+ [+-]\d{4}) \[([^\]]+)\] - (.+)", line)
-                            if match:
-                                level, _, _, context, message = match.groups()
-                                if level.lower() in valid_levels:
-                                    full_message = f"[{context}] - {message}"
-                                    unique_messages[full_message] = level.lower()
-                    if unique_messages:
-                        log_entries.extend([[pod, "", "", lvl.upper(), msg] for msg, lvl in unique_messages.items()][:10])
+    pods = match_pod_prefixes(snapshot.pod_names(), sas_pods)
+    with ThreadPoolExecutor(max_workers=max(LOG_FETCH_WORKERS, 1), thread_name_prefix=f"logs-{namespace}") as pool:
+        scanned = list(pool.map(lambda pod: scan_pod_log_incremental(namespace, snapshot.pod(pod), kubeconfig_path, snapshot.owner), pods))
+    # Forget cursors of pods that no longer exist
+    current = set(pods)
+    with log_cursors_lock:
+        for key in [key for key in log_cursors[kubeconfig_path] if key[0] not in current]:
+            del log_cursors[kubeconfig_path][key]
+    # Combine replicas of the same workload, in the order their pods were matched
+    workloads = {}
+    for pod, signatures in zip(pods, scanned):
+        workload = workloads.setdefault(pod_workload(snapshot.pod(pod)), {'pods': 0, 'signatures': {}})
+        workload['pods'] += 1
+        merge_signatures(workload['signatures'], signatures)
+    for name, workload in workloads.items():
+        overflow = workload['signatures'].pop(OVERFLOW_SIGNATURE, None)
+        ranked = sorted(workload['signatures'].items(), key=lambda item: (-item[1]['count'], item[1]['first_seen']))
+        for signature, stats in ranked[:LOG_REPORT_SIGNATURES]:
+            log_entries.append([name, stats['first_seen'], stats['last_seen'], stats['level'].upper(), stats['example'],
+                                stats['count'], signature, workload['pods']])
+        if overflow:
+            dropped = len(overflow['signatures'])
+            log_entries.append([name, overflow['first_seen'], overflow['last_seen'], "UNTRACKED",
+                                f"{dropped}{'+' if dropped >= LOG_SCAN_MAX_SIGNATURES else ''} further signature(s) not tracked "
+                                f"beyond the limit of {LOG_SCAN_MAX_SIGNATURES} per container", overflow['count'], "", workload['pods']])
     if not log_entries:
-        log_entries.append(["No messages", "", "", "", "All pods checked, no ERROR/WARN lines detected"])
-    html_data['errors'] = {'headers': ["POD_NAME", "DATE", "TIME", "LOG_CODE", "MESSAGE"], 'rows': log_entries}
+        log_entries.append(["No messages", "", "", "", "All pods checked, no ERROR/WARN lines detected", 0, "", 0])
+    html_data['errors'] = {'headers': ["WORKLOAD", "FIRST_SEEN", "LAST_SEEN", "LOG_CODE", "MESSAGE", "COUNT", "SIGNATURE", "PODS"],
+                           'rows': log_entries}
 
-def pod_resource_utilization(namespace, html_data, kubeconfig_path):
+def pod_container_limits(pod):
+    """CPU (m) and memory (Gi) limits of a pod, summed across all of its containers."""
+    containers = pod.get('spec', {}).get('containers', [])
+    return {
+        'cpu_lim': sum(parse_resource_value(c.get('resources', {}).get('limits', {}).get('cpu'), is_cpu=True) for c in containers),
+        'mem_lim': sum(parse_resource_value(c.get('resources', {}).get('limits', {}).get('memory')) for c in containers)
+    }
+
+def pod_resource_utilization(namespace, html_data, kubeconfig_path, snapshot):
     logger.info(f"Checking pod resource utilization in namespace: {namespace}")
     pod_prefixes = ('sas-authorization', 'sas-identities', 'sas-search', 'sas-arke', 'sas-studio-app', 'sas-studio', 'sas-launcher', 'sas-credentials', 'sas-crunchy-platform-postgres', 'sas-rabbitmq-server', 'sas-consul-server')
     env = os.environ.copy()
     env['KUBECONFIG'] = kubeconfig_path
-    stdout, stderr, returncode = run_command(f"kubectl get pods -n {namespace} --no-headers", env=env)
-    if returncode != 0 or not stdout:
+    if not snapshot.pods:
         html_data['pod_resources'] = {'headers': ["Message"], 'rows': [["Failed to list pods"]]}
         return
-    pods = [line.split()[0] for line in stdout.split('\n') if line.strip() and line.split()[0].startswith(pod_prefixes)]
+    pods = [pod for pod in snapshot.pods if pod['metadata']['name'].startswith(pod_prefixes)]
     if not pods:
         html_data['pod_resources'] = {'headers': ["Message"], 'rows': [["No specified pods found"]]}
         return
-    top_output, _, _ = run_command(f"kubectl top pods -n {namespace} --no-headers", env=env)
+    top_output, _, _ = run_command(f"kubectl top pods -n {namespace} --no-headers", env=env, owner=snapshot.owner)
     if not top_output:
         html_data['pod_resources'] = {'headers': ["Message"], 'rows': [["Failed to get pod utilization"]]}
         return
-    usage_data = {}
+    usage_data = []
     for line in top_output.split('\n'):
         if line.strip():
             match = re.match(r'(\S+)\s+(\d+m?)\s+(\d+(?:Mi|Gi|Ki)?)', line)
             if match:
                 pod_name, cpu_usage, mem_usage = match.groups()
                 if pod_name.startswith(pod_prefixes):
-                    usage_data[pod_name] = {
+                    usage_data.append({
+                        'pod': pod_name,
                         'cpu_usage': parse_resource_value(cpu_usage, is_cpu=True),
                         'mem_usage': parse_resource_value(mem_usage, is_cpu=False)
-                    }
+                    })
+    limits = pd.DataFrame([{'pod': pod['metadata']['name'], **pod_container_limits(pod)} for pod in pods])
+    usage = pd.DataFrame(usage_data, columns=['pod', 'cpu_usage', 'mem_usage'])
+    merged = limits.merge(usage, on='pod', how='left').fillna({'cpu_usage': 0, 'mem_usage': 0})
+    merged['cpu_lim_pct'] = (merged.cpu_usage / merged.cpu_lim * 100).where(merged.cpu_lim > 0, 0)
+    merged['mem_lim_pct'] = (merged.mem_usage / merged.mem_lim * 100).where(merged.mem_lim > 0, 0)
     headers = ["Pod Name", "CPU Usage", "CPU Lim", "CPU Lim %", "Memory Usage", "Mem Lim", "Mem Lim %"]
     table_data = []
-    for pod in pods:
-        describe_output, _, _ = run_command(f"kubectl describe pod -n {namespace} {pod}", env=env)
-        if not describe_output:
-            continue
-        cpu_lim, mem_lim = 0, 0
-        in_containers = False
-        lines = describe_output.split('\n')
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
-            if line.startswith("Containers:"):
-                in_containers = True
-            elif in_containers and line.startswith("Limits:"):
-                i += 1
-                while i < len(lines) and lines[i].strip():
-                    subline = lines[i].strip()
-                    if subline.startswith("cpu:"):
-                        cpu_lim = parse_resource_value(subline.split(":")[1].strip(), is_cpu=True)
-                    elif subline.startswith("memory:"):
-                        mem_lim = parse_resource_value(subline.split(":")[1].strip(), is_cpu=False)
-                    elif subline.startswith("Requests:"):
-                        break
-                    i += 1
-            i += 1
-        pod_usage = usage_data.get(pod, {'cpu_usage': 0, 'mem_usage': 0})
-        cpu_usage = pod_usage['cpu_usage']
-        mem_usage = pod_usage['mem_usage']
-        cpu_lim_pct = float(cpu_usage / cpu_lim * 100) if cpu_lim else 0
-        mem_lim_pct = float(mem_usage / mem_lim * 100) if mem_lim else 0
+    for r in merged.itertuples(index=False):
         row = [
-            pod,
-            f"{cpu_usage:.1f}m", f"{cpu_lim:.1f}m", f"{cpu_lim_pct:.1f}%",
-            f"{mem_usage:.1f}Gi", f"{mem_lim:.1f}Gi", f"{mem_lim_pct:.1f}%"
+            r.pod,
+            f"{r.cpu_usage:.1f}m", f"{r.cpu_lim:.1f}m", f"{r.cpu_lim_pct:.1f}%",
+            f"{r.mem_usage:.1f}Gi", f"{r.mem_lim:.1f}Gi", f"{r.mem_lim_pct:.1f}%"
         ]
-        table_data.append((row, mem_lim_pct > 90, False))
+        table_data.append((row, bool(r.mem_lim_pct > 90), False))
     html_data['pod_resources'] = {'headers': headers, 'rows': table_data}
 
-def generate_report_html(tla, env, results):
+def iter_report_html(tla, env, results, generated_on=None):
+    """Yield the downloadable report around results, given as one HTML string or as an iterable of chunks."""
     html_content = """
     <!DOCTYPE html>
     <html lang="en">
@@ -1309,21 +2681,561 @@ def generate_report_html(tla, env, results):
     </body>
     </html>
     """
-    return html_content.format(
+    head, foot = html_content.split("{results}")
+    yield head.format(
         tla=tla,
         env=env,
-        timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-        results=results
+        timestamp=generated_on or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     )
+    if isinstance(results, str):
+        yield results
+    else:
+        yield from results
+    yield foot
+
+def generate_report_html(tla, env, results, generated_on=None):
+    return "".join(iter_report_html(tla, env, results, generated_on))
+
+# Troubleshooting substeps in report order, and the substeps each one must wait for.
+# All substeps read the run's NamespaceSnapshot, so none of them has to wait for another.
+SUBSTEPS = ['list_pods', 'sas_readiness_check', 'list_nodes_and_utilization',
+            'node_resource_utilization', 'check_pods_for_errors', 'pod_resource_utilization']
+SUBSTEP_DEPENDENCIES = {
+    'list_pods': (),
+    'sas_readiness_check': (),
+    'list_nodes_and_utilization': (),
+    'node_resource_utilization': (),
+    'check_pods_for_errors': (),
+    'pod_resource_utilization': ()
+}
+
+def run_store_connection():
+    connection = sqlite3.connect(RUN_STORE_PATH, timeout=30)
+    connection.row_factory = sqlite3.Row
+    return connection
+
+def init_run_store():
+    with closing(run_store_connection()) as connection, connection:
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("""CREATE TABLE IF NOT EXISTS runs (
+                                  id INTEGER PRIMARY KEY AUTOINCREMENT,
+                                  service TEXT NOT NULL,
+                                  timestamp TEXT NOT NULL,
+                                  tla TEXT NOT NULL,
+                                  env TEXT NOT NULL,
+                                  status TEXT NOT NULL,
+                                  results TEXT,
+                                  html_data TEXT,
+                                  report_digest TEXT,
+                                  trigger TEXT NOT NULL DEFAULT 'manual')""")
+        columns = {row['name'] for row in connection.execute("PRAGMA table_info(runs)")}
+        if 'report_digest' not in columns:
+            connection.execute("ALTER TABLE runs ADD COLUMN report_digest TEXT")
+        if 'trigger' not in columns:
+            connection.execute("ALTER TABLE runs ADD COLUMN trigger TEXT NOT NULL DEFAULT 'manual'")
+        connection.execute("CREATE INDEX IF NOT EXISTS runs_service_timestamp ON runs (service, timestamp)")
+        # Progress of the current run of each service, shared by all worker processes
+        connection.execute("""CREATE TABLE IF NOT EXISTS run_state (
+                                  service TEXT PRIMARY KEY,
+                                  version INTEGER NOT NULL,
+                                  owner INTEGER NOT NULL,
+                                  owner_started TEXT,
+                                  cancel_requested INTEGER NOT NULL DEFAULT 0,
+                                  state TEXT NOT NULL)""")
+        if 'owner_started' not in {row['name'] for row in connection.execute("PRAGMA table_info(run_state)")}:
+            connection.execute("ALTER TABLE run_state ADD COLUMN owner_started TEXT")
+        connection.execute("CREATE TABLE IF NOT EXISTS portal_state (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+def report_archive_path(digest):
+    return os.path.join(REPORT_ARCHIVE_DIR, digest[:2], f"{digest}.html.gz")
+
+def archive_report(tla, env, results, timestamp):
+    """Render the downloadable report of a run once and store it gzip-compressed under its SHA-256; returns the digest."""
+    # Stream the rendered chunks through the hash and the compressor into a temporary file, then move it
+    # to its content address; readers never see a partial archive
+    sha256 = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=REPORT_ARCHIVE_DIR, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as tmp_file, gzip.GzipFile(fileobj=tmp_file, mode='wb', compresslevel=6, mtime=0) as archive:
+            for chunk in iter_report_html(tla, env, results, generated_on=timestamp):
+                chunk = chunk.encode('utf-8')
+                sha256.update(chunk)
+                archive.write(chunk)
+        digest = sha256.hexdigest()
+        path = report_archive_path(digest)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return digest
+
+def save_run(service, tla, env, results, html_data, trigger='manual'):
+    """Store a completed run and prune the oldest runs of the service beyond RUN_STORE_MAX_RUNS.
+
+    trigger records what started the run: 'manual', 'fleet' or 'scheduled'.
+    """
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    report_digest = archive_report(tla, env, results, timestamp)
+    with closing(run_store_connection()) as connection, connection:
+        cursor = connection.execute(
+            "INSERT INTO runs (service, timestamp, tla, env, status, results, html_data, report_digest, trigger) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (service, timestamp, tla, env, 'Completed', results, json.dumps(html_data, default=str), report_digest, trigger))
+        pruned = connection.execute("SELECT id, report_digest FROM runs WHERE service = ? AND id NOT IN "
+                                    "(SELECT id FROM runs WHERE service = ? ORDER BY id DESC LIMIT ?)",
+                                    (service, service, RUN_STORE_MAX_RUNS)).fetchall()
+        connection.executemany("DELETE FROM runs WHERE id = ?", [(row['id'],) for row in pruned])
+        # Remove the archives no remaining run refers to while the insert still holds the store's write lock;
+        # a run whose archive is missing gets it rebuilt by run_report_digest
+        for digest in {row['report_digest'] for row in pruned if row['report_digest']}:
+            if connection.execute("SELECT 1 FROM runs WHERE report_digest = ? LIMIT 1", (digest,)).fetchone() is None:
+                try:
+                    os.remove(report_archive_path(digest))
+                except FileNotFoundError:
+                    pass
+    logger.info(f"Stored run {cursor.lastrowid} of {service}")
+    return {'id': cursor.lastrowid, 'timestamp': timestamp}
+
+def get_run(run_id):
+    """A stored run with its results HTML and html_data, or None."""
+    if run_id is None:
+        return None
+    with closing(run_store_connection()) as connection:
+        row = connection.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+    if row is None:
+        return None
+    run = dict(row)
+    run['html_data'] = json.loads(run['html_data']) if run['html_data'] else {}
+    return run
+
+def find_run_id(service, timestamp=None):
+    """ID of the latest stored run of a service, or of its latest run at the given timestamp."""
+    query = "SELECT id FROM runs WHERE service = ?"
+    params = [service]
+    if timestamp is not None:
+        query += " AND timestamp = ?"
+        params.append(timestamp)
+    with closing(run_store_connection()) as connection:
+        row = connection.execute(query + " ORDER BY id DESC LIMIT 1", params).fetchone()
+    return row['id'] if row else None
+
+def result_run_id(service):
+    """ID of the run behind the Result tab: the newest stored run, scheduled or manual, unless this browser's own run is in progress."""
+    if session.get(f'status_{service}') == 'Running':
+        return session.get(f'run_id_{service}')
+    return find_run_id(service)
+
+def list_runs(service, limit=RECENT_RUNS_LIMIT):
+    """ID, timestamp and trigger of the most recent stored runs of a service, newest first."""
+    with closing(run_store_connection()) as connection:
+        rows = connection.execute("SELECT id, timestamp, trigger FROM runs WHERE service = ? ORDER BY id DESC LIMIT ?",
+                                  (service, limit)).fetchall()
+    return [dict(row) for row in rows]
+
+def run_report_digest(run):
+    """Digest of the archived report of a run, archiving it first for runs stored before the archive existed."""
+    if run['report_digest'] and os.path.exists(report_archive_path(run['report_digest'])):
+        return run['report_digest']
+    digest = archive_report(run['tla'], run['env'], run['results'], run['timestamp'])
+    if digest != run['report_digest']:
+        with closing(run_store_connection()) as connection, connection:
+            connection.execute("UPDATE runs SET report_digest = ? WHERE id = ?", (digest, run['id']))
+    return digest
+
+def send_report(run, download_name):
+    """Send the archived report of a run, gzip-encoded as stored when the client accepts it."""
+    digest = run_report_digest(run)
+    path = report_archive_path(digest)
+    if request.accept_encodings['gzip']:
+        response = send_file(path, mimetype='text/html', as_attachment=True, download_name=download_name,
+                             etag=f"{digest}-gzip", conditional=True)
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = send_file(gzip.open(path, 'rb'), mimetype='text/html', as_attachment=True, download_name=download_name,
+                             etag=digest, last_modified=os.path.getmtime(path), conditional=True)
+    response.vary.add('Accept-Encoding')
+    return response
+
+RESULT_PAGE_SIZE = int(os.environ.get("RESULT_PAGE_SIZE", "50"))
+RESULT_PAGE_SIZE_MAX = int(os.environ.get("RESULT_PAGE_SIZE_MAX", "1000"))
+TABLE_SECTIONS = ('pods', 'nodes', 'resources', 'errors', 'pod_resources')
+HIGH_USAGE_COLUMNS = {'resources': 9, 'pod_resources': 6}
+SORT_NUMBER = re.compile(r'^(-?\d+(?:\.\d+)?)(m|%|Ki|Mi|Gi|Ti|k|M|G|T)?(?:\s.*)?$')
+SORT_DURATION = re.compile(r'^(?:(\d+)y)?(?:(\d+)d)?(?:(\d+)h)?(?:(\d+)m)?(?:(\d+)s)?$')
+
+def section_title(key):
+    return {'readiness': "SAS Readiness Check", 'errors': "Check Pods for Errors"}.get(key, key.replace('_', ' ').title())
+
+def table_rows(data):
+    """(cells, high_usage) of each row of a stored table section; rows may carry a (row, high_usage, _) triple."""
+    rows = []
+    for row_data in data['rows']:
+        if len(row_data) == 3 and isinstance(row_data[0], (list, tuple)):
+            rows.append((list(row_data[0]), bool(row_data[1])))
+        else:
+            rows.append((list(row_data), False))
+    return rows
+
+def column_sort_key(header, cell):
+    """Sort key of a table cell: quantities (CPU, memory, %), kubectl ages and numbers by value, anything else as text."""
+    if isinstance(cell, (int, float)) and not isinstance(cell, bool):
+        return (0, float(cell), "")
+    text = str(cell).strip()
+    if header == "AGE":
+        match = SORT_DURATION.match(text)
+        if text and match:
+            years, days, hours, minutes, seconds = (int(part or 0) for part in match.groups())
+            return (0, float((((years * 365 + days) * 24 + hours) * 60 + minutes) * 60 + seconds), "")
+    match = SORT_NUMBER.match(text)
+    if match:
+        number, unit = match.groups()
+        if unit == 'm':
+            return (0, float(number) / 1000, "")
+        if unit in MEMORY_UNITS_GI:
+            return (0, parse_resource_value(number + unit), "")
+        return (0, float(number), "")
+    return (1, 0.0, text.lower())
+
+def table_page(html_data, section, offset=0, limit=RESULT_PAGE_SIZE, sort=None, order='asc', text_filter=""):
+    """One page of a stored table section, filtered by text and sorted by a column; only the rows up to the page are ordered."""
+    data = html_data[section]
+    headers = list(data['headers'])
+    rows = table_rows(data)
+    if text_filter:
+        needle = text_filter.lower()
+        rows = [row for row in rows if any(needle in str(cell).lower() for cell in row[0])]
+    total = len(rows)
+    end = offset + limit
+    if sort in headers:
+        index = headers.index(sort)
+        def key(row, index=index):
+            return column_sort_key(sort, row[0][index] if index < len(row[0]) else "")
+        if end < total:
+            # Top-N with a heap instead of sorting every row of a large namespace
+            rows = (heapq.nlargest if order == 'desc' else heapq.nsmallest)(end, rows, key=key)
+        else:
+            rows = sorted(rows, key=key, reverse=order == 'desc')
+    page = rows[offset:end]
+    return {
+        'section': section,
+        'title': section_title(section),
+        'headers': headers,
+        'high_usage_column': HIGH_USAGE_COLUMNS.get(section),
+        'total': total,
+        'offset': offset,
+        'limit': limit,
+        'rows': [{'cells': cells, 'high_usage': high_usage} for cells, high_usage in page]
+    }
+
+init_run_store()
+
+run_store_lock = threading.Lock()
+
+def finalize_run(service, t_data):
+    """Store the finished run of a service exactly once, whichever of the future callback and /status gets here first."""
+    with run_store_lock:
+        tasks = task_results[service]
+        if tasks.get('run') is None:
+            tasks['run'] = save_run(service, tasks.get('tla', ''), tasks.get('env', ''), t_data['results'], t_data['html_data'],
+                                    trigger=tasks.get('trigger', 'manual'))
+        return tasks['run']
+
+# Run progress lives in the run store so any worker process can answer for a run another one executes.
+# The worker executing a run (its owner) keeps its working copy in task_results and publishes it on every change.
+RUN_STATE_POLL_INTERVAL = float(os.environ.get("RUN_STATE_POLL_INTERVAL", "1"))
+SHARED_TASK_FIELDS = ('tla', 'env', 'trigger', 'login_outcome', 'troubleshoot_outcome', 'run', 'substep_running',
+                      'substep_completed')
+INTERRUPTED_MESSAGE = "Interrupted because the portal worker running it stopped."
+
+def process_start_token(pid):
+    """Boot id and start time of a process, which tell it apart from a later process reusing its pid; None without /proc."""
+    try:
+        with open("/proc/sys/kernel/random/boot_id") as boot_id_file, open(f"/proc/{pid}/stat") as stat_file:
+            # starttime is field 22; the command name before it may contain spaces and parentheses
+            return f"{boot_id_file.read().strip()}:{stat_file.read().rpartition(')')[2].split()[19]}"
+    except (OSError, IndexError):
+        return None
+
+process_start_tokens = {}
+
+def own_start_token():
+    pid = os.getpid()
+    if pid not in process_start_tokens:
+        process_start_tokens[pid] = process_start_token(pid)
+    return process_start_tokens[pid]
+
+def process_alive(pid, start_token=None):
+    """Whether the process that recorded pid and start_token still runs; a reused pid does not count as alive."""
+    if start_token is not None and os.path.exists("/proc/self/stat"):
+        return process_start_token(pid) == start_token
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def run_state_connection():
+    connection = run_store_connection()
+    # Progress updates are frequent and can be lost on a power failure without harm
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+def shared_run_running(state):
+    login, troubleshoot = state.get('login_outcome'), state.get('troubleshoot_outcome')
+    return bool(state) and troubleshoot is None and (login is None or login[0])
+
+def run_orphaned(row):
+    return shared_run_running(json.loads(row['state'])) and not process_alive(row['owner'], row['owner_started'])
+
+def interrupted_state(state):
+    """State of a run whose owner process is gone: it can never finish, so it failed."""
+    state = dict(state, queue_position=None)
+    state['login_outcome'] = state.get('login_outcome') or [False, INTERRUPTED_MESSAGE]
+    if state['login_outcome'][0]:
+        state['troubleshoot_outcome'] = [False, INTERRUPTED_MESSAGE]
+    return state
+
+def load_run_state(service):
+    """Shared state of the current run of a service; empty when the service never ran.
+
+    Read-only: a run whose owner process is gone is shown as failed, and the run-state watcher records that.
+    """
+    with closing(run_state_connection()) as connection:
+        row = connection.execute("SELECT * FROM run_state WHERE service = ?", (service,)).fetchone()
+    if row is None:
+        return {}
+    state = json.loads(row['state'])
+    if run_orphaned(row):
+        state = interrupted_state(state)
+    state.update(version=row['version'], owner=row['owner'], cancel_requested=bool(row['cancel_requested']))
+    return state
+
+def fail_orphaned_runs(connection):
+    """Record the failure of runs whose owner process is gone, so their version moves on for event streams."""
+    for row in connection.execute("SELECT * FROM run_state").fetchall():
+        if run_orphaned(row):
+            logger.warning(f"The run of {row['service']} lost its worker process {row['owner']}")
+            connection.execute("UPDATE run_state SET version = version + 1, state = ? WHERE service = ? AND version = ?",
+                               (json.dumps(interrupted_state(json.loads(row['state']))), row['service'], row['version']))
 
-def troubleshoot_service(service, tla, env):
+def load_run_state_row(connection, service):
+    row = connection.execute("SELECT owner, owner_started, state FROM run_state WHERE service = ?", (service,)).fetchone()
+    if row is None or not process_alive(row['owner'], row['owner_started']):
+        return {}
+    return json.loads(row['state'])
+
+def claim_run_state(service, state):
+    """Make this process the owner of a new run of a service; False while a live run of the service exists."""
+    with closing(run_state_connection()) as connection:
+        connection.isolation_level = None
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            # Checked inside the write transaction, so two workers cannot both start the service
+            if shared_run_running(load_run_state_row(connection, service)):
+                connection.execute("ROLLBACK")
+                return False
+            connection.execute("""INSERT INTO run_state (service, version, owner, owner_started, cancel_requested, state)
+                                  VALUES (?, 1, ?, ?, 0, ?)
+                                  ON CONFLICT(service) DO UPDATE SET version = version + 1, owner = excluded.owner,
+                                                                     owner_started = excluded.owner_started,
+                                                                     cancel_requested = 0, state = excluded.state""",
+                               (service, os.getpid(), own_start_token(), json.dumps(state)))
+            connection.execute("COMMIT")
+            return True
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+def request_cancel(service):
+    """Ask the worker process owning the running job of a service to cancel it; False when no other worker runs it."""
+    if not shared_run_running(load_run_state(service)):
+        return False
+    with closing(run_state_connection()) as connection, connection:
+        return connection.execute("UPDATE run_state SET cancel_requested = 1 WHERE service = ? AND owner != ?",
+                                  (service, os.getpid())).rowcount > 0
+
+def take_cancel_requests(services):
+    """Services among the given ones of this process whose cancellation another worker requested, clearing the requests."""
+    with closing(run_state_connection()) as connection, connection:
+        placeholders = ",".join("?" * len(services))
+        requested = [row['service'] for row in connection.execute(
+            f"SELECT service FROM run_state WHERE cancel_requested = 1 AND owner = ? AND service IN ({placeholders})",
+            (os.getpid(), *services))]
+        connection.executemany("UPDATE run_state SET cancel_requested = 0 WHERE service = ?", [(s,) for s in requested])
+        return requested
+
+def load_portal_state(key, default=None):
+    with closing(run_store_connection()) as connection:
+        row = connection.execute("SELECT value FROM portal_state WHERE key = ?", (key,)).fetchone()
+    return json.loads(row['value']) if row else default
+
+def save_portal_state(key, value):
+    with closing(run_state_connection()) as connection, connection:
+        connection.execute("INSERT INTO portal_state (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                           (key, json.dumps(value)))
+
+SSE_KEEPALIVE = int(os.environ.get("SSE_KEEPALIVE", "15"))
+# Open event streams per worker process; each holds one of its PORTAL_THREADS, so keep this well below it.
+# Browsers turned away fall back to polling /status.
+SSE_MAX_STREAMS = int(os.environ.get("SSE_MAX_STREAMS", "8"))
+
+# Event streams wait for task_update_serial to move: publish_task_update moves it for runs of this process,
+# the run-state watcher for runs of other worker processes
+task_updates = threading.Condition()
+task_update_serial = 0
+run_state_watcher_pid = None
+
+def notify_task_update():
+    global task_update_serial
+    with task_updates:
+        task_update_serial += 1
+        task_updates.notify_all()
+
+def watch_run_state():
+    """Read the versions of all runs once per RUN_STATE_POLL_INTERVAL for the whole process and wake event streams on a change."""
+    versions = None
+    while True:
+        try:
+            with closing(run_state_connection()) as connection, connection:
+                fail_orphaned_runs(connection)
+                current = {row['service']: row['version'] for row in connection.execute("SELECT service, version FROM run_state")}
+            if current != versions:
+                versions = current
+                notify_task_update()
+        except Exception as e:
+            logger.error(f"Failed to check the run store for run updates: {e}")
+        time.sleep(RUN_STATE_POLL_INTERVAL)
+
+def ensure_run_state_watcher():
+    global run_state_watcher_pid
+    with task_updates:
+        # Started on first use in each process: worker processes forked after import do not inherit threads
+        if run_state_watcher_pid == os.getpid():
+            return
+        run_state_watcher_pid = os.getpid()
+    threading.Thread(target=watch_run_state, name="run-state-watcher", daemon=True).start()
+
+def publish_task_update(service):
+    """Publish the owner's state of a service's run to the run store with a new version, and wake local event streams."""
+    tasks = task_results[service]
+    state = {field: tasks[field] for field in SHARED_TASK_FIELDS if field in tasks}
+    state['queue_position'] = job_queue.position(service)
+    with closing(run_state_connection()) as connection, connection:
+        connection.execute("""INSERT INTO run_state (service, version, owner, owner_started, state) VALUES (?, 1, ?, ?, ?)
+                              ON CONFLICT(service) DO UPDATE SET version = version + 1, owner = excluded.owner,
+                                                                 owner_started = excluded.owner_started, state = excluded.state""",
+                           (service, os.getpid(), own_start_token(), json.dumps(state)))
+    notify_task_update()
+
+def record_task_outcome(service, task, future):
+    """Done-callback of the login and troubleshoot futures; keeps (success, message) for the event stream."""
+    data = None
+    try:
+        success, message, data = future.result()
+    except Exception as e:
+        success, message = False, str(e)
+    tasks = task_results[service]
+    tasks[f'{task}_outcome'] = (success, message)
+    if task == 'troubleshoot' and success:
+        tasks['troubleshoot_data'] = data
+    elif task == 'troubleshoot':
+        tasks['substep_running'] = [False] * 6
+        tasks['substep_completed'] = [False] * 6
+    # Store the run as soon as both steps succeeded, even when no browser is polling
+    if all(tasks.get(f'{name}_outcome', (False,))[0] for name in ('login', 'troubleshoot')):
+        finalize_run(service, tasks['troubleshoot_data'])
+    publish_task_update(service)
+
+def task_state(service):
+    """Shared run state of a service in the shape of /status, without results and past runs."""
+    tasks = load_run_state(service)
+    login = tasks.get('login_outcome')
+    troubleshoot = tasks.get('troubleshoot_outcome')
+    login_completed = bool(login and login[0])
+    login_failed = bool(login and not login[0])
+    troubleshoot_completed = login_completed and bool(troubleshoot and troubleshoot[0])
+    troubleshoot_failed = login_completed and bool(troubleshoot and not troubleshoot[0])
+    if login_failed or troubleshoot_failed:
+        status = 'Failed'
+    elif troubleshoot_completed:
+        status = 'Completed'
+    elif 'version' in tasks:
+        status = 'Running'
+    else:
+        status = 'Ready'
+    queue_position = tasks.get('queue_position') if status == 'Running' else None
+    return {
+        'version': tasks.get('version', 0),
+        'status': status,
+        'queue_position': queue_position,
+        'login_running': status == 'Running' and login is None and queue_position is None,
+        'login_completed': login_completed,
+        'login_failed': login_failed,
+        'login_message': login[1] if login_failed else '',
+        'troubleshoot_running': status == 'Running' and login_completed,
+        'troubleshoot_completed': troubleshoot_completed,
+        'substep_running': list(tasks.get('substep_running', [False] * 6)),
+        'substep_completed': list(tasks.get('substep_completed', [False] * 6))
+    }
+
+def run_substep_graph(service, substep_functions, args):
+    """Run SUBSTEPS concurrently, starting each one as soon as its dependencies have completed."""
+    index = {substep: i for i, substep in enumerate(SUBSTEPS)}
+    pending = {substep: set(SUBSTEP_DEPENDENCIES.get(substep, ())) for substep in SUBSTEPS}
+    running = {}
+    first_error = None
+    cancel = task_results[service].get('cancel')
+    with ThreadPoolExecutor(max_workers=len(SUBSTEPS), thread_name_prefix=f"substep-{service}") as pool:
+        while pending or running:
+            if first_error is None and cancel is not None and cancel.is_set():
+                # Start no further substeps of a cancelled run
+                first_error = RuntimeError(CANCELLED_MESSAGE)
+                pending.clear()
+            if first_error is None:
+                for substep in [s for s, deps in pending.items() if not deps]:
+                    del pending[substep]
+                    task_results[service]['substep_running'][index[substep]] = True
+                    publish_task_update(service)
+                    logger.info(f"Running substep {substep} for {service}")
+                    running[pool.submit(substep_functions[substep], *args)] = substep
+            if not running:
+                # After a failure the failure is reported, not the substeps it left waiting
+                if pending and first_error is None:
+                    raise RuntimeError(f"Unresolvable substep dependencies: {sorted(pending)}")
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                substep = running.pop(future)
+                task_results[service]['substep_running'][index[substep]] = False
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"Substep {substep} failed for {service}: {e}")
+                    publish_task_update(service)
+                    if first_error is None:
+                        first_error = e
+                    continue
+                task_results[service]['substep_completed'][index[substep]] = True
+                publish_task_update(service)
+                logger.info(f"Completed substep {substep} for {service}")
+                for deps in pending.values():
+                    deps.discard(substep)
+    if first_error is not None:
+        raise first_error
+
+def troubleshoot_service(service, tla, env, owner=None):
     namespace = f"{tla.lower()}{env.lower()}"
     kubeconfig_path = f"/home/anzdes/kubeconfig/{namespace}/.kube/config"
-    check_kubeconfig_context(kubeconfig_path)
+    check_kubeconfig_context(kubeconfig_path, owner)
     try:
         html_data = {}
-        substeps = ['list_pods', 'sas_readiness_check', 'list_nodes_and_utilization', 
-                    'node_resource_utilization', 'check_pods_for_errors', 'pod_resource_utilization']
         substep_functions = {
             'list_pods': list_pods,
             'sas_readiness_check': sas_readiness_check,
@@ -1334,18 +3246,14 @@ def troubleshoot_service(service, tla, env):
         }
         
         # Initialize substep states in task_results
-        if 'substep_running' not in task_results[service]:
-            task_results[service]['substep_running'] = [False] * len(substeps)
-            task_results[service]['substep_completed'] = [False] * len(substeps)
+        task_results[service]['substep_running'] = [False] * len(SUBSTEPS)
+        task_results[service]['substep_completed'] = [False] * len(SUBSTEPS)
         
         logger.info(f"Starting troubleshooting steps for {service}")
-        for i, substep in enumerate(substeps):
-            task_results[service]['substep_running'][i] = True
-            logger.info(f"Running substep {substep} for {service}")
-            substep_functions[substep](namespace, html_data, kubeconfig_path)
-            task_results[service]['substep_running'][i] = False
-            task_results[service]['substep_completed'][i] = True
-            logger.info(f"Completed substep {substep} for {service}")
+        snapshot = NamespaceSnapshot(namespace, kubeconfig_path, owner)
+        run_substep_graph(service, substep_functions, (namespace, html_data, kubeconfig_path, snapshot))
+        if not snapshot.errors.get('sas_deployments'):
+            metadata_cache.put(('sas_deployment', kubeconfig_path, namespace), snapshot.sas_deployment_info())
         
         results = generate_results_html(html_data)
         return True, "", {'results': results, 'html_data': html_data}
@@ -1353,6 +3261,434 @@ def troubleshoot_service(service, tla, env):
         logger.error(f"Error during processing for {service}: {e}", exc_info=True)
         return False, str(e), None
 
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "4"))
+# Interactive runs go before fleet runs, and both before scheduled background checks
+JOB_PRIORITIES = {'manual': 0, 'fleet': 1, 'scheduled': 2}
+CANCELLED_MESSAGE = "Cancelled by user."
+
+class JobQueue:
+    """Runs health-check jobs (login, then troubleshooting) on a global budget of JOB_WORKERS workers.
+
+    Each service has a FIFO of jobs of which only the head may run. Among the heads, the job with the best priority
+    starts first, and jobs of equal priority start in submission order.
+    """
+
+    def __init__(self, workers):
+        self.lock = threading.Lock()
+        self.workers = workers
+        self.queues = defaultdict(deque)
+        self.running = {}
+        self.sequence = 0
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self.watcher_pid = None
+
+    def submit(self, service, tla, env, trigger, login_future, troubleshoot_future, cancel):
+        with self.lock:
+            # Started on first use in each process: worker processes forked after import do not inherit threads
+            if self.watcher_pid != os.getpid():
+                self.watcher_pid = os.getpid()
+                threading.Thread(target=self.watch_cancel_requests, name="job-cancel-watcher", daemon=True).start()
+            self.sequence += 1
+            self.queues[service].append({
+                'service': service, 'tla': tla, 'env': env, 'trigger': trigger,
+                'priority': JOB_PRIORITIES.get(trigger, max(JOB_PRIORITIES.values())), 'sequence': self.sequence,
+                'login_future': login_future, 'troubleshoot_future': troubleshoot_future, 'cancel': cancel
+            })
+        self._dispatch()
+
+    def _waiting(self):
+        jobs = [job for service, queue in self.queues.items() for job in queue]
+        return sorted(jobs, key=lambda job: (job['priority'], job['sequence']))
+
+    def position(self, service):
+        """1-based place of the service's next job among all waiting jobs; None when it has none waiting."""
+        with self.lock:
+            for position, job in enumerate(self._waiting(), 1):
+                if job['service'] == service:
+                    return position
+        return None
+
+    def _dispatch(self):
+        started = []
+        with self.lock:
+            while len(self.running) < self.workers:
+                heads = [queue[0] for service, queue in self.queues.items() if queue and service not in self.running]
+                if not heads:
+                    break
+                job = min(heads, key=lambda job: (job['priority'], job['sequence']))
+                self.queues[job['service']].popleft()
+                self.running[job['service']] = job
+                started.append(job)
+            waiting = set(job['service'] for job in self._waiting())
+        for job in started:
+            logger.info(f"Starting {job['trigger']} health check of {job['service']}")
+            self.executor.submit(self._run, job)
+        # Queue positions shift whenever a job leaves the queue
+        for service in waiting.union(job['service'] for job in started):
+            publish_task_update(service)
+
+    def _run(self, job):
+        service, tla, env = job['service'], job['tla'], job['env']
+        try:
+            try:
+                login = run_login_script(tla, env, service, owner=job['sequence'])
+            except Exception as e:
+                logger.error(f"Login failed for {service}: {e}", exc_info=True)
+                login = (False, str(e), None)
+            if job['cancel'].is_set():
+                login = (False, CANCELLED_MESSAGE, login[2])
+            job['login_future'].set_result(login)
+            if not login[0]:
+                job['troubleshoot_future'].set_result((False, f"Skipped because login failed: {login[1]}", None))
+                return
+            try:
+                outcome = troubleshoot_service(service, tla, env, owner=job['sequence'])
+            except Exception as e:
+                logger.error(f"Troubleshooting failed for {service}: {e}", exc_info=True)
+                outcome = (False, str(e), None)
+            if job['cancel'].is_set() and not outcome[0]:
+                outcome = (False, CANCELLED_MESSAGE, None)
+            job['troubleshoot_future'].set_result(outcome)
+        finally:
+            release_child_processes(job['sequence'])
+            with self.lock:
+                del self.running[service]
+            self._dispatch()
+
+    def watch_cancel_requests(self):
+        """Cancel jobs of this process whose cancellation a request served by another worker process asked for."""
+        while True:
+            time.sleep(RUN_STATE_POLL_INTERVAL)
+            with self.lock:
+                services = set(self.running).union(service for service, queue in self.queues.items() if queue)
+            if not services:
+                continue
+            try:
+                for service in take_cancel_requests(sorted(services)):
+                    logger.info(f"Cancelling the health check of {service} on request of another worker")
+                    self.cancel(service)
+            except Exception as e:
+                logger.error(f"Failed to check for cancel requests: {e}")
+
+    def cancel(self, service):
+        """Cancel the running or next queued job of a service, killing its child processes; False when there is none."""
+        with self.lock:
+            job = self.running.get(service)
+            queued = job is None and bool(self.queues.get(service))
+            if queued:
+                job = self.queues[service].popleft()
+        if job is None:
+            return False
+        job['cancel'].set()
+        if queued:
+            job['login_future'].set_result((False, CANCELLED_MESSAGE, None))
+            job['troubleshoot_future'].set_result((False, f"Skipped because login failed: {CANCELLED_MESSAGE}", None))
+            self._dispatch()
+        else:
+            # The job's sequence number is its owner token: only its own processes and requests are aborted
+            cancel_child_processes(job['sequence'])
+        return True
+
+job_queue = JobQueue(JOB_WORKERS)
+
+run_start_lock = threading.Lock()
+
+def start_service_run(service, tla, env, trigger='manual'):
+    """Queue login and troubleshooting of a service as one job.
+
+    Returns the login and troubleshoot futures, or None when a run of the service is already queued or in progress.
+    """
+    with run_start_lock:
+        if not claim_run_state(service, {'tla': tla, 'env': env, 'trigger': trigger}):
+            return None
+        for key in ('login_outcome', 'troubleshoot_outcome', 'troubleshoot_data', 'run', 'substep_running', 'substep_completed'):
+            task_results[service].pop(key, None)
+        task_results[service]['tla'] = tla
+        task_results[service]['env'] = env
+        task_results[service]['trigger'] = trigger
+        task_results[service]['cancel'] = cancel = threading.Event()
+        publish_task_update(service)
+        login_future = Future()
+        login_future.add_done_callback(lambda f: record_task_outcome(service, 'login', f))
+        troubleshoot_future = Future()
+        troubleshoot_future.add_done_callback(lambda f: record_task_outcome(service, 'troubleshoot', f))
+        job_queue.submit(service, tla, env, trigger, login_future, troubleshoot_future, cancel)
+        return login_future, troubleshoot_future
+
+FLEET_MAX_CONCURRENT = int(os.environ.get("FLEET_MAX_CONCURRENT", "3"))
+FLEET_PER_CLUSTER_LIMIT = int(os.environ.get("FLEET_PER_CLUSTER_LIMIT", "1"))
+
+fleet_executor = ThreadPoolExecutor(max_workers=FLEET_MAX_CONCURRENT, thread_name_prefix="fleet")
+fleet_lock = threading.Lock()
+
+cluster_identities = {}
+cluster_identities_lock = threading.Lock()
+
+def cluster_identity(kubeconfig_path):
+    """API server URL of the kubeconfig's current context, so services of one cluster share its slots; the path when unknown."""
+    try:
+        mtime = os.stat(kubeconfig_path).st_mtime_ns
+    except OSError:
+        return kubeconfig_path
+    with cluster_identities_lock:
+        cached = cluster_identities.get(kubeconfig_path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    env = os.environ.copy()
+    env['KUBECONFIG'] = kubeconfig_path
+    # Read from the kubeconfig alone, without contacting the cluster
+    stdout, _, returncode = run_command("kubectl config view --minify -o jsonpath='{.clusters[0].cluster.server}'", env=env)
+    identity = stdout if returncode == 0 and stdout else kubeconfig_path
+    with cluster_identities_lock:
+        cluster_identities[kubeconfig_path] = (mtime, identity)
+    return identity
+
+def service_cluster(service):
+    tla = service.split('_')[0]
+    env = service.split('_')[-1]
+    return cluster_identity(f"/home/anzdes/kubeconfig/{tla.lower()}{env.lower()}/.kube/config")
+
+class ClusterSlots:
+    """Runs fleet and scheduled work on fleet_executor with at most FLEET_PER_CLUSTER_LIMIT items per cluster at a time.
+
+    Work for a busy cluster waits in that cluster's queue rather than holding an executor thread, and is submitted
+    when an item of the cluster finishes, so one busy cluster cannot starve the others.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.lock = threading.Lock()
+        self.running = defaultdict(int)
+        self.waiting = defaultdict(deque)
+
+    def submit(self, cluster, fn, *args):
+        """Run fn(*args) once the cluster has a free slot; returns a Future of its result."""
+        future = Future()
+        with self.lock:
+            if self.running[cluster] >= self.limit:
+                self.waiting[cluster].append((future, fn, args))
+                return future
+            self.running[cluster] += 1
+        self._start(cluster, future, fn, args)
+        return future
+
+    def _start(self, cluster, future, fn, args):
+        def run():
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(fn(*args))
+                    except Exception as e:
+                        future.set_exception(e)
+            finally:
+                self._release(cluster)
+        fleet_executor.submit(run)
+
+    def _release(self, cluster):
+        with self.lock:
+            if not self.waiting[cluster]:
+                self.running[cluster] -= 1
+                return
+            # The slot passes straight to the next waiting item of the cluster
+            waiting = self.waiting[cluster].popleft()
+        self._start(cluster, *waiting)
+
+cluster_slots = ClusterSlots(FLEET_PER_CLUSTER_LIMIT)
+
+def percent_value(header, cell):
+    key = column_sort_key(header, cell)
+    return key[1] if key[0] == 0 else None
+
+def fleet_summary(html_data):
+    """Key figures of a stored run for the fleet matrix; None for figures the run has no data for."""
+    summary = {'pods': None, 'pods_not_ready': None, 'max_cpu_req_pct': None, 'max_memory_req_pct': None,
+               'pods_high_memory': None, 'error_count': None}
+    pods = html_data.get('pods')
+    if pods and pods['headers'] != ["Message"]:
+        rows = [cells for cells, _ in table_rows(pods)]
+        summary['pods'] = len(rows)
+        summary['pods_not_ready'] = sum(1 for name, ready, status, *_ in rows
+                                        if status not in ('Completed', 'Succeeded') and ready.split('/')[0] != ready.split('/')[-1])
+    resources = html_data.get('resources')
+    if resources and resources['headers'] != ["Message"]:
+        for field, header in (('max_cpu_req_pct', "CPU Req %"), ('max_memory_req_pct', "Memory Req %")):
+            index = resources['headers'].index(header)
+            values = [percent_value(header, cells[index]) for cells, _ in table_rows(resources)]
+            summary[field] = max((value for value in values if value is not None), default=None)
+    pod_resources = html_data.get('pod_resources')
+    if pod_resources and pod_resources['headers'] != ["Message"]:
+        summary['pods_high_memory'] = sum(1 for _, high_usage in table_rows(pod_resources) if high_usage)
+    errors = html_data.get('errors')
+    if errors and errors['headers'] != ["Message"]:
+        summary['error_count'] = sum(row[5] for row in errors['rows'] if row[3] == 'ERROR' and isinstance(row[5], int))
+    return summary
+
+def run_service_to_completion(service, trigger, on_start=None):
+    """Run a service and wait for it; submitted through cluster_slots, so it holds its cluster's slot meanwhile.
+
+    Returns (success, message, run), where run is the stored run of a successful check, or None when a run of the
+    service is already in progress.
+    """
+    tla = service.split('_')[0]
+    env = service.split('_')[-1]
+    futures = start_service_run(service, tla, env, trigger=trigger)
+    if futures is None:
+        return None
+    if on_start:
+        on_start()
+    wait(futures)
+    login_success, login_message, _ = futures[0].result()
+    t_success, t_message, t_data = futures[1].result()
+    if not login_success:
+        return False, login_message, None
+    if not t_success:
+        return False, t_message, None
+    return True, "", finalize_run(service, t_data)
+
+def publish_fleet_run(fleet):
+    """Share the fleet matrix with all worker processes."""
+    with fleet_lock:
+        save_portal_state('fleet', fleet)
+
+def load_fleet_run():
+    """The latest fleet run of any worker process; one whose worker process is gone is finished here on its behalf."""
+    fleet = load_portal_state('fleet')
+    if fleet and not fleet['finished'] and not process_alive(fleet['owner'], fleet.get('owner_started')):
+        for entry in fleet['services'].values():
+            if entry['status'] in ('Queued', 'Running'):
+                entry.update(status='Failed', result='FAIL', message=INTERRUPTED_MESSAGE)
+        fleet['finished'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        save_portal_state('fleet', fleet)
+    return fleet
+
+def run_fleet_service(fleet, service):
+    """Run one service of a fleet run and record the outcome in the fleet matrix."""
+    entry = fleet['services'][service]
+
+    def on_start():
+        entry.update(status='Running', started=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        publish_fleet_run(fleet)
+    outcome = run_service_to_completion(service, 'fleet', on_start=on_start)
+    if outcome is None:
+        entry.update(status='Skipped', message='A health check is already running for this service.')
+        publish_fleet_run(fleet)
+        return
+    success, message, run = outcome
+    entry['finished'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    if success:
+        entry.update(status='Completed', result='PASS', run_id=run['id'], summary=fleet_summary(get_run(run['id'])['html_data']))
+    else:
+        entry.update(status='Failed', result='FAIL', message=message)
+    publish_fleet_run(fleet)
+
+def start_fleet_run(services):
+    """Check the given services concurrently within the global and per-cluster limits; None when a fleet run is in progress."""
+    with fleet_lock:
+        latest = load_fleet_run()
+        if latest and not latest['finished']:
+            return None
+        fleet = {
+            'id': (latest['id'] + 1) if latest else 1,
+            'owner': os.getpid(),
+            'owner_started': own_start_token(),
+            'started': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'finished': None,
+            'services': {service: {'status': 'Queued', 'result': None, 'run_id': None, 'summary': None, 'message': '',
+                                   'started': None, 'finished': None}
+                         for service in services}
+        }
+        save_portal_state('fleet', fleet)
+    futures = [cluster_slots.submit(service_cluster(service), run_fleet_service, fleet, service) for service in services]
+
+    def finish(_):
+        if all(future.done() for future in futures) and not fleet['finished']:
+            fleet['finished'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            publish_fleet_run(fleet)
+    for future in futures:
+        future.add_done_callback(finish)
+    return fleet
+
+SCHEDULER_ENABLED = os.environ.get("SCHEDULER_ENABLED", "0") == "1"
+SCHEDULE_INTERVAL = int(os.environ.get("SCHEDULE_INTERVAL", "1800"))
+SCHEDULE_JITTER = int(os.environ.get("SCHEDULE_JITTER", "120"))
+# Per-service overrides of SCHEDULE_INTERVAL, e.g. "NSE_VML_VIYA4_PROD=600,GFB_ALM_VIYA4_Test=3600"
+SCHEDULE_INTERVALS = dict((service.strip(), int(seconds)) for service, _, seconds in
+                          (entry.partition('=') for entry in os.environ.get("SCHEDULE_INTERVALS", "").split(',') if entry.strip()))
+
+class HealthCheckScheduler:
+    """Runs periodic background health checks of every service and keeps the latest stored run hot.
+
+    First runs are staggered evenly across the interval and every run gets up to SCHEDULE_JITTER seconds of random
+    delay, so clusters do not all fire at once.
+    """
+
+    def __init__(self, services):
+        self.stopped = threading.Event()
+        self.lock = threading.Lock()
+        self.queue = []
+        now = time.time()
+        for i, service in enumerate(services):
+            interval = SCHEDULE_INTERVALS.get(service, SCHEDULE_INTERVAL)
+            heapq.heappush(self.queue, (now + interval * i / len(services) + self.jitter(), service))
+        save_portal_state('schedule', self.next_runs())
+        self.thread = threading.Thread(target=self.run, name="health-check-scheduler", daemon=True)
+        self.thread.start()
+
+    @staticmethod
+    def jitter():
+        return random.uniform(0, SCHEDULE_JITTER)
+
+    def next_runs(self):
+        with self.lock:
+            return {service: datetime.fromtimestamp(due).strftime('%Y-%m-%d %H:%M:%S') for due, service in self.queue}
+
+    def run(self):
+        while not self.stopped.is_set():
+            with self.lock:
+                due, service = self.queue[0]
+            if self.stopped.wait(max(due - time.time(), 0)):
+                return
+            with self.lock:
+                heapq.heappop(self.queue)
+                interval = SCHEDULE_INTERVALS.get(service, SCHEDULE_INTERVAL)
+                heapq.heappush(self.queue, (time.time() + interval + self.jitter(), service))
+            # Other worker processes show the next scheduled checks from the run store
+            save_portal_state('schedule', self.next_runs())
+            cluster_slots.submit(service_cluster(service), self.check, service)
+
+    def check(self, service):
+        logger.info(f"Running scheduled health check for {service}")
+        outcome = run_service_to_completion(service, 'scheduled')
+        if outcome is None:
+            logger.info(f"Skipped scheduled health check for {service}: a health check is already running")
+        elif outcome[0]:
+            logger.info(f"Scheduled health check for {service} completed")
+        else:
+            logger.error(f"Scheduled health check for {service} failed: {outcome[1]}")
+
+    def stop(self):
+        self.stopped.set()
+
+scheduler = None
+scheduler_lock_file = None
+
+def start_scheduler():
+    """Start the scheduler in the one worker process that holds the scheduler lock of the data directory."""
+    global scheduler, scheduler_lock_file
+    if not SCHEDULER_ENABLED or scheduler is not None:
+        return
+    lock_file = open(os.path.join(PORTAL_DATA_DIR, "scheduler.lock"), "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        logger.info("Background health checks are scheduled by another worker process")
+        return
+    # The lock is held until this process exits, when a replacement worker can take it over
+    scheduler_lock_file = lock_file
+    scheduler = HealthCheckScheduler(SERVICES)
+    logger.info(f"Scheduled background health checks every {SCHEDULE_INTERVAL}s (jitter {SCHEDULE_JITTER}s)")
+
 @app.route('/', methods=['GET'])
 def index():
     logger.info("Received GET request to /")
@@ -1379,12 +3715,14 @@ def index():
 
     # Group services by TLA
     grouped_services = group_services_by_tla(SERVICES)
+    running_services = [service for service in SERVICES if session.get('status_' + service) == 'Running']
 
     if not selected_service:
         return render_template_string(HTML_TEMPLATE, 
                                      grouped_services=grouped_services,
                                      selected_service=None,
-                                     services=SERVICES)
+                                     services=SERVICES,
+                                     running_services=running_services)
 
     # Fetch Kubernetes version, resource group, and namespace
     tla = selected_service.split('_')[0].lower()
@@ -1392,23 +3730,43 @@ def index():
     namespace = f"{tla}{env}"
     resource_group = f"{tla}-{env}"
     kubeconfig_path = f"/home/anzdes/kubeconfig/{namespace}/.kube/config"
-    kube_version = get_kube_version(kubeconfig_path)
-    sas_deployment = get_sas_deployment_info(namespace, kubeconfig_path)
+    kube_version, sas_deployment = cached_cluster_metadata(namespace, kubeconfig_path)
+    summary = cluster_summary(namespace, kubeconfig_path)
 
     # Get past runs and last report
-    past_runs = session.get(f'past_runs_{selected_service}', [])
-    last_report = session.get(f'results_{selected_service}', '<p>No results available.</p>')
-
-    return render_template_string(HTML_TEMPLATE, 
-                                 grouped_services=grouped_services,
-                                 selected_service=selected_service,
-                                 services=SERVICES,
-                                 kube_version=kube_version,
-                                 resource_group=resource_group,
-                                 namespace=namespace,
-                                 sas_deployment=sas_deployment,
-                                 past_runs=past_runs,
-                                 last_report=last_report)
+    past_runs = list_runs(selected_service)
+    run_id = result_run_id(selected_service)
+    next_scheduled_run = load_portal_state('schedule', {}).get(selected_service) if SCHEDULER_ENABLED else None
+
+    # Stream the page so the browser starts rendering before the whole template has been rendered
+    return Response(stream_template_string(HTML_TEMPLATE,
+                                           grouped_services=grouped_services,
+                                           selected_service=selected_service,
+                                           services=SERVICES,
+                                           running_services=running_services,
+                                           kube_version=kube_version,
+                                           resource_group=resource_group,
+                                           namespace=namespace,
+                                           sas_deployment=sas_deployment,
+                                           cluster_summary=summary,
+                                           metadata_pending=kube_version == METADATA_PLACEHOLDER or sas_deployment.get('state') == METADATA_PLACEHOLDER,
+                                           past_runs=past_runs,
+                                           run_id=run_id,
+                                           next_scheduled_run=next_scheduled_run))
+
+@app.route('/metadata', methods=['GET'])
+def metadata():
+    service = request.args.get('service')
+    if service not in SERVICES:
+        return jsonify({'error': 'Invalid service'}), 400
+    tla = service.split('_')[0].lower()
+    env = service.split('_')[-1].lower()
+    namespace = f"{tla}{env}"
+    kubeconfig_path = f"/home/anzdes/kubeconfig/{namespace}/.kube/config"
+    kube_version, sas_deployment = cached_cluster_metadata(namespace, kubeconfig_path)
+    kube_version = metadata_cache.wait(('kube_version', kubeconfig_path), METADATA_REFRESH_WAIT) or kube_version
+    sas_deployment = metadata_cache.wait(('sas_deployment', kubeconfig_path, namespace), METADATA_REFRESH_WAIT) or sas_deployment
+    return jsonify({'kube_version': kube_version, **sas_deployment})
 
 @app.route('/run-login-async', methods=['POST'])
 def run_login_async():
@@ -1423,9 +3781,11 @@ def run_login_async():
     if current_status == 'Running':
         return jsonify({'success': False, 'message': 'A health check is already running for this service. Please wait until it completes.'})
 
+    if start_service_run(service, tla, env) is None:
+        return jsonify({'success': False, 'message': 'A health check is already running for this service. Please wait until it completes.'})
+
     # Clear previous results before starting a new run
-    session.pop(f'results_{service}', None)
-    session.pop(f'html_data_{service}', None)
+    session[f'run_id_{service}'] = None
     session[f'tla_{service}'] = tla
     session[f'env_{service}'] = env
     session[f'status_{service}'] = 'Running'
@@ -1435,12 +3795,55 @@ def run_login_async():
     session[f'login_message_{service}'] = ""
     session[f'troubleshoot_running_{service}'] = False
     session[f'troubleshoot_completed_{service}'] = False
-    future = executor.submit(run_login_script, tla, env, service)
-    task_results[service]['login_future'] = future
-    troubleshoot_future = executor.submit(troubleshoot_service, service, tla, env)
-    task_results[service]['troubleshoot_future'] = troubleshoot_future
     return jsonify({'success': True, 'message': 'Login process started'})
 
+@app.route('/cancel', methods=['POST'])
+def cancel_run():
+    service = request.form.get('service', '').strip()
+    if service not in SERVICES:
+        return jsonify({'success': False, 'message': 'Service not found'}), 404
+    # The job may belong to another worker process, which picks the request up from the run store
+    if not job_queue.cancel(service) and not request_cancel(service):
+        return jsonify({'success': False, 'message': 'No health check is queued or running for this service.'})
+    logger.info(f"Cancelled the health check of {service}")
+    return jsonify({'success': True, 'message': 'Health check cancelled'})
+
+def status_versions(service, response):
+    """Version of each /status field, bumping the service's version when any field value changed since the last call."""
+    digests = session.get(f'status_digests_{service}', {})
+    field_versions = session.get(f'status_field_versions_{service}', {})
+    version = session.get(f'status_version_{service}', 0)
+    changed = {}
+    for field, value in response.items():
+        digest = hashlib.sha1(json.dumps(value, sort_keys=True).encode('utf-8')).hexdigest()
+        if digests.get(field) != digest:
+            changed[field] = digest
+    if changed:
+        version += 1
+        digests.update(changed)
+        field_versions.update(dict.fromkeys(changed, version))
+        session[f'status_digests_{service}'] = digests
+        session[f'status_field_versions_{service}'] = field_versions
+        session[f'status_version_{service}'] = version
+    return version, field_versions
+
+@app.route('/run-all', methods=['POST'])
+def run_all():
+    tla = request.form.get('tla', '').strip()
+    grouped_services = group_services_by_tla(SERVICES)
+    if tla and tla not in grouped_services:
+        return jsonify({'success': False, 'message': f'Unknown TLA: {tla}'}), 400
+    services = grouped_services[tla] if tla else SERVICES
+    fleet = start_fleet_run(services)
+    if fleet is None:
+        return jsonify({'success': False, 'message': 'A fleet health check is already running. Please wait until it completes.'})
+    logger.info(f"Started fleet health check {fleet['id']} for {', '.join(services)}")
+    return jsonify({'success': True, 'message': 'Fleet health check started', 'fleet_id': fleet['id'], 'services': services})
+
+@app.route('/fleet-status', methods=['GET'])
+def fleet_status():
+    return jsonify({'fleet': load_fleet_run()})
+
 @app.route('/status', methods=['GET'])
 def get_status():
     service = request.args.get('service', '').strip()
@@ -1457,81 +3860,68 @@ def get_status():
     troubleshoot_running = session.get(f'troubleshoot_running_{service}', False)
     troubleshoot_completed = session.get(f'troubleshoot_completed_{service}', False)
     
-    # Sync substep states from task_results to session
-    substep_running = task_results[service].get('substep_running', [False] * 6)
-    substep_completed = task_results[service].get('substep_completed', [False] * 6)
+    # The run may execute in another worker process; follow it through the shared run state
+    state = load_run_state(service)
+
+    # Sync substep states from the run state to session
+    substep_running = state.get('substep_running', [False] * 6)
+    substep_completed = state.get('substep_completed', [False] * 6)
     for i in range(6):
-        session[f'substep_running_{service}_{i}'] = substep_running[i]
-        session[f'substep_completed_{service}_{i}'] = substep_completed[i]
+        # Only assign changed values so an idle poll does not rewrite the session
+        if session.get(f'substep_running_{service}_{i}') != substep_running[i]:
+            session[f'substep_running_{service}_{i}'] = substep_running[i]
+        if session.get(f'substep_completed_{service}_{i}') != substep_completed[i]:
+            session[f'substep_completed_{service}_{i}'] = substep_completed[i]
     
-    # Handle login future
-    if 'login_future' in task_results[service]:
-        login_future = task_results[service]['login_future']
-        if login_future.done():
-            success, message, pid = login_future.result()
-            if success:
-                session[f'login_running_{service}'] = False
-                session[f'login_completed_{service}'] = True
-                session[f'login_script_pid_{service}'] = pid
-                logger.info(f"Login completed for {service}")
-                if not troubleshoot_running and not troubleshoot_completed:
-                    session[f'troubleshoot_running_{service}'] = True
-            else:
-                session[f'login_running_{service}'] = False
-                session[f'login_failed_{service}'] = True
-                session[f'login_message_{service}'] = message
-                session[f'status_{service}'] = 'Failed'
-                session[f'last_run_{service}'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                if pid:
-                    session[f'login_script_pid_{service}'] = pid
-                logger.error(f"Login failed for {service}: {message}")
-            del task_results[service]['login_future']
-
-    # Handle troubleshoot future
-    if 'troubleshoot_future' in task_results[service] and login_completed:
-        troubleshoot_future = task_results[service]['troubleshoot_future']
-        if troubleshoot_future.done():
-            t_success, t_message, t_data = troubleshoot_future.result()
-            if t_success:
-                session[f'results_{service}'] = t_data['results']
-                session[f'html_data_{service}'] = t_data['html_data']
-                session[f'troubleshoot_running_{service}'] = False
-                session[f'troubleshoot_completed_{service}'] = True
-                session[f'status_{service}'] = 'Completed'
-                last_run_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                session[f'last_run_{service}'] = last_run_time
-                # Store the run in past_runs
-                past_runs = session.get(f'past_runs_{service}', [])
-                past_runs.append({
-                    'timestamp': last_run_time,
-                    'results': t_data['results'],
-                    'html_data': t_data['html_data']
-                })
-                session[f'past_runs_{service}'] = past_runs[-5:]  # Keep only the last 5 runs
-                logger.info(f"Troubleshooting completed for {service}")
-            else:
-                session[f'troubleshoot_running_{service}'] = False
-                session[f'status_{service}'] = 'Failed'
-                session[f'last_run_{service}'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                logger.error(f"Troubleshooting failed for {service}: {t_message}")
-                # Clean up task_results for this service
-                if 'troubleshoot_future' in task_results[service]:
-                    del task_results[service]['troubleshoot_future']
-                # Reset substep states
-                task_results[service]['substep_running'] = [False] * 6
-                task_results[service]['substep_completed'] = [False] * 6
-                for i in range(6):
-                    session[f'substep_running_{service}_{i}'] = False
-                    session[f'substep_completed_{service}_{i}'] = False
-
-    # Add results and past_runs to the response
-    results = session.get(f'results_{service}', '<p>No results available.</p>')
-    past_runs = session.get(f'past_runs_{service}', [])
+    # Handle the login outcome
+    login_outcome = state.get('login_outcome')
+    if status == 'Running' and login_outcome and not login_completed and not login_failed:
+        success, message = login_outcome
+        if success:
+            session[f'login_running_{service}'] = False
+            session[f'login_completed_{service}'] = True
+            logger.info(f"Login completed for {service}")
+            if not troubleshoot_running and not troubleshoot_completed:
+                session[f'troubleshoot_running_{service}'] = True
+        else:
+            session[f'login_running_{service}'] = False
+            session[f'login_failed_{service}'] = True
+            session[f'login_message_{service}'] = message
+            session[f'status_{service}'] = 'Failed'
+            session[f'last_run_{service}'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            logger.error(f"Login failed for {service}: {message}")
+
+    # Handle the troubleshoot outcome once login has completed, including in this same call
+    troubleshoot_outcome = state.get('troubleshoot_outcome')
+    if session.get(f'status_{service}') == 'Running' and session.get(f'login_completed_{service}', False) and troubleshoot_outcome:
+        t_success, t_message = troubleshoot_outcome
+        if t_success and state.get('run'):
+            # The session only keeps the ID of the stored run
+            run = state['run']
+            session[f'run_id_{service}'] = run['id']
+            session[f'troubleshoot_running_{service}'] = False
+            session[f'troubleshoot_completed_{service}'] = True
+            session[f'status_{service}'] = 'Completed'
+            session[f'last_run_{service}'] = run['timestamp']
+            logger.info(f"Troubleshooting completed for {service}")
+        elif not t_success:
+            session[f'troubleshoot_running_{service}'] = False
+            session[f'status_{service}'] = 'Failed'
+            session[f'last_run_{service}'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            logger.error(f"Troubleshooting failed for {service}: {t_message}")
+            # Reset substep states
+            for i in range(6):
+                session[f'substep_running_{service}_{i}'] = False
+                session[f'substep_completed_{service}_{i}'] = False
+
+    # Add the stored run behind the Result tab and past_runs to the response
+    past_runs = list_runs(service)
 
     # Prepare the response for the UI
     response = {
         'status': session.get(f'status_{service}', 'Ready'),
         'last_run': session.get(f'last_run_{service}', ''),
+        'queue_position': state.get('queue_position') if shared_run_running(state) else None,
         'login_running': session.get(f'login_running_{service}', False),
         'login_completed': session.get(f'login_completed_{service}', False),
         'login_failed': session.get(f'login_failed_{service}', False),
@@ -1540,31 +3930,117 @@ def get_status():
         'troubleshoot_completed': session.get(f'troubleshoot_completed_{service}', False),
         'substep_running': [session.get(f'substep_running_{service}_{i}', False) for i in range(6)],
         'substep_completed': [session.get(f'substep_completed_{service}_{i}', False) for i in range(6)],
-        'results': results,  # Add results data
-        'past_runs': [{'timestamp': run['timestamp']} for run in past_runs]  # Add past runs timestamps
+        'run_id': session.get(f'run_id_{service}'),  # The Result tab loads its tables from /results/<run_id>
+        'past_runs': [{'timestamp': run['timestamp'], 'trigger': run['trigger']} for run in past_runs]  # Add past runs timestamps
     }
-    return jsonify(response)
+
+    version, field_versions = status_versions(service, response)
+    etag = f"{service}-{version}"
+    if request.if_none_match.contains(etag):
+        not_modified = Response(status=304)
+        not_modified.set_etag(etag)
+        return not_modified
+    since = request.args.get('since', type=int)
+    if since is not None:
+        # Only fields changed after the client's version; the run behind the Result tab once, when the run turns final
+        final = response['status'] != 'Running'
+        run_changed = final and max(field_versions.get('run_id', 0), field_versions.get('status', 0)) > since
+        response = {field: value for field, value in response.items()
+                    if (run_changed if field == 'run_id' else field_versions.get(field, 0) > since)}
+    response['version'] = version
+    status_response = jsonify(response)
+    status_response.set_etag(etag)
+    status_response.headers['Cache-Control'] = 'no-cache'
+    return status_response
+
+open_event_streams = 0
+open_event_streams_lock = threading.Lock()
+
+@app.route('/events', methods=['GET'])
+def events():
+    service = request.args.get('service', '').strip()
+    if service not in SERVICES:
+        return jsonify({'error': 'Service not found'}), 404
+
+    global open_event_streams
+    with open_event_streams_lock:
+        if open_event_streams >= SSE_MAX_STREAMS:
+            return jsonify({'error': 'Too many open event streams, poll /status instead'}), 503
+        open_event_streams += 1
+    ensure_run_state_watcher()
+
+    def stream():
+        sent_version = None
+        while True:
+            # The run store is only read again once a run changed or the keepalive is due
+            with task_updates:
+                serial = task_update_serial
+            state = task_state(service)
+            if state['version'] == sent_version:
+                with task_updates:
+                    changed = task_updates.wait_for(lambda: task_update_serial != serial, timeout=SSE_KEEPALIVE)
+                if not changed:
+                    yield ": keepalive\n\n"
+                continue
+            sent_version = state['version']
+            if state['status'] != 'Running':
+                yield f"event: final\ndata: {json.dumps(state)}\n\n"
+                return
+            yield f"data: {json.dumps(state)}\n\n"
+
+    def close_stream():
+        global open_event_streams
+        with open_event_streams_lock:
+            open_event_streams -= 1
+
+    response = Response(stream(), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    response.call_on_close(close_stream)
+    return response
+
+@app.route('/results/<int:run_id>', methods=['GET'])
+def run_results(run_id):
+    run = get_run(run_id)
+    if not run:
+        return jsonify({'error': 'Run not found'}), 404
+    sections = []
+    for key in REPORT_SECTIONS:
+        if key not in run['html_data']:
+            continue
+        data = run['html_data'][key]
+        if key in TABLE_SECTIONS:
+            sections.append({'section': key, 'title': section_title(key), 'headers': data['headers'], 'total': len(data['rows'])})
+        else:
+            sections.append({'section': key, 'title': section_title(key), 'text': data})
+    response = jsonify({'run_id': run_id, 'timestamp': run['timestamp'], 'sections': sections})
+    # Stored runs never change
+    response.headers['Cache-Control'] = 'private, max-age=86400'
+    return response
+
+@app.route('/results/<int:run_id>/<section>', methods=['GET'])
+def run_results_table(run_id, section):
+    run = get_run(run_id)
+    if not run or section not in TABLE_SECTIONS or section not in run['html_data']:
+        return jsonify({'error': 'Table not found'}), 404
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', RESULT_PAGE_SIZE, type=int), 1), RESULT_PAGE_SIZE_MAX)
+    page = table_page(run['html_data'], section, offset=offset, limit=limit,
+                      sort=request.args.get('sort'), order=request.args.get('order', 'asc'),
+                      text_filter=request.args.get('filter', '').strip())
+    response = jsonify(page)
+    response.headers['Cache-Control'] = 'private, max-age=86400'
+    return response
 
 @app.route('/download-report', methods=['GET'])
 def download_report():
     service = request.args.get('service', '').strip()
     if service not in SERVICES:
         return jsonify({'error': 'Service not found'}), 404
-    results = session.get(f'results_{service}', None)
-    if not results:
+    # The report of the run the Result tab shows, or the newest stored one while this browser's run has none yet
+    run = get_run(result_run_id(service) or find_run_id(service))
+    if not run:
         return jsonify({'error': 'No report available'}), 404
-    tla = session.get(f'tla_{service}', '')
-    env = session.get(f'env_{service}', '')
-    html_content = generate_report_html(tla, env, results)
-    buffer = BytesIO()
-    buffer.write(html_content.encode('utf-8'))
-    buffer.seek(0)
-    return send_file(
-        buffer,
-        as_attachment=True,
-        download_name=f"{service}_troubleshooting_report.html",
-        mimetype='text/html'
-    )
+    return send_report(run, f"{service}_troubleshooting_report.html")
 
 @app.route('/download-past-report', methods=['GET'])
 def download_past_report():
@@ -1572,22 +4048,48 @@ def download_past_report():
     timestamp = request.args.get('timestamp', '').strip()
     if service not in SERVICES:
         return jsonify({'error': 'Service not found'}), 404
-    past_runs = session.get(f'past_runs_{service}', [])
-    selected_run = next((run for run in past_runs if run['timestamp'] == timestamp), None)
+    selected_run = get_run(find_run_id(service, timestamp))
     if not selected_run:
         return jsonify({'error': 'Past report not found'}), 404
-    tla = service.split('_')[0].lower()
-    env = service.split('_')[-1].lower()
-    html_content = generate_report_html(tla, env, selected_run['results'])
-    buffer = BytesIO()
-    buffer.write(html_content.encode('utf-8'))
-    buffer.seek(0)
-    return send_file(
-        buffer,
-        as_attachment=True,
-        download_name=f"{service}_troubleshooting_report_{timestamp.replace(' ', '_').replace(':', '-')}.html",
-        mimetype='text/html'
-    )
+    return send_report(selected_run, f"{service}_troubleshooting_report_{timestamp.replace(' ', '_').replace(':', '-')}.html")
+
+# Production serving: PORTAL_WORKERS gunicorn worker processes sharing run state through the run store.
+# Runs, fleet state and cancel requests are shared, but these limits and caches apply per worker process, so each is
+# multiplied by PORTAL_WORKERS: JOB_WORKERS, FLEET_MAX_CONCURRENT, FLEET_PER_CLUSTER_LIMIT, LOG_SCAN_PROCESSES,
+# SSE_MAX_STREAMS, the kubectl proxies and informers, the metadata, credential and az login caches and the log cursors.
+PORTAL_BIND = os.environ.get("PORTAL_BIND", "0.0.0.0:5000")
+PORTAL_WORKERS = int(os.environ.get("PORTAL_WORKERS", "2"))
+PORTAL_THREADS = int(os.environ.get("PORTAL_THREADS", "16"))
+
+def start_worker():
+    """Background work of a serving process: fail runs orphaned by a stopped worker and start the scheduler."""
+    with closing(run_state_connection()) as connection, connection:
+        fail_orphaned_runs(connection)
+    ensure_run_state_watcher()
+    load_fleet_run()
+    start_scheduler()
+
+def serve_production():
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        logger.error("Production mode requires gunicorn. Install it with 'pip install gunicorn'.")
+        sys.exit(1)
+
+    class PortalApplication(BaseApplication):
+        def load_config(self):
+            # Threaded workers, so open event streams do not hold a whole worker process each
+            self.cfg.set('bind', PORTAL_BIND)
+            self.cfg.set('workers', PORTAL_WORKERS)
+            self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('threads', PORTAL_THREADS)
+            self.cfg.set('post_worker_init', lambda worker: start_worker())
+
+        def load(self):
+            return app
+
+    logger.info(f"Serving on {PORTAL_BIND} with {PORTAL_WORKERS} worker processes of {PORTAL_THREADS} threads")
+    PortalApplication().run()
 
 if __name__ == '__main__':
     has_update, latest_version = check_for_updates()
@@ -1601,7 +4103,16 @@ if __name__ == '__main__':
     else:
         logger.info(f"Script is up-to-date. Running version: {SCRIPT_VERSION}")
 
-    # Start the Flask application
+    if "--production" in sys.argv[1:]:
+        serve_production()
+        sys.exit(0)
+
+    # With debug=True the reloader imports this module in a watcher and a serving process; only the serving
+    # process runs the scheduler
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_worker()
+
+    # Start the Flask development server
     try:
         app.run(host='0.0.0.0', port=5000, debug=True)
     except Exception as e: